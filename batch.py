@@ -0,0 +1,68 @@
+"""
+Command-line batch mode: reads load plans as JSONL and writes one load
+sheet record per plan as JSONL, without opening any windows.
+
+Usage:
+    python batch.py plans.jsonl -o sheets.jsonl
+    cat plans.jsonl | python batch.py > sheets.jsonl
+
+See src/load_sheet.py for the load plan format.
+"""
+import argparse
+import json
+import sys
+import time
+
+from src.load_sheet import DEFAULT_CHUNK_SIZE, LoadSheetEngine
+from src.parallel_runner import iter_load_sheets_parallel
+
+
+def parse_args(argv=None):
+    """Parses the command-line arguments."""
+    parser = argparse.ArgumentParser(description="Calculate 777-300ER load sheets for a JSONL file of load plans.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="JSONL file with one load plan per line ('-' or omitted reads stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSONL file for the load sheets ('-' or omitted writes stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"plans evaluated together (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses all CPUs (default 1, no pool)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the run summary to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    infile = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    start = time.perf_counter()
+    count, errors = 0, 0
+    if args.workers == 1:
+        records = LoadSheetEngine.from_files().iter_load_sheets(infile, chunk_size=args.chunk_size)
+        texts = ((json.dumps(record), "error" in record) for record in records)
+    else:
+        texts = iter_load_sheets_parallel(infile, workers=args.workers or None, chunk_size=args.chunk_size,
+                                          encode=True)
+
+    try:
+        for text, failed in texts:
+            outfile.write(text + "\n")
+            count += 1
+            errors += failed
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        rate = count / elapsed if elapsed > 0 else 0
+        print(f"{count} plans ({errors} invalid) in {elapsed:.2f} s, {rate:.0f} plans/s", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmark suite for the calculation and GUI hot paths. Run with `python -m benchmarks.run`."""
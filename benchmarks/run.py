@@ -0,0 +1,257 @@
+"""
+Benchmark suite for the calculation and GUI hot paths.
+
+All fixtures are built from the data/*.json files, so runs are
+reproducible. Every benchmark reports the time per operation, operations
+per second and the peak memory allocated by a single operation.
+
+Usage (from the project root):
+    python -m benchmarks.run                      # run and compare against the baseline
+    python -m benchmarks.run --save-baseline      # run and store the results as the new baseline
+    python -m benchmarks.run -k fuel --threshold 0.5
+
+The GUI benchmarks need a display; without one they are skipped and only
+the headless benchmarks run. The fixtures of a suite are only built when
+one of its benchmarks passes the -k filter. Exit code 1 means a
+regression above the threshold was found.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+from src.app_utils import load_json_data
+from src.batch_calculations import calculate_batch_summary
+from src.cargo_planner import parse_manifest, plan_cargo
+from src.load_sheet import LoadSheetEngine
+from src.load_state import LoadState
+from src.pax_dispersion import simulate_pax_dispersion
+
+DEFAULT_BASELINE_FILEPATH = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.25  # Flag slowdowns above 25%
+
+# Reproducible load: every seat, max weight in all containers and a
+# typical long-haul fuel load
+FIXTURE_FUEL_LITERS = {"Main Tank 1": 25000, "Main Tank 2": 25000, "Center Tank": 40000}
+FIXTURE_SWEEP_SIZE = 10000
+FIXTURE_DISPERSION_DRAWS = 10000
+FIXTURE_TRACE = [(28.5, 170200), (30.4, 207800), (29.1, 245000), (24.2, 320000)]
+FIXTURE_MANIFEST = parse_manifest("P1 4200, P1 3900, LD-7 3100, LD-9 2800, Half Pallet 2300, Half Pallet 1800, "
+                                  + ", ".join(f"LD-3 {kg}" for kg in range(600, 1600, 100)))
+
+
+def load_fixture_state(load_state):
+    """Fills a LoadState with the benchmark fixture load."""
+    load_state.pax.select_all()
+    load_state.cargo.load_max_all()
+    for tname, liters in FIXTURE_FUEL_LITERS.items():
+        load_state.fuel.set_liters(tname, liters)
+    return load_state
+
+
+def headless_fixture():
+    """Builds the fixtures of the benchmarks that run without a display."""
+    center_table = next(t["arm_table"] for t in load_json_data(config.FUEL_TANKS_FILEPATH)
+                        if t["tank"] == "Center Tank")
+    rng = np.random.default_rng(0)
+    return SimpleNamespace(
+        center_table=center_table,
+        compiled_table=calc.CompiledArmTable(center_table),
+        state=load_fixture_state(LoadState.from_files()),
+        engine=LoadSheetEngine.from_files(),
+        plan={"registration": "PH-BVA", "pax": {"F": 30, "Y": 380}, "cargo": {"11P": 4676, "31": 1500},
+              "fuel": FIXTURE_FUEL_LITERS},
+        sweep=(np.full(FIXTURE_SWEEP_SIZE, 170200.0), np.full(FIXTURE_SWEEP_SIZE, 45.3),
+               rng.uniform(0, 40000, FIXTURE_SWEEP_SIZE), rng.uniform(0, 40000, FIXTURE_SWEEP_SIZE) * 1300,
+               rng.uniform(0, 30000, FIXTURE_SWEEP_SIZE), rng.uniform(0, 30000, FIXTURE_SWEEP_SIZE) * 1200,
+               rng.uniform(0, 140000, FIXTURE_SWEEP_SIZE), rng.uniform(0, 140000, FIXTURE_SWEEP_SIZE) * 1250),
+    )
+
+
+# (name, function of the fixture returning the callable to time)
+HEADLESS_BENCHMARKS = [
+    ("calc.interpolate_arm", lambda f: lambda: calc.interpolate_arm(f.center_table, 30123.4)),
+    ("calc.CompiledArmTable", lambda f: lambda: f.compiled_table(30123.4)),
+    ("PassengerLoad.get_cg", lambda f: f.state.pax.get_cg),
+    ("CargoLoad.get_cg", lambda f: f.state.cargo.get_cg),
+    ("CargoLoad.recompute_blocks", lambda f: f.state.cargo.recompute_blocks),
+    ("FuelLoad.get_cg", lambda f: f.state.fuel.get_cg),
+    ("FuelSchedule.distribute", lambda f: lambda: f.state.fuel.schedule.distribute(60000, f.state.fuel.density)),
+    ("LoadSheetEngine.reduce_plan", lambda f: lambda: f.engine.reduce_plan(f.plan)),
+    ("plan_cargo", lambda f: lambda: plan_cargo(FIXTURE_MANIFEST, f.state.cargo.index, 210000, 210000 * 1250, 30.0)),
+    (f"calculate_batch_summary[{FIXTURE_SWEEP_SIZE}]", lambda f: lambda: calculate_batch_summary(*f.sweep)),
+    (f"simulate_pax_dispersion[{FIXTURE_DISPERSION_DRAWS}]",
+     lambda f: lambda: simulate_pax_dispersion(f.state.pax.seat_index, {"F": 30, "Y": 300}, 200000, 200000 * 1250,
+                                               n_draws=FIXTURE_DISPERSION_DRAWS)),
+]
+
+
+def gui_fixture():
+    """
+    Builds the application and live plot for the tkinter/matplotlib hot
+    paths, or returns None if no display is available.
+    """
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+
+    from main import AircraftSummaryApp
+    from src.live_cg_plot import LiveCGPlot
+    app = AircraftSummaryApp(root)
+    app.build_all_tabs()
+    load_fixture_state(app.load_state)
+    app.cargo_module.update_all_blocks()
+    return SimpleNamespace(app=app, live_plot=LiveCGPlot())
+
+
+GUI_BENCHMARKS = [
+    ("SeatSelector.get_passenger_cg", lambda f: f.app.seat_module.get_passenger_cg),
+    ("CargoLoadSystem.get_cargo_cg", lambda f: f.app.cargo_module.get_cargo_cg),
+    ("CargoLoadSystem.update_all_blocks", lambda f: f.app.cargo_module.update_all_blocks),
+    ("FuelLoadSystem.update_summary", lambda f: f.app.fuel_module.update_summary),
+    ("FuelLoadSystem.get_fuel_cg", lambda f: f.app.fuel_module.get_fuel_cg),
+    ("AircraftSummaryApp.calculate_aircraft_summary",
+     lambda f: lambda: f.app.calculate_aircraft_summary(update_plot=True, force=True)),
+    ("LiveCGPlot.update_full_trace", lambda f: lambda: f.live_plot.update_full_trace(FIXTURE_TRACE)),
+    # Last, as it changes the fixture passenger load
+    ("SeatSelector.select_all+deselect_all",
+     lambda f: lambda: (f.app.seat_module.select_all(), f.app.seat_module.deselect_all())),
+]
+
+
+def select_benchmarks(name_filter=""):
+    """
+    Builds the benchmarks whose name contains `name_filter` (case-insensitive).
+    A suite's fixture is only built if one of its benchmarks is selected.
+
+    Args:
+        name_filter (str, optional): The text to match; empty selects all.
+
+    Returns:
+        list: (name, callable) pairs in suite order.
+    """
+    benchmarks = []
+    for suite, build_fixture in ((HEADLESS_BENCHMARKS, headless_fixture), (GUI_BENCHMARKS, gui_fixture)):
+        selected = [(name, make) for name, make in suite if name_filter.lower() in name.lower()]
+        if not selected:
+            continue
+        fixture = build_fixture()
+        if fixture is None:
+            print("No display available: GUI benchmarks skipped.\n")
+            continue
+        benchmarks += [(name, make(fixture)) for name, make in selected]
+    return benchmarks
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """
+    Times a callable.
+
+    Args:
+        func (callable): The operation to time.
+        repeat (int, optional): Number of timing runs; the fastest counts.
+        min_time (float, optional): Minimum duration of one timing run in seconds.
+
+    Returns:
+        dict: {"per_op_s", "ops_per_s", "peak_bytes"}
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    per_op = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"per_op_s": per_op, "ops_per_s": 1 / per_op if per_op > 0 else float("inf"), "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (dict): {name: measure() result}
+        baseline (dict): The stored results in the same format.
+        threshold (float, optional): Allowed relative slowdown.
+
+    Returns:
+        dict: {name: relative change of per_op_s} for all benchmarks whose
+            time per operation grew by more than `threshold`.
+    """
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or base["per_op_s"] <= 0:
+            continue
+        change = result["per_op_s"] / base["per_op_s"] - 1
+        if change > threshold:
+            regressions[name] = change
+    return regressions
+
+
+def format_time(seconds):
+    """Formats a duration with a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def parse_args(argv=None):
+    """Parses the command-line arguments."""
+    parser = argparse.ArgumentParser(description="Run the weight and balance benchmark suite.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILEPATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"relative slowdown flagged as regression (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this text")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    benchmarks = select_benchmarks(args.filter)
+
+    try:
+        baseline = load_json_data(args.baseline)["results"]
+    except FileNotFoundError:
+        baseline = {}
+
+    results = {}
+    print(f"{'benchmark':48} {'per op':>10} {'ops/s':>12} {'peak mem':>10} {'vs base':>8}")
+    for name, func in benchmarks:
+        results[name] = result = measure(func)
+        base = baseline.get(name)
+        change = f"{result['per_op_s'] / base['per_op_s'] - 1:+.0%}" if base else "-"
+        print(f"{name:48} {format_time(result['per_op_s']):>10} {result['ops_per_s']:>12,.0f} "
+              f"{result['peak_bytes'] / 1024:>8.1f} K {change:>8}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, change in regressions.items():
+        print(f"REGRESSION: {name} is {change:.0%} slower than the baseline")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": {**baseline, **results}}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
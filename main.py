@@ -1,17 +1,27 @@
+import time
+_IMPORT_START = time.perf_counter()  # Reference point of the startup-time report
+
+import math
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib
+from tkinter import ttk, messagebox, filedialog, simpledialog
 
 from modules.passengers_module import SeatSelector
 from modules.cargo_module import CargoLoadSystem
 from modules.fuel_load_module import FuelLoadSystem
-from src.live_cg_plot import LiveCGPlot
+from src.plot_process import PlotProcessClient
 
 import src.config as config
 import src.calculations as calc
 import src.app_utils as utils
+from src.change_batch import ChangeNotifier
+from src.data_cache import load_compiled_data
+from src.envelope import DEFAULT_ENVELOPE
+from src.fleet import compare_fleet
+from src.fuel_burn import simulate_fuel_burn
+from src.instrumentation import PROFILER, timed
+from src.load_state import LoadState
+from src.pax_dispersion import simulate_pax_dispersion
 
-matplotlib.use('TkAgg')
 
 class AircraftSummaryApp:
     """
@@ -30,14 +40,22 @@ class AircraftSummaryApp:
         self.master = master
         self.master.title("Full Aircraft Load Summary")
 
+        self.startup_report = {}  # {phase: milliseconds}
+        self.startup_text = ""
+        self._startup_mark = _IMPORT_START
+        self._record_startup("imports")
+
         try:
-            self.weight_limits = utils.load_json_data(config.LIMITS_FILEPATH)
-            self.aircraft_ref_data = utils.load_json_data(config.AIRCRAFT_REFERENCE_FILEPATH)
+            # All data files with their prebuilt indexes, from the compiled cache
+            compiled_data = load_compiled_data()
+            self.weight_limits = compiled_data.limits
+            self.aircraft_ref_data = compiled_data.aircraft_ref
 
-            # Load data for UI modules
-            seat_map_data = utils.load_json_data(config.SEAT_MAP_FILEPATH)
-            cargo_data = utils.load_json_data(config.CARGO_POSITIONS_FILEPATH)
-            fuel_data = utils.load_json_data(config.FUEL_TANKS_FILEPATH)
+            # Data for UI modules
+            seat_map_data = compiled_data.seat_map
+            cargo_data = compiled_data.cargo_data
+            fuel_data = compiled_data.tank_data
+            self._record_startup("data_load")
 
         except FileNotFoundError as e:
             messagebox.showerror("Error", f"Failed to load data file: {e.filename}\nApplication will close.")
@@ -58,29 +76,121 @@ class AircraftSummaryApp:
 
 
         self.dow_options = self.aircraft_ref_data["dow_options"]
+        self.aircraft_by_reg = {d["reg"]: d for d in self.dow_options}
         self.selected_reg = tk.StringVar()
         self.selected_reg.set(self.dow_options[0]["reg"])
+        self.trip_fuel_var = tk.DoubleVar(value=0.0)  # Fuel burned until landing, kg
 
         self._update_after_id = None
+        self._diagnostics_after_id = None
+        self._plot_poll_after_id = None
+        self._summary_inputs = None  # Inputs of the last summary calculation
+        # Load changes schedule a debounced update; a batch() updates once at its end
+        self.changes = ChangeNotifier(self._schedule_load_change, flush=self._process_load_change)
+        PROFILER.enabled = config.INSTRUMENTATION_ENABLED
 
         # --- UI Setup ---
         self._build_ui_frames(master)
 
-        # --- Initialize UI Modules ---
-        self.seat_module = SeatSelector(self.pax_tab, seat_map_data)
-        self.cargo_module = CargoLoadSystem(self.cargo_tab, cargo_data)
-        self.fuel_module = FuelLoadSystem(self.fuel_tab, fuel_data)
+        # --- Headless load state, displayed by the UI modules ---
+        self.load_state = LoadState.from_compiled(compiled_data, self.config["fuel_density"])
+        self._cargo_data = cargo_data
+        self._fuel_data = fuel_data
 
-        self._register_callbacks()
+        # --- Initialize UI Modules ---
+        # Only the visible Passengers tab is built now; the other tabs are
+        # built on first selection (or right away if LAZY_STARTUP is off)
+        self.seat_module = SeatSelector(self.pax_tab, seat_map_data, load=self.load_state.pax,
+                                        on_change_callback=self.on_load_change)
+        self.cargo_module = None
+        self.fuel_module = None
+        self._tab_builders = {
+            str(self.cargo_tab): self._build_cargo_tab,
+            str(self.fuel_tab): self._build_fuel_tab,
+            str(self.config_tab): self.build_config_ui,
+            str(self.diagnostics_tab): self.build_diagnostics_ui,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
-        # Initialize live plot
-        self.live_plot = LiveCGPlot()
+        # The live plot (and matplotlib) is only loaded when first opened
+        self.live_plot = None
+        self._last_trace = None
+        self._last_burn = None  # Fuel burn curve points (TOW -> LW), None without trip fuel
 
         self._build_summary_panel(self.main_frame)
-        self.build_config_ui()
+        self._record_startup("ui_build")
+
+        if not config.LAZY_STARTUP:
+            self.build_all_tabs()
+            self.open_live_plot()
+            self._record_startup("eager_build")
 
         # Initial calculation, force plot update to show DOW
         self.calculate_aircraft_summary(update_plot=True)
+        self._record_startup("first_summary")
+        self.master.after_idle(self._report_startup)
+
+    def _record_startup(self, phase):
+        """Stores the time since the previous startup phase."""
+        now = time.perf_counter()
+        self.startup_report[phase] = (now - self._startup_mark) * 1000
+        self._startup_mark = now
+
+    def _report_startup(self):
+        """
+        Completes the startup-time report once the window is idle. It is shown
+        in the Diagnostics tab, and also printed when instrumentation is on.
+        """
+        self._record_startup("first_paint")
+        self.startup_report["total"] = (time.perf_counter() - _IMPORT_START) * 1000
+        mode = "lazy" if config.LAZY_STARTUP else "eager"
+        phases = ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_report.items())
+        self.startup_text = f"Startup ({mode}): {phases}"
+        if config.INSTRUMENTATION_ENABLED:
+            print(self.startup_text)
+
+    def _on_tab_changed(self, event):
+        """Builds a notebook tab the first time it is selected."""
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder:
+            builder()
+
+    def build_all_tabs(self):
+        """Builds all tabs that have not been built yet."""
+        for builder in list(self._tab_builders.values()):
+            builder()
+        self._tab_builders.clear()
+
+    def _build_cargo_tab(self):
+        """Creates the cargo module on its tab."""
+        self.cargo_module = CargoLoadSystem(self.cargo_tab, self._cargo_data, load=self.load_state.cargo,
+                                            on_change_callback=self.on_load_change, zfw_base=self.zfw_base)
+
+    def _build_fuel_tab(self):
+        """Creates the fuel module on its tab."""
+        self.fuel_module = FuelLoadSystem(self.fuel_tab, self._fuel_data, load=self.load_state.fuel,
+                                          on_change_callback=self.on_load_change)
+
+    def open_live_plot(self):
+        """Opens the live CG plot (or reopens it after its window was closed) and shows the current trace."""
+        if config.LIVE_PLOT_OUT_OF_PROCESS:
+            # The client restarts its renderer by itself after the window was closed
+            if self.live_plot is None:
+                # The renderer reports when each trace is drawn, which ends the click-to-plot span
+                self.live_plot = PlotProcessClient(span="click_to_plot")
+        else:
+            # Imported here so that matplotlib is only loaded when a plot is opened
+            import matplotlib.pyplot as plt
+            from src.live_cg_plot import LiveCGPlot
+            if self.live_plot is None or not plt.fignum_exists(self.live_plot.fig.number):
+                self.live_plot = LiveCGPlot()
+        if self._last_trace is not None:
+            self.live_plot.update_full_trace(self._last_trace, self._last_burn)
+
+    def reset_live_trace(self):
+        """Clears the live CG trace, if the plot is open."""
+        if self.live_plot is not None:
+            self.live_plot.reset_trace()
 
     def _build_ui_frames(self, master):
         """Helper method to create the main UI frames and notebook."""
@@ -88,8 +198,15 @@ class AircraftSummaryApp:
         pick_frame.pack(side=tk.TOP, fill=tk.X, padx=8, pady=6)
         tk.Label(pick_frame, text="Select Aircraft (Reg):", font=("Arial", 12, "bold")).pack(side=tk.LEFT, padx=10)
         tk.OptionMenu(pick_frame, self.selected_reg, *(d["reg"] for d in self.dow_options)).pack(side=tk.LEFT, padx=4)
+        tk.Label(pick_frame, text="Trip Fuel (kg):", font=("Arial", 12)).pack(side=tk.LEFT, padx=(20, 4))
+        trip_entry = tk.Entry(pick_frame, textvariable=self.trip_fuel_var, width=10)
+        trip_entry.pack(side=tk.LEFT)
+        trip_entry.bind("<Return>", lambda e: self.on_load_change())
+        trip_entry.bind("<FocusOut>", lambda e: self.on_load_change())
         tk.Button(pick_frame, text="Recalculate",
                   command=lambda: self.calculate_aircraft_summary(update_plot=True)).pack(side=tk.LEFT, padx=10)
+        tk.Button(pick_frame, text="Compare Fleet", command=self.show_fleet_comparison).pack(side=tk.LEFT, padx=4)
+        tk.Button(pick_frame, text="Pax Dispersion", command=self.pax_dispersion_popup).pack(side=tk.LEFT, padx=4)
 
         self.main_frame = tk.Frame(master)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -101,11 +218,13 @@ class AircraftSummaryApp:
         self.cargo_tab = tk.Frame(self.notebook)
         self.fuel_tab = tk.Frame(self.notebook)
         self.config_tab = tk.Frame(self.notebook)
+        self.diagnostics_tab = tk.Frame(self.notebook)
 
         self.notebook.add(self.pax_tab, text="Passengers")
         self.notebook.add(self.cargo_tab, text="Cargo")
         self.notebook.add(self.fuel_tab, text="Fuel")
         self.notebook.add(self.config_tab, text="Config")
+        self.notebook.add(self.diagnostics_tab, text="Diagnostics")
 
     def _build_summary_panel(self, parent_frame):
         """Helper method to create the right-hand summary panel."""
@@ -118,18 +237,14 @@ class AircraftSummaryApp:
                                                                                                               fill=tk.X)
         tk.Button(self.summary_frame, text="Show CG Envelope Chart",
                   command=self.show_cg_plot, font=("Arial", 12)).pack(pady=8, padx=8, fill=tk.X)
+        tk.Button(self.summary_frame, text="Show Live CG Plot",
+                  command=self.open_live_plot, font=("Arial", 12)).pack(pady=8, padx=8, fill=tk.X)
         tk.Button(self.summary_frame, text="Reset Live CG Trace",
-                  command=self.live_plot.reset_trace, font=("Arial", 12)).pack(pady=8, padx=8, fill=tk.X)
+                  command=self.reset_live_trace, font=("Arial", 12)).pack(pady=8, padx=8, fill=tk.X)
 
         self.output_box = tk.Text(self.summary_frame, width=64, height=46, font=("Consolas", 11), bg="#f9f9f9")
         self.output_box.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
 
-    def _register_callbacks(self):
-        """Links the on_change_callback from each module to the main app."""
-        self.seat_module.on_change_callback = self.on_load_change
-        self.cargo_module.on_change_callback = self.on_load_change
-        self.fuel_module.on_change_callback = self.on_load_change
-
     def build_config_ui(self):
         """Builds the configuration tab with all adjustable parameters."""
         row = 0
@@ -177,22 +292,115 @@ class AircraftSummaryApp:
                   font=("Arial", 12, "bold"), bg="#4CAF50", fg="white").grid(
             row=row, column=0, columnspan=3, pady=20, padx=10, sticky="ew")
 
+    def build_diagnostics_ui(self):
+        """Builds the diagnostics tab with the hot-path latency statistics."""
+        controls = tk.Frame(self.diagnostics_tab)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=6, pady=6)
+
+        self.instrumentation_var = tk.BooleanVar(value=PROFILER.enabled)
+        tk.Checkbutton(controls, text="Record timings", variable=self.instrumentation_var,
+                       command=self.toggle_instrumentation, font=("Arial", 11)).pack(side=tk.LEFT, padx=6)
+        tk.Button(controls, text="Reset", command=self.reset_diagnostics).pack(side=tk.LEFT, padx=6)
+        tk.Button(controls, text="Dump to File...", command=self.dump_diagnostics).pack(side=tk.LEFT, padx=6)
+
+        tk.Label(self.diagnostics_tab, text="Rolling latencies over the last "
+                                            f"{PROFILER.window} calls per stage (click_to_plot is end to end, "
+                                            "until the plot is drawn)",
+                 font=("Arial", 9), fg="gray").pack(anchor="w", padx=10)
+        self.diagnostics_box = tk.Text(self.diagnostics_tab, width=80, height=30, font=("Consolas", 10))
+        self.diagnostics_box.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.refresh_diagnostics()
+
+    def toggle_instrumentation(self):
+        """Switches the timing instrumentation on or off."""
+        PROFILER.enabled = self.instrumentation_var.get()
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        """Updates the diagnostics table, and keeps doing so every second while recording."""
+        if self._diagnostics_after_id:
+            self.master.after_cancel(self._diagnostics_after_id)
+            self._diagnostics_after_id = None
+
+        self.diagnostics_box.delete("1.0", tk.END)
+        if PROFILER.summary():
+            self.diagnostics_box.insert(tk.END, PROFILER.format_summary())
+        else:
+            self.diagnostics_box.insert(tk.END, "No timings recorded." if PROFILER.enabled
+                                        else "Timing instrumentation is off.")
+        if self.startup_text:
+            self.diagnostics_box.insert(tk.END, "\n\n" + self.startup_text)
+
+        if PROFILER.enabled:
+            self._diagnostics_after_id = self.master.after(1000, self.refresh_diagnostics)
+
+    def reset_diagnostics(self):
+        """Discards all recorded timings."""
+        PROFILER.reset()
+        self.refresh_diagnostics()
+
+    def dump_diagnostics(self):
+        """Writes the recorded timings to a JSON file chosen by the user."""
+        filepath = filedialog.asksaveasfilename(title="Dump Diagnostics",
+                                                initialfile=config.INSTRUMENTATION_DUMP_FILEPATH,
+                                                defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not filepath:
+            return
+        try:
+            PROFILER.dump(filepath)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not write diagnostics file:\n{e}")
+            return
+        messagebox.showinfo("Diagnostics", f"Timings written to:\n{filepath}")
+
     def on_load_change(self):
+        """
+        Called by the UI modules after a load change. Inside batch() the
+        update is deferred to the end of the batch.
+        """
+        PROFILER.start_span("click_to_plot")
+        self.changes.notify()
+
+    def batch(self):
+        """
+        Returns a context manager for a user action that changes several
+        loads, possibly across modules: all load changes inside it result
+        in exactly one recalculation and plot update, right at its end.
+        """
+        return self.changes.batch()
+
+    def _schedule_load_change(self):
         """
         Schedules a single update after a load change.
         This "debounces" rapid changes (e.g., holding a button).
         """
+        PROFILER.start_span("debounce_wait")
         if self._update_after_id:
             self.master.after_cancel(self._update_after_id)
-        self._update_after_id = self.master.after(150, self._process_load_change)
+        self._update_after_id = self.master.after(config.SUMMARY_DEBOUNCE_MS, self._process_load_change)
 
     def _process_load_change(self):
         """
-        The scheduled function that is called after a load change.
-        It recalculates the summary and updates the live plot.
+        The scheduled function that is called after a load change, or at
+        the end of a batch. It recalculates the summary and updates the
+        live plot.
         """
-        self._update_after_id = None
+        if self._update_after_id:
+            # Flushed by a batch before the debounced update ran
+            self.master.after_cancel(self._update_after_id)
+            self._update_after_id = None
+        PROFILER.end_span("debounce_wait")
         self.calculate_aircraft_summary(update_plot=True)
+        # A trace sent to the renderer process took the span over; it ends when drawn
+        PROFILER.end_span("click_to_plot")
+        if config.LIVE_PLOT_OUT_OF_PROCESS and self.live_plot is not None and not self._plot_poll_after_id:
+            self._poll_live_plot()
+
+    def _poll_live_plot(self):
+        """Collects the draw times from the plot renderer process while timed traces are pending."""
+        self._plot_poll_after_id = None
+        if self.live_plot is not None and self.live_plot.poll_drawn():
+            self._plot_poll_after_id = self.master.after(config.LIVE_PLOT_POLL_MS, self._poll_live_plot)
 
     def apply_config_changes(self):
         """
@@ -200,59 +408,63 @@ class AircraftSummaryApp:
         and recalculates the summary.
         """
         try:
-            # Update runtime config from UI variables
-            self.config["passenger_weight"] = self.passenger_weight_var.get()
-            self.config["fuel_density"] = self.fuel_density_var.get()
-            self.config["le_mac"] = self.le_mac_var.get()
-            self.config["mac_length"] = self.mac_length_var.get()
-            self.config["klm_reference_arm"] = self.klm_ref_arm_var.get()
+            # Read all inputs first, so that an invalid one changes nothing
+            new_config = {
+                "passenger_weight": self.passenger_weight_var.get(),
+                "fuel_density": self.fuel_density_var.get(),
+                "le_mac": self.le_mac_var.get(),
+                "mac_length": self.mac_length_var.get(),
+                "klm_reference_arm": self.klm_ref_arm_var.get(),
+            }
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Error", f"Invalid config input: {e}")
+            return
 
-            # --- Propagate changes to modules ---
+        # One recalculation and plot update at the end of the batch
+        with self.batch():
+            self.config.update(new_config)
 
-            # Sync fuel density to fuel module
-            self.fuel_module.fuel_density = self.config["fuel_density"]
-            # Trigger recalculation in fuel module for all loaded tanks
-            for tank in self.fuel_module.tank_data:
-                tname = tank["tank"]
-                if tname == "main_tanks_combined_table":
-                    continue
-                liters = self.fuel_module.state.get(tname, {}).get("liters", 0)
-                if liters > 0:
-                    self.fuel_module.set_liters(tank, liters)
-                    # set_liters calls update_summary, which triggers on_load_change
-                    # so we don't need to call it manually here.
+            # --- Propagate changes to modules ---
+            if self.fuel_module is None:
+                # Fuel tab not built yet: only the load state needs the new density
+                self.load_state.fuel.set_density(self.config["fuel_density"])
+            else:
+                self.fuel_module.apply_density(self.config["fuel_density"])
 
-        except ValueError as e:
-            messagebox.showerror("Error", f"Invalid config input: {e}")
-            return
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {e}")
-            return
+            # Passenger weight and MAC changes need a recalculation as well
+            self.on_load_change()
 
         messagebox.showinfo("Config Updated",
-                            "Configuration values successfully updated.\nRecalculating aircraft summary...")
-
-        # Force plot update after config change
-        self.calculate_aircraft_summary(update_plot=True)
+                            "Configuration values successfully updated.\nAircraft summary recalculated.")
 
-    def calculate_aircraft_summary(self, update_plot=False):
+    @timed("calculate_aircraft_summary")
+    def calculate_aircraft_summary(self, update_plot=False, force=False):
         """
         Performs the complete weight and balance calculation.
         This is the core logic of the application.
 
+        Nothing is recalculated if the registration, the config and the
+        change counters of the loads are the same as in the last run. The
+        load sections themselves are cached by the LoadState, so only the
+        changed ones are recomputed; the points and indices downstream of
+        them are a few additions and are always rebuilt.
+
         Args:
             update_plot (bool, optional): If True, the live CG plot will be
                                           updated with the new 4-point trace.
+            force (bool, optional): Recalculate even if nothing changed.
         """
         reg = self.selected_reg.get()
-        aircraft_ref = next((d for d in self.dow_options if d["reg"] == reg), self.dow_options[0])
-        dow_weight = aircraft_ref["dow_weight_kg"]
-        doi = aircraft_ref.get("doi", 0)
+        trip_fuel = self._trip_fuel()
+        inputs = (reg, trip_fuel, tuple(self.config.values()), self.load_state.versions())
+        if inputs == self._summary_inputs and not force:
+            if update_plot and self.live_plot is not None:
+                self.live_plot.update_full_trace(self._last_trace, self._last_burn)  # Re-shows a closed plot window
+            return
+        self._summary_inputs = inputs
 
-        # Get DOW arm from DOI
-        dow_arm = calc.calculate_arm_from_doi(
-            doi, dow_weight, self.config["klm_reference_arm"]
-        )
+        aircraft_ref = self.aircraft_by_reg.get(reg, self.dow_options[0])
+        dow_weight, dow_arm = self._dow(aircraft_ref)
         dow_moment = dow_weight * dow_arm
 
         # Point 1: DOW
@@ -260,11 +472,12 @@ class AircraftSummaryApp:
             dow_arm, self.config["le_mac"], self.config["mac_length"]
         )
 
-        # Get component loads from modules
-        pax_weight, pax_moment, pax_cg = self.seat_module.get_passenger_cg(
-            pax_weight=self.config["passenger_weight"])
-        cargo_weight, cargo_moment, cargo_cg = self.cargo_module.get_cargo_cg()
-        fuel_weight, fuel_moment, fuel_cg = self.fuel_module.get_fuel_cg()
+        # Get component loads from the load state (cached per section),
+        # the Cargo and Fuel tabs may not be built yet
+        loads = self.load_state.component_loads(pax_weight=self.config["passenger_weight"])
+        pax_weight, pax_moment, pax_cg = loads["pax"]
+        cargo_weight, cargo_moment, cargo_cg = loads["cargo"]
+        fuel_weight, fuel_moment, fuel_cg = loads["fuel"]
 
         # Point 2: DOW + Passengers
         dow_pax_weight = dow_weight + pax_weight
@@ -290,15 +503,29 @@ class AircraftSummaryApp:
             tow_cg, self.config["le_mac"], self.config["mac_length"]
         )
 
-        # Update live plot with the new sequential trace
-        if update_plot:
-            trace_points = [
-                (dow_mac, dow_weight),  # Point 1: DOW
-                (dow_pax_mac, dow_pax_weight),  # Point 2: DOW + Pax
-                (zfw_mac, zfw_weight),  # Point 3: ZFW
-                (tow_mac, tow_weight)  # Point 4: TOW
-            ]
-            self.live_plot.update_full_trace(trace_points)
+        # Update live plot with the new sequential trace. The trace is kept
+        # so that a live plot opened later starts with the current state.
+        trace_points = [
+            (dow_mac, dow_weight),  # Point 1: DOW
+            (dow_pax_mac, dow_pax_weight),  # Point 2: DOW + Pax
+            (zfw_mac, zfw_weight),  # Point 3: ZFW
+            (tow_mac, tow_weight)  # Point 4: TOW
+        ]
+        # Point 5: LW (TOW - trip fuel), with the fuel burn curve from TOW
+        burn_curve, burn_error = None, None
+        if trip_fuel > 0:
+            try:
+                burn_curve = simulate_fuel_burn(self.load_state.fuel, trip_fuel, zfw_weight, zfw_moment,
+                                                le_mac=self.config["le_mac"], mac_length=self.config["mac_length"])
+            except ValueError as e:
+                burn_error = str(e)
+        burn_points = burn_curve.trace() if burn_curve is not None else None
+
+        self._last_trace = trace_points
+        self._last_burn = burn_points
+        if update_plot and self.live_plot is not None:
+            with PROFILER.stage("plot.update_full_trace"):
+                self.live_plot.update_full_trace(trace_points, burn_points)
 
         # ========== CORRECTED KLM INDEX CALCULATIONS ==========
         ref_arm = self.config["klm_reference_arm"]
@@ -318,8 +545,22 @@ class AircraftSummaryApp:
 
         doi_value = aircraft_ref.get("doi", None)
 
-        # Check limits
-        breach_messages = calc.check_limits(zfw_weight, tow_weight, self.weight_limits)
+        # Check weight limits and the CG envelope
+        lw_weight = burn_curve.landing_weight if burn_curve is not None else None
+        lw_mac = burn_curve.landing_mac if burn_curve is not None else None
+        breach_messages = calc.check_limits(zfw_weight, tow_weight, self.weight_limits,
+                                            zfw_mac=zfw_mac, tow_mac=tow_mac, lw_weight=lw_weight, lw_mac=lw_mac)
+        zfw_envelope = DEFAULT_ENVELOPE.check(zfw_weight, zfw_mac)
+        tow_envelope = DEFAULT_ENVELOPE.check(tow_weight, tow_mac)
+        lateral = self.load_state.lateral_balance(pax_weight=self.config["passenger_weight"])
+        breach_messages += calc.check_lateral_balance(lateral["total"], lateral["fuel_imbalance"], tow_weight,
+                                                      lateral["main_fuel"], lw_weight=lw_weight)
+        if burn_error:
+            breach_messages.append(burn_error)
+        elif burn_curve is not None:
+            excursion = burn_curve.first_excursion()
+            if excursion is not None:
+                breach_messages.append(f"Fuel burn: CG leaves the envelope after {excursion:.0f} kg burned.")
 
         limits_section = ""
         if breach_messages:
@@ -327,7 +568,7 @@ class AircraftSummaryApp:
             for msg in breach_messages:
                 limits_section += "- " + msg + "\n"
         else:
-            limits_section += "\nAll gross weight limits within certified ranges.\n"
+            limits_section += "\nAll gross weight and CG limits within certified ranges.\n"
 
         # Build summary string
         summary_str = f"Selected Aircraft: {reg}\n\n"
@@ -337,7 +578,11 @@ class AircraftSummaryApp:
         summary_str += f"Cargo:               {cargo_weight:.1f} kg   Moment: {cargo_moment:.1f}\n"
         summary_str += f"Fuel:                {fuel_weight:.1f} kg   Moment: {fuel_moment:.1f}\n\n"
         summary_str += f"ZERO FUEL WEIGHT:    {zfw_weight:.1f} kg   ZFW CG: {zfw_cg:.2f} in (%MAC: {zfw_mac:.2f})\n"
-        summary_str += f"TAKEOFF WEIGHT:      {tow_weight:.1f} kg   TOW CG: {tow_cg:.2f} in (%MAC: {tow_mac:.2f})\n\n"
+        summary_str += f"TAKEOFF WEIGHT:      {tow_weight:.1f} kg   TOW CG: {tow_cg:.2f} in (%MAC: {tow_mac:.2f})\n"
+        if burn_curve is not None:
+            summary_str += (f"LANDING WEIGHT:      {lw_weight:.1f} kg   LW CG: {burn_curve.landing_arm:.2f} in "
+                            f"(%MAC: {lw_mac:.2f})   Trip fuel: {trip_fuel:.1f} kg\n")
+        summary_str += "\n"
         summary_str += f"KLM INDEX (CGI) [ref {ref_arm} in]:\n"
         summary_str += f"  ZFW Index:         {klm_all_zfw:.2f}\n"
         summary_str += f"  TOW Index:         {klm_all_tow:.2f}\n"
@@ -348,11 +593,25 @@ class AircraftSummaryApp:
         summary_str += f"  Pax Δ Index:       {klm_pax:+.2f}\n"
         summary_str += f"  Cargo Δ Index:     {klm_car:+.2f}\n"
         summary_str += f"  Fuel Δ Index:      {klm_fuel:+.2f}\n"
+        summary_str += "\nCG Envelope Margins (%MAC, fwd / aft):\n"
+        summary_str += f"  ZFW:               {zfw_envelope['forward_margin']:.2f} / {zfw_envelope['aft_margin']:.2f}\n"
+        summary_str += f"  TOW:               {tow_envelope['forward_margin']:.2f} / {tow_envelope['aft_margin']:.2f}\n"
+        if burn_curve is not None:
+            summary_str += (f"  LW:                {burn_curve.forward_margin[-1]:.2f} / "
+                            f"{burn_curve.aft_margin[-1]:.2f}\n")
+            burn_fwd, burn_aft = burn_curve.min_margins()
+            summary_str += f"  Burn (min):        {burn_fwd:.2f} / {burn_aft:.2f}\n"
+        summary_str += "\nLateral Balance (kg-in, + = right, estimated arms):\n"
+        summary_str += f"  Pax / Fuel:        {lateral['pax']:+.0f} / {lateral['fuel']:+.0f}\n"
+        summary_str += (f"  Total:             {lateral['total']:+.0f}   "
+                        f"Limit: {calc.lateral_imbalance_limit(tow_weight):.0f}\n")
+        summary_str += f"  Fuel imbalance:    {lateral['fuel_imbalance']:+.1f} kg (MT2 - MT1)\n"
         summary_str += "\n---------------------------------------------\n"
         summary_str += limits_section
 
-        self.output_box.delete("1.0", tk.END)
-        self.output_box.insert(tk.END, summary_str)
+        with PROFILER.stage("summary.text_update"):
+            self.output_box.delete("1.0", tk.END)
+            self.output_box.insert(tk.END, summary_str)
 
         # Store last values for the static plot
         self._last_zfw_mac = zfw_mac
@@ -360,6 +619,132 @@ class AircraftSummaryApp:
         self._last_tow_mac = tow_mac
         self._last_tow_weight = tow_weight
 
+    def _dow(self, aircraft_ref):
+        """Returns the DOW weight (kg) and arm (in) of an aircraft, the arm from its DOI."""
+        dow_weight = aircraft_ref["dow_weight_kg"]
+        dow_arm = calc.calculate_arm_from_doi(
+            aircraft_ref.get("doi", 0), dow_weight, self.config["klm_reference_arm"]
+        )
+        return dow_weight, dow_arm
+
+    def zfw_base(self):
+        """
+        Returns the weight (kg) and moment (kg-in) of the selected aircraft
+        with its passengers but without cargo, the base of the cargo
+        auto-loader's ZFW.
+        """
+        reg = self.selected_reg.get()
+        aircraft_ref = self.aircraft_by_reg.get(reg, self.dow_options[0])
+        dow_weight, dow_arm = self._dow(aircraft_ref)
+        pax_weight, pax_moment, _ = self.load_state.component_loads(pax_weight=self.config["passenger_weight"])["pax"]
+        return dow_weight + pax_weight, dow_weight * dow_arm + pax_moment
+
+    def _trip_fuel(self):
+        """Returns the trip fuel input in kg, 0 if it is empty or invalid."""
+        try:
+            return max(float(self.trip_fuel_var.get()), 0.0)
+        except (ValueError, tk.TclError):
+            return 0.0
+
+    def show_fleet_comparison(self):
+        """
+        Shows the current load on every registration of the fleet, ranked
+        by envelope margin. Double-clicking a tail selects it.
+        """
+        loads = self.load_state.component_loads(pax_weight=self.config["passenger_weight"])
+        pax, cargo, fuel = ((w, m) for w, m, _ in (loads["pax"], loads["cargo"], loads["fuel"]))
+
+        # The fuel left at landing is the same for every tail
+        landing_fuel = None
+        trip_fuel = self._trip_fuel()
+        if trip_fuel > 0:
+            zfw_weight, zfw_moment = self.zfw_base()
+            zfw_weight, zfw_moment = zfw_weight + cargo[0], zfw_moment + cargo[1]
+            try:
+                curve = simulate_fuel_burn(self.load_state.fuel, trip_fuel, zfw_weight, zfw_moment,
+                                           le_mac=self.config["le_mac"], mac_length=self.config["mac_length"])
+                landing_fuel = (curve.weight[-1] - zfw_weight, curve.moment[-1] - zfw_moment)
+            except ValueError as e:
+                messagebox.showwarning("Fleet Comparison", f"Landing weight skipped: {e}")
+
+        records = compare_fleet(self.dow_options, pax, cargo, fuel, self.weight_limits, landing_fuel=landing_fuel,
+                                le_mac=self.config["le_mac"], mac_length=self.config["mac_length"],
+                                reference_arm=self.config["klm_reference_arm"])
+
+        popup = tk.Toplevel(self.master)
+        popup.title("Fleet Comparison")
+        columns = ("rank", "reg", "dow", "doi", "zfw", "tow", "lw", "margin", "limiting", "status")
+        headings = ("#", "Reg", "DOW (kg)", "DOI", "ZFW %MAC", "TOW %MAC", "LW %MAC", "Margin", "Limiting", "Status")
+        tree = ttk.Treeview(popup, columns=columns, show="headings", height=len(records))
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=90 if column in ("limiting", "status") else 70, anchor=tk.CENTER)
+        for rank, record in enumerate(records, 1):
+            mac = record["mac"]
+            tree.insert("", tk.END, iid=record["reg"], values=(
+                rank, record["reg"], f"{record['dow_weight']:.0f}", f"{record['doi']:.1f}",
+                f"{mac['zfw']:.2f}", f"{mac['tow']:.2f}", f"{mac['lw']:.2f}" if "lw" in mac else "-",
+                f"{record['margin']:.2f}" if math.isfinite(record["margin"]) else "OUT",
+                record["limiting"], "OK" if record["within_limits"] else f"{len(record['breaches'])} breach(es)"))
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def select(_event):
+            reg = tree.focus()
+            if reg:
+                self.selected_reg.set(reg)
+                self.calculate_aircraft_summary(update_plot=True)
+        tree.bind("<Double-1>", select)
+
+    def pax_dispersion_popup(self):
+        """Asks for the unassigned passengers per class and shows their CG dispersion."""
+        counts = {}
+        for cabin_class, name in (("F", "Business"), ("Y", "Economy")):
+            count = simpledialog.askinteger("Pax Dispersion", f"Unassigned {name} passengers:",
+                                            initialvalue=0, minvalue=0)
+            if count is None:
+                return  # User Cancelled
+            counts[cabin_class] = count
+        try:
+            result = self.pax_dispersion(counts)
+        except ValueError as e:
+            messagebox.showerror("Pax Dispersion", str(e))
+            return
+
+        text = (f"{result.n_draws} random seatings (seed {config.PAX_DISPERSION_SEED}) of "
+                f"{counts['F']} Business and {counts['Y']} Economy passengers.\n")
+        for point in ("zfw", "tow"):
+            stats = result.stats(point)
+            percentiles = ", ".join(f"P{p}: {v:.2f}" for p, v in stats["percentiles"].items())
+            text += (f"\n{point.upper()} {result.weight[point]:.1f} kg\n"
+                     f"  Mean: {stats['mean']:.2f} %MAC   Std: {stats['std']:.2f}\n"
+                     f"  {percentiles}\n"
+                     f"  Out of envelope: {stats['p_out'] * 100:.2f} %\n")
+        messagebox.showinfo("Pax Dispersion", text)
+
+    def pax_dispersion(self, counts, n_draws=config.PAX_DISPERSION_DRAWS):
+        """
+        Simulates random seatings of unassigned passengers on top of the
+        current load of the selected aircraft. Seats already selected are
+        kept and not drawn.
+
+        Args:
+            counts (dict): {class: number of unassigned passengers}
+            n_draws (int, optional): The number of random seatings.
+
+        Returns:
+            PaxDispersion: The ZFW and TOW CG of every draw.
+        """
+        loads = self.load_state.component_loads(pax_weight=self.config["passenger_weight"])
+        cargo_weight, cargo_moment, _ = loads["cargo"]
+        fuel_weight, fuel_moment, _ = loads["fuel"]
+        base_weight, base_moment = self.zfw_base()
+        with PROFILER.stage("pax.dispersion"):
+            return simulate_pax_dispersion(
+                self.load_state.pax.seat_index, counts, base_weight + cargo_weight, base_moment + cargo_moment,
+                fuel_weight, fuel_moment, occupied=self.load_state.pax.mask, n_draws=n_draws,
+                pax_weight=self.config["passenger_weight"], le_mac=self.config["le_mac"],
+                mac_length=self.config["mac_length"])
+
     def show_cg_plot(self):
         """
         Displays the static CG envelope plot with the last calculated
@@ -368,6 +753,10 @@ class AircraftSummaryApp:
         if not hasattr(self, '_last_zfw_mac'):
             self.calculate_aircraft_summary(update_plot=False)
 
+        # Imported here so that matplotlib is only loaded when a plot is opened
+        import matplotlib
+        matplotlib.use('TkAgg')
+
         # MODIFIED: Call function from utils
         utils.plot_cg_envelope(
             self._last_zfw_mac,
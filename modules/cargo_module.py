@@ -3,16 +3,21 @@ from tkinter import messagebox, simpledialog
 
 import src.config as config
 from src.app_utils import load_json_data
+from src.cargo_planner import parse_manifest, plan_cargo
+from src.change_batch import ChangeNotifier
+from src.instrumentation import PROFILER
+from src.load_state import CargoLoad
 
 
 class CargoLoadSystem:
     """
     A tkinter GUI module for managing cargo loads in ULD (Unit Load Device)
-    slots, handling container/pallet blocking logic, and calculating
-    the resulting cargo weight and moment.
+    slots. The loads, the container/pallet blocking logic and the cargo
+    weight and moment are kept in a headless CargoLoad; this class is a
+    view over it.
     """
 
-    def __init__(self, master, cargo_data, on_change_callback=None):
+    def __init__(self, master, cargo_data, on_change_callback=None, load=None, zfw_base=None):
         """
         Initializes the CargoLoadSystem widget.
 
@@ -21,12 +26,20 @@ class CargoLoadSystem:
             cargo_data (list): The list of dictionaries defining cargo slots.
             on_change_callback (callable, optional): A function to call
                 whenever the cargo load changes.
+            load (CargoLoad, optional): The cargo state to display.
+                A new one is created from cargo_data if not given.
+            zfw_base (callable, optional): Returns (weight, moment) of the
+                aircraft without cargo, for the auto-loader's ZFW target.
         """
         self.master = master
         self.cargo_data = cargo_data
-        self.state = {}  # Tracks loaded weights {key: {"weight": w, "ULD_type": t}}
+        self.load = load if load is not None else CargoLoad(cargo_data)
+        self.index = self.load.index
         self.buttons = {}  # Stores button widgets {key: (load_btn, max_btn, custom_btn)}
         self.on_change_callback = on_change_callback
+        self.zfw_base = zfw_base
+        self.target_mac = config.CARGO_PLANNER_TARGET_MAC  # Last auto-loader target
+        self.changes = ChangeNotifier(self._trigger_callback)
         self.create_widgets()
         self.update_all_blocks()  # Initial update to set UI state
 
@@ -86,6 +99,7 @@ class CargoLoadSystem:
 
         # Control buttons
         tk.Button(self.frame, text="Load Max Weight to All (Containers only)", command=self.load_max_all).pack(pady=10)
+        tk.Button(self.frame, text="Auto-Load Manifest", command=self.auto_load_popup).pack(pady=5)
         tk.Button(self.frame, text="End & Export Results", command=self.export_results).pack(pady=10)
         tk.Button(self.frame, text="Deselect All", command=self.deselect_all).pack(pady=5)
 
@@ -113,11 +127,23 @@ class CargoLoadSystem:
 
         self.buttons[key] = (btn_load, btn_max, btn_custom)
 
+    @property
+    def state(self):
+        """The loaded weights {key: {"weight": w, "ULD_type": t}}."""
+        return self.load.state
+
     def _trigger_callback(self):
         """Safely triggers the on_change_callback if it exists."""
         if self.on_change_callback:
             self.on_change_callback()
 
+    def batch(self):
+        """
+        Returns a context manager that groups several slot changes into a
+        single change notification at its end.
+        """
+        return self.changes.batch()
+
     def on_frame_configure(self, event):
         """Updates the canvas scroll region when the inner frame size changes."""
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -129,16 +155,16 @@ class CargoLoadSystem:
         Args:
             key (tuple): (compartment, position) of the slot.
         """
-        slot = next(s for s in self.cargo_data if (s['compartment'], s['position']) == key)
-        allowed_ULDs = slot.get("allowed_ULDs", [])
-        if not allowed_ULDs:
-            messagebox.showwarning("No ULD", f"No allowed ULDs for {key[1]} in {key[0]}")
-            return
+        if self._load_max(key):
+            self.update_blocks_for(key)
+            self.changes.notify()
 
-        max_uld = allowed_ULDs[0]  # Use the first ULD as default
-        self.state[key] = {"weight": max_uld["max_kg"], "ULD_type": max_uld["type"]}
-        self.update_all_blocks()
-        self._trigger_callback()
+    def _load_max(self, key):
+        """Loads the default ULD at max weight; warns and returns False if the slot allows none."""
+        if self.load.load_max(key) is None:  # Uses the first ULD as default
+            messagebox.showwarning("No ULD", f"No allowed ULDs for {key[1]} in {key[0]}")
+            return False
+        return True
 
     def custom_weight_input(self, key):
         """
@@ -147,13 +173,11 @@ class CargoLoadSystem:
         Args:
             key (tuple): (compartment, position) of the slot.
         """
-        slot = next(s for s in self.cargo_data if (s['compartment'], s['position']) == key)
-        allowed_ULDs = slot.get("allowed_ULDs", [])
-        if not allowed_ULDs:
+        max_uld = self.load.default_uld(key)
+        if max_uld is None:
             messagebox.showwarning("No ULD", f"No allowed ULDs for {key[1]} in {key[0]}")
             return
 
-        max_uld = allowed_ULDs[0]
         input_val = simpledialog.askfloat("Custom Weight",
                                           f"Enter weight (kg) for slot {key[1]} (max {max_uld['max_kg']} kg):",
                                           minvalue=0, maxvalue=max_uld['max_kg'])
@@ -162,32 +186,68 @@ class CargoLoadSystem:
 
         weight = round(input_val, 1)
         # Note: simpledialog askfloat already enforces maxvalue
-        self.state[key] = {"weight": weight, "ULD_type": max_uld["type"]}
+        self.load.set_load(key, {"weight": weight, "ULD_type": max_uld["type"]})
+        self.update_blocks_for(key)
+        self.changes.notify()
+
+    def auto_load_popup(self):
+        """Asks for a ULD manifest and a target ZFW CG, then loads the manifest."""
+        if self.zfw_base is None:
+            messagebox.showwarning("Auto-Load", "The auto-loader needs the aircraft weight without cargo.")
+            return
+        text = simpledialog.askstring("Auto-Load Manifest",
+                                      "Enter the ULDs as 'type weight', separated by commas\n"
+                                      "(e.g. P1 4200, LD-3 1100, Half Pallet 2000):")
+        if not text:
+            return  # User Cancelled
+        target_mac = simpledialog.askfloat("Auto-Load Manifest", "Target ZFW CG (%MAC):",
+                                           initialvalue=self.target_mac)
+        if target_mac is None:
+            return
+        try:
+            plan = self.auto_load(parse_manifest(text), target_mac)
+        except ValueError as e:
+            messagebox.showerror("Auto-Load", str(e))
+            return
+        note = "" if plan.complete else "\n(Search limit reached, best plan found so far.)"
+        messagebox.showinfo("Auto-Load", f"Loaded {len(plan.assignment)} ULDs, {plan.cargo_weight:.1f} kg.\n"
+                                         f"ZFW CG: {plan.zfw_mac:.2f} %MAC (target {target_mac:.2f}){note}")
+
+    def auto_load(self, manifest, target_mac):
+        """
+        Assigns a manifest of ULDs to the positions so that the ZFW CG comes
+        closest to a target, replacing the current cargo load.
+
+        Args:
+            manifest (list): [{"ULD_type": t, "weight": w}, ...]
+            target_mac (float): The target ZFW CG in %MAC.
+
+        Returns:
+            CargoPlan: The loaded plan.
+
+        Raises:
+            ValueError: If the manifest cannot be loaded.
+        """
+        base_weight, base_moment = self.zfw_base()
+        with PROFILER.stage("cargo.auto_load"):
+            plan = plan_cargo(manifest, self.index, base_weight, base_moment, target_mac)
+        self.target_mac = target_mac
+        self.load.assign(plan.assignment)
         self.update_all_blocks()
-        self._trigger_callback()
+        self.changes.notify()
+        return plan
 
     def load_max_all(self):
         """Loads max weight to all CONTAINER slots. Skips pallet slots."""
-        for slot in self.cargo_data:
-            key = (slot['compartment'], slot['position'])
-            if "blocks" in slot:
-                continue  # Skip pallet slots
-
-            allowed_ULDs = slot.get("allowed_ULDs", [])
-            if allowed_ULDs:
-                max_uld = allowed_ULDs[0]
-                self.state[key] = {"weight": max_uld["max_kg"], "ULD_type": max_uld["type"]}
-            else:
-                self.state[key] = None  # No ULD, ensure it's empty
-
+        self.load.load_max_all()
         self.update_all_blocks()
-        self._trigger_callback()
+        self.changes.notify()
 
     def deselect_all(self):
         """Clears all cargo slots."""
-        self.state.clear()  # More efficient than looping
+        self.load.clear()
         self.update_all_blocks()
-        self._trigger_callback()
+        self.changes.notify()
 
     def toggle_load(self, key):
         """
@@ -197,12 +257,12 @@ class CargoLoadSystem:
             key (tuple): (compartment, position) of the slot.
         """
         if self.state.get(key):
-            self.state[key] = None  # Deselect
-        else:
-            self.load_max_weight(key)  # Select (load max)
+            self.load.set_load(key, None)  # Deselect
+        elif not self._load_max(key):  # Select (load max)
+            return
 
-        self.update_all_blocks()
-        self._trigger_callback()
+        self.update_blocks_for(key)
+        self.changes.notify()
 
     def update_all_blocks(self):
         """
@@ -211,55 +271,51 @@ class CargoLoadSystem:
         - Disables pallet slots if a container is loaded above them.
         - Updates button colors for loaded slots.
         """
-        blocked_keys = set()
-
-        # Check for blocking
-        for key, load in self.state.items():
-            if not load:
-                continue
-
-            try:
-                slot = next(s for s in self.cargo_data if (s['compartment'], s['position']) == key)
-            except StopIteration:
-                continue  # Slot not found?
-
-            if "blocks" in slot:
-                # This is a PALLET. It blocks all containers listed in "blocks".
-                for pos in slot["blocks"]:
-                    blocked_keys.add((slot['compartment'], pos))
-            else:
-                # This is a CONTAINER. Check if it's blocked by any loaded pallet.
-                for pallet_slot in self.cargo_data:
-                    if "blocks" in pallet_slot and key[1] in pallet_slot["blocks"]:
-                        # This container is part of a pallet's footprint
-                        pallet_key = (pallet_slot['compartment'], pallet_slot['position'])
-                        if self.state.get(pallet_key):
-                            # The pallet is loaded, so this container is blocked
-                            blocked_keys.add(key)
-                            break
-
-        # Update UI state for all buttons
-        for key, (btn_load, btn_max, btn_custom) in self.buttons.items():
-            load_data = self.state.get(key)
-
-            if key in blocked_keys:
-                # This slot is blocked by another
-                btn_load.config(state=tk.DISABLED, bg="lightgray", text="Blocked")
-                btn_max.config(state=tk.DISABLED)
-                btn_custom.config(state=tk.DISABLED)
-            elif load_data:
-                # This slot is loaded
-                btn_load.config(state=tk.NORMAL, bg="limegreen", text=f"{load_data['weight']} kg")
-                btn_max.config(state=tk.NORMAL)
-                btn_custom.config(state=tk.NORMAL)
-            else:
-                # This slot is empty and available
-                btn_load.config(state=tk.NORMAL, bg="SystemButtonFace", text="Select/Deselect")
-                btn_max.config(state=tk.NORMAL)
-                btn_custom.config(state=tk.NORMAL)
+        with PROFILER.stage("cargo.update_all_blocks"):
+            self.load.recompute_blocks()
+            for key in self.buttons:
+                self._refresh_slot(key)
+
+        self.update_summary()
+
+    def update_blocks_for(self, key):
+        """
+        Refreshes the UI after a single slot changed. The CargoLoad already
+        re-applied the blocking logic; only the slot itself and its
+        neighbours in the blocking graph are touched.
+
+        Args:
+            key (tuple): (compartment, position) of the slot that changed.
+        """
+        with PROFILER.stage("cargo.update_blocks_for"):
+            for k in (key, *self.index.neighbours(key)):
+                self._refresh_slot(k)
 
         self.update_summary()
 
+    def _refresh_slot(self, key):
+        """Updates the buttons of a single slot to its loaded/blocked state."""
+        if key not in self.buttons:
+            return
+        btn_load, btn_max, btn_custom = self.buttons[key]
+        load_data = self.state.get(key)
+
+        if key in self.load.blocked:
+            # This slot is blocked by another
+            btn_load.config(state=tk.DISABLED, bg="lightgray", text="Blocked")
+            btn_max.config(state=tk.DISABLED)
+            btn_custom.config(state=tk.DISABLED)
+        elif load_data:
+            # This slot is loaded
+            btn_load.config(state=tk.NORMAL, bg="limegreen", text=f"{load_data['weight']} kg")
+            btn_max.config(state=tk.NORMAL)
+            btn_custom.config(state=tk.NORMAL)
+        else:
+            # This slot is empty and available
+            btn_load.config(state=tk.NORMAL, bg="SystemButtonFace", text="Select/Deselect")
+            btn_max.config(state=tk.NORMAL)
+            btn_custom.config(state=tk.NORMAL)
+
     def update_summary(self):
         """Recalculates and displays the total cargo weight, moment, and CG."""
         total_weight, total_moment, cg = self.get_cargo_cg()
@@ -278,25 +334,7 @@ class CargoLoadSystem:
                 - total_moment (kg-in)
                 - cg (inches)
         """
-        total_weight = 0
-        total_moment = 0
-        for key, load in self.state.items():
-            if not load:
-                continue
-
-            try:
-                slot = next(s for s in self.cargo_data if (s['compartment'], s['position']) == key)
-            except StopIteration:
-                print(f"Warning: Slot data for {key} not found in get_cargo_cg")
-                continue
-
-            arm = slot.get("arm_in", 0)
-            weight = load['weight']
-            total_weight += weight
-            total_moment += weight * arm
-
-        cg = total_moment / total_weight if total_weight > 0 else 0
-        return total_weight, total_moment, cg
+        return self.load.get_cg()
 
     def export_results(self):
         """Shows a message box with a summary of the current cargo load."""
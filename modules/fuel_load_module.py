@@ -4,17 +4,20 @@ from tkinter import messagebox, simpledialog
 
 # --- Local Imports ---
 import src.config as config
-from src.calculations import interpolate_arm
+from src.load_state import FuelLoad, COMBINED_STATE_NAME, COMBINED_TABLE_NAME, MAIN_TANK_NAMES
 from src.app_utils import load_json_data
+from src.change_batch import ChangeNotifier
+from src.instrumentation import PROFILER
 
 
 class FuelLoadSystem:
     """
-    A tkinter GUI module for managing fuel load across multiple tanks,
-    calculating individual and total fuel weight, moment, and CG.
+    A tkinter GUI module for managing fuel load across multiple tanks.
+    The liters per tank and the fuel weight, moment, and CG are kept in a
+    headless FuelLoad; this class is a view over it.
     """
 
-    def __init__(self, master, tank_data, on_change_callback=None):
+    def __init__(self, master, tank_data, on_change_callback=None, load=None):
         """
         Initializes the FuelLoadSystem widget.
 
@@ -23,16 +26,22 @@ class FuelLoadSystem:
             tank_data (list): The list of dictionaries defining the fuel tanks.
             on_change_callback (callable, optional): A function to call
                 whenever the fuel load changes.
+            load (FuelLoad, optional): The fuel state to display.
+                A new one is created from tank_data if not given.
         """
         self.master = master
         self.tank_data = tank_data
-        self.state = {}  # Stores current load {tname: {"liters": l, "arm": a, "weight": w}}
+        self.load = load if load is not None else FuelLoad(tank_data)
         self.widgets = {}  # Stores UI widgets for each tank
 
-        self.fuel_density = config.DEFAULT_FUEL_DENSITY_KG_L  # Set initial density from config
-
         self.on_change_callback = on_change_callback
+        # A change refreshes the summary, which notifies the main app
+        self.changes = ChangeNotifier(self.update_summary)
         self.create_widgets()
+        # Show tanks that were already filled in the load state
+        for tname in self.load.tank_names:
+            if self.state.get(tname, {}).get("liters"):
+                self._show_tank(tname)
         self.update_summary()  # Initial summary calculation
 
     def create_widgets(self):
@@ -56,7 +65,7 @@ class FuelLoadSystem:
         for tank in self.tank_data:
             tname = tank["tank"]
             # SKIP backend-only combined tank table from UI
-            if tname == "main_tanks_combined_table":
+            if tname == COMBINED_TABLE_NAME:
                 continue
 
             widget = {}
@@ -84,6 +93,7 @@ class FuelLoadSystem:
         # Control buttons
         btn_frame = tk.Frame(self.frame)
         btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Set Total Fuel (kg)", command=self.set_total_fuel_popup).pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="Set Fuel Density", command=self.set_density).pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="Deselect All", command=self.deselect_all).pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="End & Export Results", command=self.export_results).pack(pady=10)
@@ -92,11 +102,32 @@ class FuelLoadSystem:
         self.summary_label = tk.Label(self.frame, text="Total: ...", font=("Arial", 13))
         self.summary_label.pack(pady=10)
 
+    @property
+    def state(self):
+        """The current load {tname: {"liters": l, "arm": a, "weight": w}}."""
+        return self.load.state
+
+    @property
+    def fuel_density(self):
+        """The fuel density in kg/L."""
+        return self.load.density
+
+    @fuel_density.setter
+    def fuel_density(self, density):
+        self.load.density = density
+
     def _trigger_callback(self):
         """Safely triggers the on_change_callback if it exists."""
         if self.on_change_callback:
             self.on_change_callback()
 
+    def batch(self):
+        """
+        Returns a context manager that groups several tank changes into a
+        single summary update and change notification at its end.
+        """
+        return self.changes.batch()
+
     def on_frame_configure(self, event):
         """Updates the canvas scroll region when the inner frame size changes."""
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -111,34 +142,34 @@ class FuelLoadSystem:
                                         minvalue=0.7309, maxvalue=0.8507,
                                         initialvalue=self.fuel_density)
         if density:
-            self.fuel_density = density
             messagebox.showinfo("Density Set", f"Fuel density set to {density:.4f} kg/L")
-            # Re-calculate all tanks based on new density
-            for tank in self.tank_data:
-                tname = tank["tank"]
-                if tname == "main_tanks_combined_table":
-                    continue
+            self.apply_density(density)
 
-                liters = self.state.get(tname, {}).get("liters", 0)
-                self.set_liters(tank, liters)  # This will update state and UI
+    def apply_density(self, density):
+        """
+        Sets the fuel density and recalculates all tank weights, with a
+        single summary update.
 
-            # No need to call update_summary() here, as set_liters() does it.
+        Args:
+            density (float): The fuel density in kg/L.
+        """
+        with self.batch():
+            self.load.set_density(density)
+            for tname in self.load.tank_names:
+                self._show_tank(tname)
+            self.changes.notify()
 
     def deselect_all(self):
         """Sets all fuel tanks to 0 liters."""
-        for tank in self.tank_data:
-            tname = tank["tank"]
-            if tname == "main_tanks_combined_table":
-                continue
-
-            self.state[tname] = {"liters": 0, "arm": 0, "weight": 0}
+        self.load.clear()
+        for tname in self.load.tank_names:
             w = self.widgets[tname]
             w["entry"].delete(0, tk.END)
             w["entry"].insert(0, "0")
             w["arm_label"].config(text="Arm: --")
             w["kg_label"].config(text="Weight: --")
 
-        self.update_summary()  # Update summary once after all changes
+        self.changes.notify()  # Update summary once after all changes
 
     def set_liters_popup(self, tank):
         """
@@ -153,6 +184,31 @@ class FuelLoadSystem:
         if val is not None:
             self.set_liters(tank, val)
 
+    def set_total_fuel_popup(self):
+        """Opens a dialog to distribute a total fuel weight over the tanks."""
+        capacity = self.load.schedule.capacity_kg(self.fuel_density)
+        total_kg = simpledialog.askfloat("Total Fuel",
+                                         f"Enter total fuel (kg), loaded mains first, then center "
+                                         f"(max {capacity:.0f} kg at {self.fuel_density:.4f} kg/L):",
+                                         minvalue=0, maxvalue=capacity)
+        if total_kg is not None:
+            self.set_total_fuel(total_kg)
+
+    def set_total_fuel(self, total_kg):
+        """
+        Distributes a total fuel weight over the tanks in the standard
+        loading order, with a single summary update.
+
+        Args:
+            total_kg (float): Total fuel in kg at the current density.
+        """
+        with self.batch():
+            with PROFILER.stage("fuel.set_total_fuel"):
+                self.load.distribute(total_kg)
+                for tname in self.load.tank_names:
+                    self._show_tank(tname)
+            self.changes.notify()
+
     def set_liters(self, tank, liters):
         """
         Sets the liter amount for a tank and recalculates its arm and weight.
@@ -161,82 +217,40 @@ class FuelLoadSystem:
             tank (dict): The tank data dictionary.
             liters (float): The amount of fuel in liters.
         """
-        liters = round(liters, 1)
         tname = tank["tank"]
+        with PROFILER.stage("fuel.set_liters"):
+            self.load.set_liters(tname, liters)
+            self._show_tank(tname)
 
-        # Call the imported interpolate_arm function
-        arm = interpolate_arm(tank["arm_table"], liters)
-        # ---
-
-        kg = round(liters * self.fuel_density, 1)
-
-        # Update the internal state
-        self.state[tname] = {"liters": liters, "arm": arm, "weight": kg}
+        self.changes.notify()  # Update totals
 
-        # Update UI display
+    def _show_tank(self, tname):
+        """Updates the widgets of a tank to its state in the FuelLoad."""
+        tank_state = self.state[tname]
         w = self.widgets[tname]
         w["entry"].delete(0, tk.END)
-        w["entry"].insert(0, str(liters))
-        w["arm_label"].config(text=f"Arm: {arm:.2f} in")
-        w["kg_label"].config(text=f"Weight: {kg:.1f} kg")
-
-        self.update_summary()  # Update totals
+        w["entry"].insert(0, str(tank_state["liters"]))
+        w["arm_label"].config(text=f"Arm: {tank_state['arm']:.2f} in")
+        w["kg_label"].config(text=f"Weight: {tank_state['weight']:.1f} kg")
 
     def update_summary(self):
         """
         Recalculates and displays the total fuel weight, moment, and CG.
-        This handles the special logic for combined main tanks.
+        The combined main tank logic is handled by FuelLoad.get_cg().
         """
-        total_weight, total_moment = 0, 0
-
-        # Check if BOTH main tanks have fuel to use the combined table
-        main1_liters = self.state.get("Main Tank 1", {}).get("liters", 0)
-        main2_liters = self.state.get("Main Tank 2", {}).get("liters", 0)
-        main_liters = main1_liters + main2_liters
-        combined_tank = next((t for t in self.tank_data if t.get("tank") == "main_tanks_combined_table"), None)
+        with PROFILER.stage("fuel.update_summary"):
+            total_weight, total_moment, total_cg = self.load.get_cg()
 
-        # Use combined table ONLY when BOTH tanks have fuel (not just one)
-        use_combined = (combined_tank is not None and main1_liters > 0 and main2_liters > 0)
+            # Update display
+            warning = ""
+            # --- MODIFIED ---
+            if total_weight > config.MAX_TOTAL_FUEL_KG:
+                warning = f"\n!!! WARNING: Total fuel weight exceeds {config.MAX_TOTAL_FUEL_KG:,} kg !!!"
+            # ---
 
-        if use_combined:
-            combined_arm = interpolate_arm(combined_tank["arm_table"], main_liters)
-            combined_weight = round(main_liters * self.fuel_density, 1)
-
-            # Store the combined calculation in the state
-            self.state["Main Tanks Combined"] = {"liters": main_liters, "arm": combined_arm, "weight": combined_weight}
-            total_weight += combined_weight
-            total_moment += combined_weight * combined_arm
-        else:
-            # Clear combined entry if not using it
-            if "Main Tanks Combined" in self.state:
-                del self.state["Main Tanks Combined"]
-
-        # Add all other tanks
-        for tank in self.tank_data:
-            tname = tank["tank"]
-            if tname == "main_tanks_combined_table":
-                continue  # Always skip the table itself
-            if use_combined and tname in ("Main Tank 1", "Main Tank 2"):
-                continue  # Skip individual main tanks when using combined
-
-            tank_data = self.state.get(tname, {})
-            weight = tank_data.get("weight", 0)
-            arm = tank_data.get("arm", 0)
-            total_weight += weight
-            total_moment += weight * arm
-
-        total_cg = total_moment / total_weight if total_weight > 0 else 0
-
-        # Update display
-        warning = ""
-        # --- MODIFIED ---
-        if total_weight > config.MAX_TOTAL_FUEL_KG:
-            warning = f"\n!!! WARNING: Total fuel weight exceeds {config.MAX_TOTAL_FUEL_KG:,} kg !!!"
-        # ---
-
-        self.summary_label.config(
-            text=f"Total Fuel: {total_weight:.1f} kg\nTotal Moment: {total_moment:.1f} kg-in\nFuel CG: {total_cg:.2f} in{warning}"
-        )
+            self.summary_label.config(
+                text=f"Total Fuel: {total_weight:.1f} kg\nTotal Moment: {total_moment:.1f} kg-in\nFuel CG: {total_cg:.2f} in{warning}"
+            )
 
         self._trigger_callback()
 
@@ -244,7 +258,6 @@ class FuelLoadSystem:
         """
         Calculates total fuel weight, moment, and CG.
         This is the primary method for the main app to get fuel load data.
-        It mirrors the logic from update_summary() but only returns values.
 
         Returns:
             tuple (float, float, float):
@@ -252,58 +265,24 @@ class FuelLoadSystem:
                 - total_moment (kg-in)
                 - cg (inches)
         """
-        total_weight = 0
-        total_moment = 0
-
-        # Re-check combined tank logic
-        main1_liters = self.state.get("Main Tank 1", {}).get("liters", 0)
-        main2_liters = self.state.get("Main Tank 2", {}).get("liters", 0)
-        combined_tank = next((t for t in self.tank_data if t.get("tank") == "main_tanks_combined_table"), None)
-        use_combined = (combined_tank is not None and main1_liters > 0 and main2_liters > 0)
-
-        if use_combined:
-            # Use combined data from state
-            combined = self.state.get("Main Tanks Combined", {})
-            if combined:
-                weight = combined.get("weight", 0)
-                arm = combined.get("arm", 0)
-                total_weight += weight
-                total_moment += weight * arm
-
-        # Add all other tanks
-        for tank in self.tank_data:
-            tname = tank["tank"]
-            if tname == "main_tanks_combined_table":
-                continue
-            if use_combined and tname in ("Main Tank 1", "Main Tank 2"):
-                continue  # Skip individual main tanks
-
-            tank_data = self.state.get(tname, {})
-            weight = tank_data.get("weight", 0)
-            arm = tank_data.get("arm", 0)
-            if weight > 0:
-                total_weight += weight
-                total_moment += weight * arm
-
-        cg = total_moment / total_weight if total_weight > 0 else 0
-        return total_weight, total_moment, cg
+        return self.load.get_cg()
 
     def export_results(self):
         """Shows a message box with a summary of the current fuel load."""
         total_weight, total_moment, cg = self.get_fuel_cg()
 
         details = ""
-        use_combined = "Main Tanks Combined" in self.state
+        use_combined = COMBINED_STATE_NAME in self.state
 
         if use_combined:
-            combined = self.state["Main Tanks Combined"]
+            combined = self.state[COMBINED_STATE_NAME]
             details += f"Main Tanks Combined: {combined.get('liters', 0)} L, {combined.get('weight', 0)} kg, Arm: {combined.get('arm', 0):.2f} in\n"
 
         # Export other tanks
         for tank, dat in self.state.items():
-            if tank == "Main Tanks Combined":
+            if tank == COMBINED_STATE_NAME:
                 continue  # Already handled
-            if use_combined and tank in ("Main Tank 1", "Main Tank 2"):
+            if use_combined and tank in MAIN_TANK_NAMES:
                 continue  # Skip if using combined
 
             if dat.get("weight", 0) > 0:
@@ -1,17 +1,30 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 
+import numpy as np
+
 import src.config as config
 from src.app_utils import load_json_data
+from src.change_batch import ChangeNotifier
+from src.instrumentation import PROFILER
+from src.load_state import PassengerLoad
+from src.seat_layout import PADDING, ROW_HEIGHT, SeatMapLayout
+
+# Rows drawn above and below the visible part of the seat map
+RENDER_MARGIN_ROWS = 4
+# Vertical inset of the seat rectangles within their row
+SEAT_MARGIN = 6
 
 
 class SeatSelector:
     """
     A tkinter GUI module for visualizing and selecting aircraft seats,
-    and calculating the resulting passenger weight and moment.
+    drawn on a single canvas (see SeatMapLayout for the geometry).
+    The selection and the passenger weight and moment are kept in a
+    headless PassengerLoad; this class is a view over it.
     """
 
-    def __init__(self, master, seat_map, on_change_callback=None):
+    def __init__(self, master, seat_map, on_change_callback=None, load=None):
         """
         Initializes the SeatSelector widget.
 
@@ -20,91 +33,52 @@ class SeatSelector:
             seat_map (list): The list of dictionaries defining the seat layout.
             on_change_callback (callable, optional): A function to call
                 whenever the seat selection changes.
+            load (PassengerLoad, optional): The passenger state to display.
+                A new one is created from seat_map if not given.
         """
         self.master = master
         self.seat_map = seat_map
-        self.selected = set()  # Stores selected seats as (row, seat) tuples
-        self.buttons = {}  # Maps (row, seat) tuples to their tk.Button widgets
+        self.load = load if load is not None else PassengerLoad(seat_map)
+        self.seat_index = self.load.seat_index
         self.on_change_callback = on_change_callback
+        self.changes = ChangeNotifier(self._trigger_callback)
         self.create_widgets()
 
     def create_widgets(self):
-        """Creates and lays out all tkinter widgets for the seat map."""
-        # Canvas setup with vertical scrollbar
-        self.canvas = tk.Canvas(self.master)
-        self.scrollbar = tk.Scrollbar(self.master, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.grid(row=0, column=0, sticky="nsew")
-        self.scrollbar.grid(row=0, column=1, sticky="ns")
-
-        self.master.grid_rowconfigure(0, weight=1)
+        """
+        Creates the seat map canvas and the control buttons.
+
+        The seats are drawn as items on a single canvas. Only the rows in
+        view (plus a margin) have items; they are created and deleted as
+        the canvas scrolls, and clicks are hit-tested against the layout.
+        """
+        self.layout = SeatMapLayout(self.seat_map, self.seat_index)
+        self._row_items = {}  # {row index: tag of its canvas items}
+        self._seat_items = {}  # {seat position: rectangle item id} of the drawn seats
+
+        tk.Label(self.master, text="Select Seats", font=("Arial", 16, "bold")).grid(row=0, column=0,
+                                                                                     columnspan=2, pady=12)
+
+        self.canvas = tk.Canvas(self.master, highlightthickness=0, yscrollincrement=ROW_HEIGHT // 2,
+                                scrollregion=(0, 0, self.layout.width, self.layout.height))
+        self.scrollbar = tk.Scrollbar(self.master, orient="vertical", command=self._on_scroll)
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.master.grid_rowconfigure(1, weight=1)
         self.master.grid_columnconfigure(0, weight=1)
 
-        tk.Label(self.scrollable_frame, text="Select Seats", font=("Arial", 16, "bold")).grid(row=0, column=0,
-                                                                                              columnspan=15, pady=12)
-
-        current_class = None
-        row_idx = 1
-
-        for row_data in self.seat_map:
-            # Check for class divider
-            if current_class != row_data["class"]:
-                if current_class is not None:
-                    # Insert separator (thick line)
-                    sep = tk.Frame(self.scrollable_frame, height=3, bd=1, relief='sunken', bg='black')
-                    sep.grid(row=row_idx, column=0, columnspan=20, sticky="ew", pady=10)
-                    row_idx += 1
-                current_class = row_data["class"]
-
-            # Label for row number
-            tk.Label(self.scrollable_frame, text=f"Row {row_data['row']}", font=("Arial", 12)).grid(row=row_idx,
-                                                                                                    column=0, padx=6,
-                                                                                                    pady=6, sticky='w')
-
-            # Get seat plan from config file
-            seat_plan = config.BUSINESS_SEATPLAN if row_data["class"] == "F" else config.ECONOMY_SEATPLAN
-            # ---
-
-            seats_present = {seat["seat"]: seat for seat in row_data["seats"]}
-
-            col_idx = 1
-            for seat in seat_plan:
-                if seat is None:
-                    # Aisle gap
-                    lbl = tk.Label(self.scrollable_frame, width=3, bg="#ccc")
-                    lbl.grid(row=row_idx, column=col_idx, padx=5, pady=6)
-                elif seat in seats_present:
-                    # Seat button
-                    btn = tk.Button(
-                        self.scrollable_frame, text=seat, width=4, height=2, font=("Arial", 14),
-                        bg='lightblue' if row_data["class"] == "F" else 'white',
-                        command=lambda r=row_data['row'], s=seat: self.toggle_seat(r, s)
-                    )
-                    btn.grid(row=row_idx, column=col_idx, padx=5, pady=6)
-                    self.buttons[(row_data['row'], seat)] = btn
-                else:
-                    # Empty seat position
-                    lbl = tk.Label(self.scrollable_frame, width=4, height=2, bg="#eee")
-                    lbl.grid(row=row_idx, column=col_idx, padx=5, pady=6)
-                col_idx += 1
-
-            # Select Row button
-            tk.Button(self.scrollable_frame, text="Select Row", font=("Arial", 11),
-                      command=lambda row=row_data['row']: self.select_row(row)).grid(row=row_idx, column=col_idx,
-                                                                                     padx=8, pady=6)
-            row_idx += 1
+        self.canvas.bind("<Configure>", lambda e: self.render_visible())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._on_scroll("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self._on_scroll("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._on_scroll("scroll", 1, "units"))
 
         # Control buttons below
         controls = tk.Frame(self.master)
-        controls.grid(row=1, column=0, columnspan=2, pady=10, sticky='ew')
+        controls.grid(row=2, column=0, columnspan=2, pady=10, sticky='ew')
 
         tk.Button(controls, text="Select All", command=self.select_all, width=12).grid(row=0, column=0, padx=10)
         tk.Button(controls, text="Deselect All", command=self.deselect_all, width=12).grid(row=0, column=1, padx=10)
@@ -114,11 +88,128 @@ class SeatSelector:
                                                                                                               padx=10)
         tk.Button(controls, text="Done", command=self.done, width=12).grid(row=0, column=4, padx=10)
 
+    # --- Canvas rendering ---
+
+    def _on_scroll(self, *args):
+        """Scrollbar and mouse wheel handler."""
+        self.canvas.yview(*args)
+
+    def _on_view_changed(self, first, last):
+        """Called by the canvas whenever its view moves: syncs the scrollbar and renders new rows."""
+        self.scrollbar.set(first, last)
+        self.render_visible()
+
+    def render_visible(self):
+        """
+        Makes the drawn rows match the rows in view: draws the rows that
+        scrolled in and deletes those that scrolled out.
+        """
+        with PROFILER.stage("pax.render_visible"):
+            margin = RENDER_MARGIN_ROWS * ROW_HEIGHT
+            y0 = self.canvas.canvasy(0) - margin
+            y1 = self.canvas.canvasy(max(self.canvas.winfo_height(), 1)) + margin
+            visible = self.layout.rows_between(y0, y1)
+
+            for r in [r for r in self._row_items if r not in visible]:
+                self._delete_row(r)
+            for r in visible:
+                if r not in self._row_items:
+                    self._draw_row(r)
+
+    def _draw_row(self, r):
+        """Creates the canvas items of one row."""
+        row = self.layout.rows[r]
+        tag = f"row{r}"
+        self._row_items[r] = tag
+        canvas = self.canvas
+        mid_y = (row.top + row.bottom) / 2
+        y0, y1 = row.top + SEAT_MARGIN, row.bottom - SEAT_MARGIN
+
+        if row.separator_y is not None:
+            canvas.create_line(0, row.separator_y, self.layout.width, row.separator_y, width=3, tags=tag)
+        canvas.create_text(PADDING, mid_y, text=f"Row {row.row}", anchor="w", font=("Arial", 12), tags=tag)
+
+        mask = self.load.mask
+        for kind, x0, x1, letter, position in row.cells:
+            if kind == "aisle":
+                canvas.create_rectangle(x0 + 4, y0, x1 - 4, y1, fill="#ccc", outline="", tags=tag)
+            elif kind == "empty":
+                canvas.create_rectangle(x0, y0, x1, y1, fill="#eee", outline="", tags=tag)
+            else:
+                fill, width = self._seat_style(row.cabin_class, mask[position])
+                self._seat_items[position] = canvas.create_rectangle(x0, y0, x1, y1, fill=fill, width=width,
+                                                                     tags=tag)
+                canvas.create_text((x0 + x1) / 2, mid_y, text=letter, font=("Arial", 14), tags=tag)
+
+        bx0, bx1 = row.row_button
+        canvas.create_rectangle(bx0, y0 + 4, bx1, y1 - 4, fill="#e4e4e4", tags=tag)
+        canvas.create_text((bx0 + bx1) / 2, mid_y, text="Select Row", font=("Arial", 11), tags=tag)
+
+    def _delete_row(self, r):
+        """Deletes the canvas items of one row."""
+        self.canvas.delete(self._row_items.pop(r))
+        for kind, _, _, _, position in self.layout.rows[r].cells:
+            if kind == "seat":
+                self._seat_items.pop(position, None)
+
+    @staticmethod
+    def _seat_style(cabin_class, selected):
+        """Returns the (fill, outline width) of a seat rectangle."""
+        if selected:
+            return 'lime green', 3
+        return ('lightblue' if cabin_class == 'F' else 'white'), 1
+
+    def _style_seat(self, position, selected):
+        """Restyles one seat if it is drawn; seats out of view are styled when drawn."""
+        item = self._seat_items.get(position)
+        if item is not None:
+            r, _ = self.layout.seat_cells[position]
+            fill, width = self._seat_style(self.layout.rows[r].cabin_class, selected)
+            self.canvas.itemconfigure(item, fill=fill, width=width)
+
+    def _on_click(self, event):
+        """Hit-tests a click on the canvas."""
+        hit = self.layout.hit(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if hit is None:
+            return
+        if hit[0] == "seat":
+            self.toggle_seat(*self.seat_index.keys[hit[1]])
+        else:
+            self.select_row(hit[1])
+
     def _trigger_callback(self):
         """Safely triggers the on_change_callback if it exists."""
         if self.on_change_callback:
             self.on_change_callback()
 
+    def batch(self):
+        """
+        Returns a context manager that groups several seat changes into a
+        single change notification at its end.
+        """
+        return self.changes.batch()
+
+    @property
+    def selected(self):
+        """The selected seats as a set of (row, seat) tuples."""
+        return self.load.selected
+
+    def _restyle_changed(self, changed):
+        """
+        Restyles only the seats whose selection state changed and
+        notifies the main app.
+
+        Args:
+            changed (numpy.ndarray): Mask of the changed seats.
+        """
+        with PROFILER.stage("pax.restyle_seats"):
+            mask = self.load.mask
+            # Only drawn seats need an item update
+            for i in np.flatnonzero(changed):
+                if i in self._seat_items:
+                    self._style_seat(i, mask[i])
+        self.changes.notify()
+
     def toggle_seat(self, row, seat):
         """
         Toggles the selection state of a single seat.
@@ -128,18 +219,14 @@ class SeatSelector:
             seat (str): The seat letter (e.g., "A", "K").
         """
         key = (row, seat)
-        btn = self.buttons.get(key)
-        if btn is None:
+        position = self.seat_index.position.get(key)
+        if position is None:
             return
 
-        if key in self.selected:
-            self.selected.remove(key)
-            btn.config(relief='raised', bg='lightblue' if self.get_class(row) == 'F' else 'white')
-        else:
-            self.selected.add(key)
-            btn.config(relief='sunken', bg='lime green')
+        with PROFILER.stage("pax.toggle_seat"):
+            self._style_seat(position, self.load.toggle(key))
 
-        self._trigger_callback()
+        self.changes.notify()
 
     def get_class(self, row):
         """
@@ -151,24 +238,15 @@ class SeatSelector:
         Returns:
             str or None: The class identifier ("F", "Y") or None if not found.
         """
-        for r in self.seat_map:
-            if r['row'] == row:
-                return r['class']
-        return None
+        return self.seat_index.row_class.get(row)
 
     def select_all(self):
         """Selects all available seats."""
-        for key, btn in self.buttons.items():
-            self.selected.add(key)
-            btn.config(relief='sunken', bg='lime green')
-        self._trigger_callback()
+        self._restyle_changed(self.load.select_all())
 
     def deselect_all(self):
         """Deselects all seats."""
-        for key, btn in self.buttons.items():
-            self.selected.discard(key)
-            btn.config(relief='raised', bg='lightblue' if self.get_class(key[0]) == 'F' else 'white')
-        self._trigger_callback()
+        self._restyle_changed(self.load.deselect_all())
 
     def select_row(self, row):
         """
@@ -177,29 +255,20 @@ class SeatSelector:
         Args:
             row (int): The row number to select.
         """
-        for key, btn in self.buttons.items():
-            if key[0] == row:
-                self.selected.add(key)
-                btn.config(relief='sunken', bg='lime green')
-        self._trigger_callback()
+        self._restyle_changed(self.load.select_row(row))
 
     def prompt_select_row(self):
         """Shows a dialog box to ask the user for a row number to select."""
         row_str = simpledialog.askstring("Select Row", "Enter row number to select:")
         if row_str and row_str.isdigit():
             self.select_row(int(row_str))
-        self._trigger_callback()  # Trigger even if canceled
 
     def prompt_select_seat_letter(self):
         """Shows a dialog box to ask the user for a seat letter to select."""
         letter = simpledialog.askstring("Select Seat Letter", "Enter seat letter to select:")
         if letter:
             letter = letter.upper()
-            for key, btn in self.buttons.items():
-                if key[1] == letter:
-                    self.selected.add(key)
-                    btn.config(relief='sunken', bg='lime green')
-            self._trigger_callback()
+            self._restyle_changed(self.load.select_letter(letter))
 
     def done(self):
         """
@@ -245,28 +314,7 @@ class SeatSelector:
                 - total_moment (kg-in)
                 - cg (inches)
         """
-        total_weight = 0
-        total_moment = 0
-
-        # Create a quick-lookup map for row data
-        row_map = {r['row']: r for r in self.seat_map}
-
-        for (row, seat) in self.selected:
-            if row in row_map:
-                seats = row_map[row]['seats']
-                # Find the arm for the specific seat in that row
-                arm = next((s['arm_in'] for s in seats if s['seat'] == seat), 0)
-
-                if arm == 0:
-                    print(f"Warning: Could not find arm for seat {row}{seat}")
-
-                total_weight += pax_weight
-                total_moment += pax_weight * arm
-            else:
-                print(f"Warning: Could not find row data for row {row}")
-
-        cg = total_moment / total_weight if total_weight > 0 else 0
-        return total_weight, total_moment, cg
+        return self.load.get_cg(pax_weight)
 
 if __name__ == "__main__":
     root = tk.Tk()
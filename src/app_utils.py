@@ -3,7 +3,6 @@ This file contains shared utility functions for the application,
 such as loading data from files and plotting.
 """
 import json
-import matplotlib.pyplot as plt
 import numpy as np
 import src.config as config
 
@@ -93,6 +92,9 @@ def plot_cg_envelope(zfw_mac, zfw_weight, tow_mac, tow_weight):
         tow_mac (float): The TOW CG in %MAC.
         tow_weight (float): The TOW in kg.
     """
+    # Imported here so that loading data does not pull in matplotlib
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(7, 10))
 
     # Draw the base envelope (certified + restricted area)
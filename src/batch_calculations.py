@@ -0,0 +1,115 @@
+"""
+This file contains the vectorized weight and balance engine.
+
+It evaluates the same DOW -> DOW+Pax -> ZFW -> TOW chain as
+AircraftSummaryApp.calculate_aircraft_summary, but for whole NumPy arrays
+of load scenarios at once, without any tkinter state.
+"""
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+
+# Keys of the four trace points, in loading order
+TRACE_POINTS = ("dow", "dow_pax", "zfw", "tow")
+
+
+def _cg_or_fallback(moment, weight, fallback):
+    """
+    Divides moment by weight element-wise, using `fallback` wherever the
+    weight is not positive (mirrors the `if weight > 0 else ...` guards
+    of the scalar path).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cg = moment / weight
+    return np.where(weight > 0, cg, fallback)
+
+
+def calculate_batch_summary(dow_weight, doi,
+                            pax_weight, pax_moment,
+                            cargo_weight, cargo_moment,
+                            fuel_weight, fuel_moment,
+                            le_mac=config.LE_MAC_IN,
+                            mac_length=config.MAC_LENGTH_IN,
+                            reference_arm=config.KLM_REFERENCE_ARM_IN):
+    """
+    Calculates the full loading trace and KLM indices for many scenarios.
+
+    All load arguments may be scalars or array-likes; they are broadcast
+    against each other, so e.g. a single DOW can be combined with arrays
+    of passenger, cargo and fuel loads. Scalar-only input yields arrays
+    of shape (1,).
+
+    Args:
+        dow_weight (float or array): Dry Operating Weight(s) in kg.
+        doi (float or array): Dry Operating Index(es).
+        pax_weight (float or array): Total passenger weight(s) in kg.
+        pax_moment (float or array): Total passenger moment(s) in kg-in.
+        cargo_weight (float or array): Total cargo weight(s) in kg.
+        cargo_moment (float or array): Total cargo moment(s) in kg-in.
+        fuel_weight (float or array): Total fuel weight(s) in kg.
+        fuel_moment (float or array): Total fuel moment(s) in kg-in.
+        le_mac (float, optional): Leading edge of MAC in inches.
+        mac_length (float, optional): Length of MAC in inches.
+        reference_arm (float, optional): KLM index reference arm in inches.
+
+    Returns:
+        dict[str, numpy.ndarray]: For each trace point in TRACE_POINTS the
+            keys "<point>_weight", "<point>_moment", "<point>_arm" and
+            "<point>_mac", plus the component CGs ("pax_cg", "cargo_cg",
+            "fuel_cg") and the KLM indices ("klm_dow", "klm_pax",
+            "klm_cargo", "klm_fuel", "klm_zfw", "klm_tow").
+    """
+    (dow_weight, doi, pax_weight, pax_moment, cargo_weight, cargo_moment,
+     fuel_weight, fuel_moment) = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+            dow_weight, doi, pax_weight, pax_moment,
+            cargo_weight, cargo_moment, fuel_weight, fuel_moment)))
+
+    # Point 1: DOW
+    dow_arm = calc.calculate_arm_from_doi(doi, dow_weight, reference_arm)
+    dow_moment = dow_weight * dow_arm
+
+    # Component CGs, as returned by the UI modules
+    pax_cg = _cg_or_fallback(pax_moment, pax_weight, 0.0)
+    cargo_cg = _cg_or_fallback(cargo_moment, cargo_weight, 0.0)
+    fuel_cg = _cg_or_fallback(fuel_moment, fuel_weight, 0.0)
+
+    # Point 2: DOW + Passengers
+    dow_pax_weight = dow_weight + pax_weight
+    dow_pax_moment = dow_moment + pax_moment
+    dow_pax_arm = _cg_or_fallback(dow_pax_moment, dow_pax_weight, dow_arm)
+
+    # Point 3: ZFW (DOW + Pax + Cargo)
+    zfw_weight = dow_pax_weight + cargo_weight
+    zfw_moment = dow_pax_moment + cargo_moment
+    zfw_arm = _cg_or_fallback(zfw_moment, zfw_weight, dow_pax_arm)
+
+    # Point 4: TOW (ZFW + Fuel)
+    tow_weight = zfw_weight + fuel_weight
+    tow_moment = zfw_moment + fuel_moment
+    tow_arm = _cg_or_fallback(tow_moment, tow_weight, zfw_arm)
+
+    result = {
+        "dow_weight": dow_weight, "dow_moment": dow_moment, "dow_arm": dow_arm,
+        "dow_pax_weight": dow_pax_weight, "dow_pax_moment": dow_pax_moment, "dow_pax_arm": dow_pax_arm,
+        "zfw_weight": zfw_weight, "zfw_moment": zfw_moment, "zfw_arm": zfw_arm,
+        "tow_weight": tow_weight, "tow_moment": tow_moment, "tow_arm": tow_arm,
+        "pax_cg": pax_cg, "cargo_cg": cargo_cg, "fuel_cg": fuel_cg,
+    }
+    for point in TRACE_POINTS:
+        result[f"{point}_mac"] = calc.calculate_mac_percent(result[f"{point}_arm"], le_mac, mac_length)
+
+    # KLM indices: DOW uses the base function, components are deltas
+    klm_dow = calc.klm_index_base(dow_weight, dow_arm, reference_arm)
+    klm_pax = calc.klm_index_component(pax_weight, pax_cg, reference_arm)
+    klm_cargo = calc.klm_index_component(cargo_weight, cargo_cg, reference_arm)
+    klm_fuel = calc.klm_index_component(fuel_weight, fuel_cg, reference_arm)
+
+    result["klm_dow"] = klm_dow
+    result["klm_pax"] = klm_pax
+    result["klm_cargo"] = klm_cargo
+    result["klm_fuel"] = klm_fuel
+    result["klm_zfw"] = klm_dow + klm_pax + klm_cargo
+    result["klm_tow"] = result["klm_zfw"] + klm_fuel
+    return result
@@ -1,8 +1,16 @@
 """
 This file contains all core mathematical functions for
 weight and balance calculations.
+
+The index and arm functions accept either plain floats or NumPy arrays,
+so the same formulas serve the GUI and the batch engine.
 """
+from bisect import bisect_right
+
+import numpy as np
+
 import src.config as config
+from src.envelope import DEFAULT_ENVELOPE
 
 def interpolate_arm(arm_table, fill_l):
     """
@@ -43,6 +51,94 @@ def interpolate_arm(arm_table, fill_l):
     return arm_table[-1][1]
 
 
+class CompiledArmTable:
+    """
+    A pre-processed arm table for fast, repeated arm lookups.
+
+    Gives exactly the same results as interpolate_arm() (including the
+    clamping at both ends), but finds the interpolation segment by
+    bisection instead of a linear scan, and can evaluate whole arrays
+    of fill levels in one call.
+    """
+
+    def __init__(self, arm_table):
+        """
+        Compiles a [liters, arm] table.
+
+        Args:
+            arm_table (list[list[float]]): The lookup table of [liters, arm]
+                points, sorted by liters.
+        """
+        self.liters = [float(l) for l, _ in arm_table]
+        self.arms = [a for _, a in arm_table]
+        self._liters_array = np.asarray(self.liters, dtype=float)
+        self._arms_array = np.asarray(self.arms, dtype=float)
+
+    @classmethod
+    def from_arrays(cls, liters, arms):
+        """
+        Creates a table from prebuilt liters and arms arrays (e.g. memory-mapped
+        from the compiled data cache).
+
+        Args:
+            liters (numpy.ndarray): The fill levels, sorted.
+            arms (numpy.ndarray): The arm at each fill level.
+        """
+        table = cls.__new__(cls)
+        table.liters = liters.tolist()
+        table.arms = arms.tolist()
+        table._liters_array = liters
+        table._arms_array = arms
+        return table
+
+    def __call__(self, fill_l):
+        """
+        Looks up the arm for a single fill level.
+
+        Args:
+            fill_l (float): The current fill level in liters.
+
+        Returns:
+            float: The interpolated arm in inches.
+        """
+        liters = self.liters
+        if fill_l <= liters[0]:
+            return self.arms[0]
+        if fill_l >= liters[-1]:
+            return self.arms[-1]
+
+        # First point strictly above fill_l, same segment the linear scan picks
+        i = bisect_right(liters, fill_l)
+        l1, l2 = liters[i - 1], liters[i]
+        a1, a2 = self.arms[i - 1], self.arms[i]
+        percentage = (fill_l - l1) / (l2 - l1)
+        return a1 + (a2 - a1) * percentage
+
+    def evaluate_many(self, fill_l):
+        """
+        Looks up the arms for an array of fill levels.
+
+        Args:
+            fill_l (array-like): Fill levels in liters.
+
+        Returns:
+            numpy.ndarray: The interpolated arms in inches, same shape as fill_l.
+        """
+        fill_l = np.asarray(fill_l, dtype=float)
+        liters = self._liters_array
+        arms = self._arms_array
+
+        i = np.clip(np.searchsorted(liters, fill_l, side="right"), 1, len(liters) - 1)
+        l1, l2 = liters[i - 1], liters[i]
+        a1, a2 = arms[i - 1], arms[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = (fill_l - l1) / (l2 - l1)
+        result = a1 + (a2 - a1) * percentage
+
+        result = np.where(fill_l >= liters[-1], arms[-1], result)
+        return np.where(fill_l <= liters[0], arms[0], result)
+
+
 def klm_index_base(weight_kg, arm_in, reference_arm_in=config.KLM_REFERENCE_ARM_IN,
                    scale=config.KLM_SCALE, offset=config.KLM_OFFSET):
     """
@@ -62,6 +158,10 @@ def klm_index_base(weight_kg, arm_in, reference_arm_in=config.KLM_REFERENCE_ARM_
     Returns:
         float: The calculated index. Returns 0 if weight is 0.
     """
+    if np.ndim(weight_kg):
+        weight_kg = np.asarray(weight_kg, dtype=float)
+        index = (weight_kg * (arm_in - reference_arm_in)) / scale + offset
+        return np.where(weight_kg == 0, 0.0, index)
     if weight_kg == 0:
         return 0
     return (weight_kg * (arm_in - reference_arm_in)) / scale + offset
@@ -85,6 +185,10 @@ def klm_index_component(weight_kg, arm_in, reference_arm_in=config.KLM_REFERENCE
     float: Index delta (0 if weight is 0).
 
     """
+    if np.ndim(weight_kg):
+        weight_kg = np.asarray(weight_kg, dtype=float)
+        index = (weight_kg * (arm_in - reference_arm_in)) / scale
+        return np.where(weight_kg == 0, 0.0, index)
     if weight_kg == 0:
         return 0
     return (weight_kg * (arm_in - reference_arm_in)) / scale
@@ -107,6 +211,11 @@ def calculate_arm_from_doi(doi, weight_kg, reference_arm_in=config.KLM_REFERENCE
     Returns:
         float: The calculated arm in inches.
     """
+    if np.ndim(weight_kg):
+        weight_kg = np.asarray(weight_kg, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arm = ((doi - offset) * scale / weight_kg) + reference_arm_in
+        return np.where(weight_kg == 0, 0.0, arm)
     if weight_kg == 0:
         return 0
     # Formula: DOI = (weight * (arm - ref_arm)) / scale + offset
@@ -139,15 +248,24 @@ def calculate_mac_percent(arm_in, le_mac_in=config.LE_MAC_IN, mac_length_in=conf
     return ((arm_in - le_mac_in) * 100 / mac_length_in)
 
 
-def check_limits(zfw_weight, tow_weight, limits):
+def check_limits(zfw_weight, tow_weight, limits, zfw_mac=None, tow_mac=None, envelope=DEFAULT_ENVELOPE,
+                 lw_weight=None, lw_mac=None):
     """
-    Checks ZFW and TOW against the aircraft's certified weight limits.
+    Checks ZFW, TOW and (when given) LW against the aircraft's certified
+    weight limits and, when the %MAC values are given, against the CG
+    envelope.
 
     Args:
         zfw_weight (float): The calculated Zero Fuel Weight.
         tow_weight (float): The calculated Takeoff Weight.
         limits (dict): A dictionary containing limit keys
-                       ("MZFW_kg", "MTOW_kg", "MTW_kg", "MFW_kg").
+                       ("MZFW_kg", "MTOW_kg", "MTW_kg", "MFW_kg", and
+                       "MLW_kg" if lw_weight is given).
+        zfw_mac (float, optional): The ZFW CG in %MAC.
+        tow_mac (float, optional): The TOW CG in %MAC.
+        envelope (CGEnvelope, optional): The envelope to check against.
+        lw_weight (float, optional): The calculated Landing Weight.
+        lw_mac (float, optional): The LW CG in %MAC.
 
     Returns:
         list[str]: A list of warning messages. Empty if all limits are respected.
@@ -170,4 +288,110 @@ def check_limits(zfw_weight, tow_weight, limits):
         under = limits["MFW_kg"] - zfw_weight
         messages.append(
             f"Zero Fuel Weight ({zfw_weight:.1f} kg) is below Minimum Flight Weight ({limits['MFW_kg']} kg) by {under:.1f} kg.")
+
+    if lw_weight is not None and lw_weight > limits["MLW_kg"]:
+        over = lw_weight - limits["MLW_kg"]
+        messages.append(
+            f"Landing Weight ({lw_weight:.1f} kg) exceeds Maximum LW ({limits['MLW_kg']} kg) by {over:.1f} kg.")
+
+    if zfw_mac is not None:
+        messages += check_cg_envelope("ZFW", zfw_weight, zfw_mac, envelope)
+    if tow_mac is not None:
+        messages += check_cg_envelope("TOW", tow_weight, tow_mac, envelope)
+    if lw_weight is not None and lw_mac is not None:
+        messages += check_cg_envelope("LW", lw_weight, lw_mac, envelope)
+    return messages
+
+
+def lateral_imbalance_limit(weight, landing=False):
+    """
+    Returns the maximum lateral imbalance moment (kg-in) at a gross weight,
+    from WBM 1-04-004.
+
+    Args:
+        weight (float): The gross weight (kg).
+        landing (bool, optional): Use the landing weight restriction instead
+            of the taxi weight restriction.
+    """
+    table = config.LATERAL_IMBALANCE_LANDING_LIMITS if landing else config.LATERAL_IMBALANCE_TAXI_LIMITS
+    restricted = np.interp(weight, *zip(*table))
+    return float(min(restricted, config.LATERAL_IMBALANCE_FLIGHT_LIMIT_KG_IN))
+
+
+def fuel_imbalance_limit(main_fuel):
+    """
+    Returns the maximum main tank 1/2 fuel imbalance (kg) for a total main
+    tank fuel (kg), from WBM 1-22-002.
+    """
+    return float(np.interp(main_fuel, *zip(*config.FUEL_IMBALANCE_LIMITS)))
+
+
+def check_lateral_balance(lateral_moment, fuel_imbalance, tow_weight, main_fuel, lw_weight=None):
+    """
+    Checks the lateral (left/right) balance against the WBM lateral
+    imbalance and fuel imbalance limits.
+
+    The lateral moment is built from estimated seat and tank lateral arms
+    (see config.py), so the messages call it an estimate. At landing the
+    takeoff moment is used; the fuel burn keeps the main tanks level.
+
+    Args:
+        lateral_moment (float): The total lateral moment (kg-in, positive to the right).
+        fuel_imbalance (float): Main Tank 2 minus Main Tank 1 weight (kg).
+        tow_weight (float): The takeoff weight (kg).
+        main_fuel (float): The fuel in both main tanks (kg).
+        lw_weight (float, optional): The landing weight (kg).
+
+    Returns:
+        list[str]: A list of warning messages. Empty if the load is balanced.
+    """
+    messages = []
+    side = "right" if lateral_moment > 0 else "left"
+    points = [("TOW", tow_weight, False)]
+    if lw_weight is not None:
+        points.append(("LW", lw_weight, True))
+    for label, weight, landing in points:
+        limit = lateral_imbalance_limit(weight, landing)
+        if abs(lateral_moment) > limit:
+            messages.append(
+                f"Estimated lateral imbalance ({abs(lateral_moment):.0f} kg-in {side}) exceeds the {label} limit "
+                f"({limit:.0f} kg-in, WBM 1-04-004) by {abs(lateral_moment) - limit:.0f} kg-in.")
+    max_imbalance = fuel_imbalance_limit(main_fuel)
+    if abs(fuel_imbalance) > max_imbalance:
+        heavy = "Main Tank 2" if fuel_imbalance > 0 else "Main Tank 1"
+        messages.append(
+            f"Fuel imbalance ({abs(fuel_imbalance):.1f} kg, {heavy} heavier) exceeds the limit "
+            f"({max_imbalance:.0f} kg, WBM 1-22-002) by {abs(fuel_imbalance) - max_imbalance:.1f} kg.")
+    return messages
+
+
+def check_cg_envelope(label, weight, mac, envelope=DEFAULT_ENVELOPE):
+    """
+    Checks a single (weight, %MAC) point against the CG envelope.
+
+    Args:
+        label (str): Name of the point used in the messages (e.g. "ZFW").
+        weight (float): The gross weight in kg.
+        mac (float): The CG position in %MAC.
+        envelope (CGEnvelope, optional): The envelope to check against.
+
+    Returns:
+        list[str]: A list of warning messages. Empty if the CG is within limits.
+    """
+    status = envelope.check(weight, mac)
+    if np.isnan(status["forward_margin"]):
+        return [f"{label} ({weight:.1f} kg) is outside the CG envelope weight range "
+                f"({envelope.min_weight:.0f} - {envelope.max_weight:.0f} kg); CG cannot be verified."]
+
+    messages = []
+    if status["forward_margin"] < 0:
+        messages.append(
+            f"{label} CG ({mac:.2f} %MAC) is forward of the forward limit "
+            f"({mac - status['forward_margin']:.2f} %MAC) by {-status['forward_margin']:.2f} %MAC.")
+    if status["aft_margin"] < 0:
+        messages.append(
+            f"{label} CG ({mac:.2f} %MAC) is aft of the aft limit "
+            f"({mac + status['aft_margin']:.2f} %MAC) by {-status['aft_margin']:.2f} %MAC.")
+    if status["in_restricted"]:
+        messages.append(f"{label} CG ({mac:.2f} %MAC at {weight:.1f} kg) lies in the restricted area.")
     return messages
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+This file contains the CargoIndex, a lookup structure for the cargo
+positions and the pallet/container blocking graph, built once from
+cargo_positions.json.
+"""
+
+
+class CargoIndex:
+    """
+    Indexes cargo slots by (compartment, position) key and precomputes the
+    blocking adjacency between pallet positions and the container
+    positions they cover, per compartment.
+    """
+
+    def __init__(self, cargo_data):
+        """
+        Builds the index from the cargo positions data.
+
+        Args:
+            cargo_data (list): The list of dictionaries defining cargo slots.
+        """
+        self.slots = {}  # {key: slot dict}
+        self.arms = {}  # {key: arm_in}
+        self.covers = {}  # {pallet key: [container keys it covers]}
+        self.covered_by = {}  # {container key: [pallet keys covering it]}
+
+        for slot in cargo_data:
+            key = (slot["compartment"], slot["position"])
+            self.slots[key] = slot
+            self.arms[key] = slot.get("arm_in", 0)
+            # Pallets are identified by having a "blocks" key
+            if "blocks" in slot:
+                self.covers[key] = []
+            else:
+                self.covered_by[key] = []
+
+        for key in self.covers:
+            compartment = key[0]
+            for pos in self.slots[key]["blocks"]:
+                container = (compartment, pos)
+                if container in self.covered_by:
+                    self.covers[key].append(container)
+                    self.covered_by[container].append(key)
+
+    def is_pallet(self, key):
+        """Returns True if the slot is a pallet position."""
+        return key in self.covers
+
+    def neighbours(self, key):
+        """
+        Returns the slots whose blocking state depends on the given slot.
+
+        Args:
+            key (tuple): (compartment, position) of the slot.
+
+        Returns:
+            list[tuple]: Covered containers for a pallet, covering pallets
+                for a container.
+        """
+        if key in self.covers:
+            return self.covers[key]
+        return self.covered_by.get(key, [])
+
+    def is_blocked(self, key, state):
+        """
+        Applies the blocking rules to a single slot.
+
+        - A container is blocked while a pallet covering it is loaded.
+        - An empty pallet is blocked while a container it covers is loaded.
+
+        Args:
+            key (tuple): (compartment, position) of the slot.
+            state (dict): The cargo state {key: load or None}.
+
+        Returns:
+            bool: True if the slot is blocked.
+        """
+        if key in self.covers:
+            if state.get(key):
+                return False  # A loaded pallet must stay editable
+            return any(state.get(c) for c in self.covers[key])
+        return any(state.get(p) for p in self.covered_by.get(key, []))
+
+    def blocked_keys(self, state):
+        """
+        Returns all blocked slots for a cargo state.
+
+        Args:
+            state (dict): The cargo state {key: load or None}.
+
+        Returns:
+            set[tuple]: The keys of all blocked slots.
+        """
+        blocked = set()
+        for key, load in state.items():
+            if not load:
+                continue
+            for neighbour in self.neighbours(key):
+                if self.is_blocked(neighbour, state):
+                    blocked.add(neighbour)
+        return blocked
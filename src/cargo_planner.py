@@ -0,0 +1,342 @@
+"""
+This file contains the cargo auto-loader: it assigns a manifest of ULDs to
+cargo positions so that the ZFW CG comes as close as possible to a target
+%MAC.
+
+Every ULD has to go to a position that lists its type in "allowed_ULDs"
+with a "max_kg" of at least its weight, no position takes two ULDs, and a
+pallet position and the container positions it blocks are never loaded
+together (see CargoIndex). Since the whole manifest is loaded, the ZFW is
+fixed and the %MAC is linear in the cargo moment, so the search minimizes
+the distance of the cargo moment from a target moment.
+
+The search is a branch-and-bound in two levels. The outer level fixes the
+set of pallet positions in use, which decides the free container
+positions; all candidate sets are bounded at once with numpy and searched
+in order of their bound. The inner level is a depth-first search over the
+ULDs, heaviest first, on positions that no longer block each other. Both
+levels bound the reachable cargo moment per group of interchangeable ULDs
+by pairing the heaviest ULDs with the most forward (or aft) free positions,
+prune what cannot beat the best plan so far, and stop as soon as a plan
+within the tolerance is found.
+"""
+import re
+
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+
+
+class CargoPlan:
+    """
+    The result of plan_cargo().
+
+    Attributes:
+        assignment (dict): {key: {"weight": w, "ULD_type": t}}, in the format
+            of the CargoLoad state.
+        cargo_weight (float): Total cargo weight in kg.
+        cargo_moment (float): Total cargo moment in kg-in.
+        zfw_weight (float): ZFW with the cargo in kg.
+        zfw_mac (float): ZFW CG with the cargo in %MAC.
+        deviation (float): |zfw_mac - target| in %MAC.
+        nodes (int): Number of search nodes visited.
+        complete (bool): False if the search was cut off by the node limit,
+            in which case the plan is the best one found so far.
+    """
+
+    def __init__(self, assignment, cargo_weight, cargo_moment, zfw_weight, zfw_mac, deviation, nodes, complete):
+        self.assignment = assignment
+        self.cargo_weight = cargo_weight
+        self.cargo_moment = cargo_moment
+        self.zfw_weight = zfw_weight
+        self.zfw_mac = zfw_mac
+        self.deviation = deviation
+        self.nodes = nodes
+        self.complete = complete
+
+
+def parse_manifest(text):
+    """
+    Parses a manifest typed by the user, one ULD per entry, entries
+    separated by commas, semicolons or new lines, e.g.
+    "P1 4200, LD-3 1100, Half Pallet 2000".
+
+    Args:
+        text (str): The manifest text.
+
+    Returns:
+        list[dict]: [{"ULD_type": t, "weight": w}, ...]
+
+    Raises:
+        ValueError: If an entry has no type or no valid weight.
+    """
+    manifest = []
+    for entry in re.split(r"[,;\n]", text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        parts = re.split(r"[\s:]+", entry)
+        try:
+            weight = float(parts[-1])
+        except ValueError:
+            raise ValueError(f"Manifest entry '{entry}' has no weight.") from None
+        uld_type = " ".join(parts[:-1])
+        if not uld_type:
+            raise ValueError(f"Manifest entry '{entry}' has no ULD type.")
+        manifest.append({"ULD_type": uld_type, "weight": weight})
+    return manifest
+
+
+def _moment_range(weights, arms, available):
+    """
+    Bounds the cargo moment of a group of interchangeable ULDs: the
+    heaviest ULDs on the most forward (lowest) or most aft (highest) of the
+    available positions.
+
+    Args:
+        weights (numpy.ndarray): The group's weights, heaviest first.
+        arms (numpy.ndarray): The arm of every position.
+        available (numpy.ndarray): Bool mask of the positions the group may
+            use, one row per candidate state (shape (n, n_positions)).
+
+    Returns:
+        tuple: (low, high, feasible) arrays over the rows; rows with fewer
+            available positions than ULDs are not feasible.
+    """
+    ordered = np.sort(np.where(available, arms, np.inf), axis=1)
+    count = available.sum(axis=1)
+    feasible = count >= len(weights)
+    forward = ordered[:, :len(weights)]
+    aft = np.take_along_axis(ordered, np.maximum(count[:, None] - 1 - np.arange(len(weights)), 0), axis=1)
+    forward, aft = np.where(np.isfinite(forward), forward, 0.0), np.where(np.isfinite(aft), aft, 0.0)
+    return forward @ weights, aft @ weights, feasible
+
+
+def _bound_moment(groups, weights, arms, available):
+    """
+    Bounds the cargo moment of the remaining ULDs: the larger (smaller) of
+    the per-group bounds, which ignore that groups share positions, and of
+    the bound over all ULDs on the union of their positions, which ignores
+    which ULD may go where.
+
+    Args:
+        groups (list): [(allowed position mask, weights heaviest first), ...]
+        weights (numpy.ndarray): All remaining weights, heaviest first.
+        arms (numpy.ndarray): The arm of every position.
+        available (numpy.ndarray): Bool mask of the free positions, one row
+            per candidate state (shape (n, n_positions)).
+
+    Returns:
+        tuple: (low, high, feasible) arrays over the rows.
+    """
+    group_low, group_high = np.zeros(len(available)), np.zeros(len(available))
+    feasible = np.ones(len(available), dtype=bool)
+    union = np.zeros(len(arms), dtype=bool)
+    for group_allowed, group_weights in groups:
+        if len(group_weights):
+            low, high, fits = _moment_range(group_weights, arms, available & group_allowed)
+            group_low, group_high, feasible = group_low + low, group_high + high, feasible & fits
+            union |= group_allowed
+    low, high, fits = _moment_range(np.sort(weights)[::-1], arms, available & union)
+    return np.maximum(group_low, low), np.minimum(group_high, high), feasible & fits
+
+
+def plan_cargo(manifest, index, base_weight, base_moment, target_mac,
+               le_mac=config.LE_MAC_IN, mac_length=config.MAC_LENGTH_IN,
+               tolerance=config.CARGO_PLANNER_TOLERANCE_MAC, max_nodes=config.CARGO_PLANNER_MAX_NODES):
+    """
+    Assigns a manifest of ULDs to cargo positions, minimizing the distance
+    of the ZFW %MAC from a target.
+
+    Args:
+        manifest (list): [{"ULD_type": t, "weight": w}, ...]
+        index (CargoIndex): The cargo positions and blocking graph.
+        base_weight (float): The ZFW without cargo (DOW + passengers) in kg.
+        base_moment (float): The moment of base_weight in kg-in.
+        target_mac (float): The target ZFW CG in %MAC.
+        le_mac (float, optional): Leading edge of MAC in inches.
+        mac_length (float, optional): MAC length in inches.
+        tolerance (float, optional): A plan this close to the target (%MAC)
+            ends the search.
+        max_nodes (int, optional): Limit on the number of inner search nodes.
+
+    Returns:
+        CargoPlan: The best assignment found.
+
+    Raises:
+        ValueError: If the manifest is empty, a ULD fits no position, or no
+            assignment of the whole manifest exists.
+    """
+    keys = list(index.slots)
+    arms = np.array([index.arms[key] for key in keys], dtype=float)
+    is_pallet = np.array([index.is_pallet(key) for key in keys])
+    pallet_positions = np.flatnonzero(is_pallet)
+    covers = np.zeros((len(pallet_positions), len(keys)), dtype=bool)  # covers[pallet, container]
+    position = {key: j for j, key in enumerate(keys)}
+    for i, j in enumerate(pallet_positions):
+        covers[i, [position[k] for k in index.covers[keys[j]]]] = True
+
+    if not manifest:
+        raise ValueError("The manifest is empty.")
+    if len(manifest) > len(keys):
+        raise ValueError(f"The manifest has {len(manifest)} ULDs, but there are only {len(keys)} positions.")
+
+    # Heaviest first: they decide most of the moment, so the bounds tighten early
+    ulds = sorted(manifest, key=lambda uld: -uld["weight"])
+    weights = np.array([uld["weight"] for uld in ulds], dtype=float)
+    allowed = np.zeros((len(ulds), len(keys)), dtype=bool)  # allowed[ULD, position]
+    for i, uld in enumerate(ulds):
+        if uld["weight"] < 0:
+            raise ValueError(f"Negative weight for {uld['ULD_type']}.")
+        for j, key in enumerate(keys):
+            allowed[i, j] = any(entry["type"] == uld["ULD_type"] and uld["weight"] <= entry["max_kg"]
+                                for entry in index.slots[key].get("allowed_ULDs", []))
+        if not allowed[i].any():
+            raise ValueError(f"No cargo position accepts a {uld['ULD_type']} of {uld['weight']:.1f} kg.")
+
+    # ULDs with the same allowed positions are interchangeable for the bounds
+    group_rows = {}
+    group_of = np.array([group_rows.setdefault(allowed[i].tobytes(), len(group_rows)) for i in range(len(ulds))])
+    groups = [(allowed[np.argmax(group_of == g)], weights[group_of == g]) for g in range(len(group_rows))]
+    # A ULD equal to its predecessor only takes later positions, so swaps of
+    # identical ULDs are not searched twice
+    same_as_previous = [i > 0 and group_of[i] == group_of[i - 1] and weights[i] == weights[i - 1]
+                        for i in range(len(ulds))]
+
+    cargo_weight = float(weights.sum())
+    zfw_weight = base_weight + cargo_weight
+    target_arm = le_mac + target_mac * mac_length / 100
+    target_moment = zfw_weight * target_arm - base_moment  # Cargo moment that hits the target
+    tolerance_moment = tolerance * mac_length / 100 * zfw_weight
+
+    # Outer level: every set of pallet positions in use that the manifest can fill
+    n_pallet_only = int((~(allowed & ~is_pallet).any(axis=1)).sum())
+    n_pallet_capable = int((allowed & is_pallet).any(axis=1).sum())
+    n_container_only = int((~(allowed & is_pallet).any(axis=1)).sum())
+    # Every pallet position in use takes a ULD, the other ULDs go to containers
+    sizes = range(n_pallet_only, min(n_pallet_capable, len(ulds) - n_container_only, len(pallet_positions)) + 1)
+    in_use = (np.arange(2 ** len(pallet_positions))[:, None] >> np.arange(len(pallet_positions))) & 1 > 0
+    in_use = in_use[np.isin(in_use.sum(axis=1), sizes)]  # in_use[set, pallet position]
+    available = ~is_pallet & ~(in_use.astype(int) @ covers.astype(int)).astype(bool)  # Free containers
+    available[:, pallet_positions] = in_use
+
+    low, high, feasible = _bound_moment(groups, weights, arms, available)
+    feasible &= (available & ~is_pallet).sum(axis=1) >= len(ulds) - in_use.sum(axis=1)
+    bound = np.maximum(np.maximum(low - target_moment, target_moment - high), 0.0)
+
+    pallet_capable = (allowed & is_pallet).any(axis=1)
+    pallet_only = ~(allowed & ~is_pallet).any(axis=1)
+    group_pallet_only = [not (group_allowed & ~is_pallet).any() for group_allowed, _ in groups]
+    group_pallet_capable = [(group_allowed & is_pallet).any() for group_allowed, _ in groups]
+    pallets_in_use = np.zeros(len(keys), dtype=bool)  # Of the pallet set being searched, all must be loaded
+    chosen = [0] * len(ulds)
+    placed = [0] * len(groups)
+    best = {"deviation": np.inf, "positions": None}
+    nodes = 0
+
+    def polish(positions, free):
+        """
+        Improves a complete assignment by moving single ULDs to free
+        positions and swapping pairs, best move first, until none helps.
+        """
+        positions, free = np.array(positions, dtype=int), free.copy()
+        deviation = weights @ arms[positions] - target_moment
+        while abs(deviation) > tolerance_moment:
+            current = arms[positions]
+            moves = np.where(allowed & free, weights[:, None] * (arms[None, :] - current[:, None]), np.inf)
+            swappable = allowed[:, positions] & allowed[:, positions].T
+            swaps = np.where(swappable, (weights[:, None] - weights[None, :]) * (current[None, :] - current[:, None]),
+                             np.inf)
+            move, swap = np.unravel_index(np.argmin(np.abs(deviation + moves)), moves.shape), \
+                np.unravel_index(np.argmin(np.abs(deviation + swaps)), swaps.shape)
+            if abs(deviation + moves[move]) <= abs(deviation + swaps[swap]):
+                delta = moves[move]
+                if abs(deviation + delta) >= abs(deviation) - 1e-9:
+                    break
+                free[positions[move[0]]], free[move[1]] = True, False
+                positions[move[0]] = move[1]
+            else:
+                delta = swaps[swap]
+                if abs(deviation + delta) >= abs(deviation) - 1e-9:
+                    break
+                positions[[swap[0], swap[1]]] = positions[[swap[1], swap[0]]]
+            deviation += delta
+        return abs(deviation), positions.tolist()
+
+    def search(depth, moment, free):
+        """Inner level: assigns the ULDs from `depth` on to free, mutually non-blocking positions."""
+        nonlocal nodes
+        nodes += 1
+        if depth == len(ulds):
+            deviation, positions = polish(chosen, free)
+            if deviation < best["deviation"]:
+                best["deviation"], best["positions"] = deviation, positions
+            return
+
+        unfilled = (free & pallets_in_use).sum()
+        n_only, n_capable = pallet_only[depth:].sum(), pallet_capable[depth:].sum()
+        if not n_only <= unfilled <= n_capable or len(ulds) - depth - unfilled > (free & ~is_pallet).sum():
+            return  # The remaining ULDs cannot fill exactly the pallet positions in use, or do not fit
+
+        def usable(g):
+            """The free positions group g may still take, given the pallet positions left to fill."""
+            if unfilled == n_only and not group_pallet_only[g]:
+                return free & ~is_pallet
+            if unfilled == n_capable and group_pallet_capable[g]:
+                return free & is_pallet
+            return free
+
+        rest = [(groups[g][0] & usable(g), groups[g][1][placed[g]:]) for g in range(len(groups))]
+        low, high, feasible = _bound_moment(rest, weights[depth:], arms, free[None, :])
+        if not feasible[0]:
+            return
+        if max(moment + low[0] - target_moment, target_moment - moment - high[0], 0.0) >= best["deviation"]:
+            return  # Cannot beat the best plan so far
+
+        # Try the positions closest to the arm the remaining ULDs need on average first
+        remaining = weights[depth:].sum()
+        needed_arm = (target_moment - moment) / remaining if remaining > 0 else 0.0
+        g = group_of[depth]
+        candidates = np.flatnonzero(allowed[depth] & usable(g))
+        if same_as_previous[depth]:
+            candidates = candidates[candidates > chosen[depth - 1]]
+        for j in candidates[np.argsort(np.abs(arms[candidates] - needed_arm))]:
+            if nodes >= node_limit or best["deviation"] <= tolerance_moment:
+                return
+            chosen[depth] = j
+            placed[g] += 1
+            free[j] = False
+            search(depth + 1, moment + weights[depth] * arms[j], free)
+            free[j] = True
+            placed[g] -= 1
+
+    # Pallet sets in order of their bound, ties broken by how central the
+    # target is in their moment range. They are searched in rounds with a node
+    # budget per set that grows 8-fold per round: the first round is a single
+    # dive into every set for a good incumbent, the last one is unlimited.
+    order = np.flatnonzero(feasible)
+    order = order[np.lexsort((np.abs((low + high)[order] / 2 - target_moment), bound[order]))]
+    budget = len(ulds) + 1
+    while nodes < max_nodes and best["deviation"] > tolerance_moment:
+        complete = True
+        for row in order:
+            if bound[row] >= best["deviation"] or nodes >= max_nodes or best["deviation"] <= tolerance_moment:
+                break
+            node_limit = min(nodes + budget, max_nodes)
+            pallets_in_use[:] = available[row] & is_pallet
+            search(0, 0.0, available[row].copy())
+            complete = complete and nodes < node_limit
+        if complete:
+            break  # Every set was searched to the end within the budget
+        budget *= 8
+
+    if best["positions"] is None:
+        raise ValueError("The manifest cannot be loaded: no assignment respects the position limits and blocks.")
+
+    assignment = {keys[j]: {"weight": uld["weight"], "ULD_type": uld["ULD_type"]}
+                  for uld, j in zip(ulds, best["positions"])}
+    cargo_moment = float(sum(uld["weight"] * arms[j] for uld, j in zip(ulds, best["positions"])))
+    zfw_mac = calc.calculate_mac_percent((base_moment + cargo_moment) / zfw_weight, le_mac, mac_length)
+    return CargoPlan(assignment, cargo_weight, cargo_moment, zfw_weight, zfw_mac, abs(zfw_mac - target_mac),
+                     nodes, complete=bool(nodes < max_nodes or best["deviation"] <= tolerance_moment))
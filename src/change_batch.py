@@ -0,0 +1,54 @@
+"""
+This file contains the ChangeNotifier, which coalesces change
+notifications inside batches.
+
+A module calls notify() after every change. Outside a batch the callback
+runs right away; inside `with notifier.batch():` it runs once when the
+outermost batch ends, and only if something changed. This way an
+operation made of many small changes (setting every tank, selecting a row
+from a dialog, applying the config) causes one recalculation.
+"""
+from contextlib import contextmanager
+
+
+class ChangeNotifier:
+    """Calls a callback on change, once per batch while batching."""
+
+    def __init__(self, callback, flush=None):
+        """
+        Args:
+            callback (callable): Called on a change outside a batch.
+            flush (callable, optional): Called instead of callback at the end
+                of a batch with changes. Defaults to callback.
+        """
+        self.callback = callback
+        self.flush = flush if flush is not None else callback
+        self._depth = 0
+        self._pending = False
+
+    @property
+    def batching(self):
+        """True while inside a batch."""
+        return self._depth > 0
+
+    def notify(self):
+        """Reports a change."""
+        if self._depth:
+            self._pending = True
+        else:
+            self.callback()
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers notifications until the block ends. Batches can be nested;
+        the outermost one flushes.
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth and self._pending:
+                self._pending = False
+                self.flush()
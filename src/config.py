@@ -10,6 +10,12 @@ CARGO_POSITIONS_FILEPATH = "data/cargo_positions.json"
 AIRCRAFT_REFERENCE_FILEPATH = "data/aircraft_reference.json"
 LIMITS_FILEPATH = "data/limits.json"
 
+# --- Compiled Data Cache ---
+# Binary cache of the data files and their prebuilt indexes (None disables it)
+DATA_CACHE_FILEPATH = "data/.compiled_cache.bin"
+# Also compare file hashes on load, not only mtime and size
+DATA_CACHE_VERIFY_HASH = False
+
 # --- Passenger Constants ---
 BUSINESS_SEATPLAN = ["A", "C", None, "D", "F", None, "G", "J"]
 ECONOMY_SEATPLAN = ["A", "B", None, "D", "E", "F", "G", "H", None, "J", "K"]
@@ -19,6 +25,49 @@ DEFAULT_PASSENGER_WEIGHT_KG = 88.5
 # Max fuel kg: (Main Tank 1 + Main Tank 2) + Center Tank
 MAX_TOTAL_FUEL_KG = 33171 * 2 + 87887
 DEFAULT_FUEL_DENSITY_KG_L = 0.8507
+# Increment of the in-flight fuel burn simulation (TOW -> LW curve)
+FUEL_BURN_STEP_KG = 100
+
+# --- Cargo Auto-Loader ---
+# The planner stops at the first plan this close to the target ZFW CG (%MAC)
+CARGO_PLANNER_TOLERANCE_MAC = 0.01
+# Search node limit; the best plan found so far is used when it is reached
+CARGO_PLANNER_MAX_NODES = 2000
+# Default target ZFW CG of the auto-loader in %MAC
+CARGO_PLANNER_TARGET_MAC = 28.0
+
+# --- Lateral Balance ---
+# Lateral arms in inches from the aircraft centerline, positive to the right
+# (starboard), per cabin class and seat letter of the seat map. ESTIMATES from
+# the seat plans above: the seat map and the WBM give no seat buttock lines.
+SEAT_LATERAL_ARMS_IN = {
+    "F": {"A": -89.5, "C": -62.5, "D": -13.5, "F": 13.5, "G": 62.5, "J": 89.5},
+    "Y": {"A": -94.0, "B": -75.5, "D": -37.0, "E": -18.5, "F": 0.0, "G": 18.5, "H": 37.0,
+          "J": 75.5, "K": 94.0},
+}
+# Lateral arm of each fuel tank; tanks not listed lie on the centerline.
+# ESTIMATE of the main tank centroids: the WBM fuel tables (1-24) give balance
+# arms only, no buttock lines.
+TANK_LATERAL_ARMS_IN = {"Main Tank 1": -430.0, "Main Tank 2": 430.0}
+# Lateral imbalance limits, WBM 1-04-004 page 3 (kg chart), as a moment about
+# the centerline. In flight 2.54e6 kg-in; near MTW the taxi weight restriction
+# and near MLW the landing weight restriction reduce it linearly:
+# [(gross weight kg, max moment kg-in), ...]
+LATERAL_IMBALANCE_FLIGHT_LIMIT_KG_IN = 2.54e6
+LATERAL_IMBALANCE_TAXI_LIMITS = [(339740, 4.53e6), (352441, 2.02e6)]
+LATERAL_IMBALANCE_LANDING_LIMITS = [(245166, 2.54e6), (251290, 1.38e6)]
+# Main tank 1/2 fuel imbalance limit, WBM 1-22-002 (Lateral Fuel Imbalance):
+# 2041 kg up to 40823 kg of main tank fuel, 1360 kg above 55791 kg, linear
+# in between: [(total main tank fuel kg, max imbalance kg), ...]
+FUEL_IMBALANCE_LIMITS = [(40823, 2041), (55791, 1360)]
+
+# --- Passenger CG Dispersion ---
+# Random seatings of unassigned passengers (Monte Carlo), reproducible by seed
+PAX_DISPERSION_DRAWS = 100000
+PAX_DISPERSION_SEED = 777
+# Draws per NumPy batch, bounds the memory of the per-arm seat counts
+PAX_DISPERSION_BATCH_SIZE = 50000
+PAX_DISPERSION_PERCENTILES = (1, 5, 50, 95, 99)
 
 # --- Aircraft Physics & Index Constants ---
 LE_MAC_IN = 1174.5
@@ -27,6 +76,28 @@ KLM_REFERENCE_ARM_IN = 1258
 KLM_SCALE = 200000
 KLM_OFFSET = 50
 
+# --- Startup ---
+# Build the Cargo, Fuel, Config and Diagnostics tabs on first selection and
+# open the live CG plot on demand. False builds everything at startup.
+LAZY_STARTUP = True
+
+# --- Summary ---
+# Delay before the summary is recalculated after a load change, so that rapid
+# changes (e.g. a held button) are coalesced. Unchanged load sections are
+# served from cache, so this can be short.
+SUMMARY_DEBOUNCE_MS = 40
+
+# --- Live CG Plot ---
+# Render the live CG plot in a separate process, so redraws never block the UI
+LIVE_PLOT_OUT_OF_PROCESS = True
+# Interval for collecting the draw times of the renderer process while a timed trace is in flight
+LIVE_PLOT_POLL_MS = 20
+
+# --- Diagnostics ---
+# Record hot-path timings from startup (can also be switched on in the Diagnostics tab)
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_DUMP_FILEPATH = "diagnostics.json"
+
 # --- CG Envelope Plotting Constants ---
 CG_ENVELOPE_LOWER_POINTS = [
     (138573, 7.5), (204116, 7.5),
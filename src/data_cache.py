@@ -0,0 +1,243 @@
+"""
+This file contains the compiled data cache.
+
+The JSON data files are compiled into a single binary file that holds the
+raw data together with the prebuilt lookup structures: seat arrays, the
+cargo slot index with its blocking graph and the fuel arm tables. The
+NumPy arrays are stored aligned and read back through a read-only memory
+map, so loading the cache costs a few stat() calls, one small JSON parse
+and no array copies. The cargo index is rebuilt from the raw data, which
+takes microseconds; nothing in the cache is unpickled, so a tampered cache
+file can at worst give wrong data, never run code.
+
+The cache is rebuilt automatically when a source file's mtime or size
+changes (or, with verify_hash, its SHA-256), when the cache format
+version changes, or when the cache file cannot be read.
+
+File layout:
+    8 bytes   magic
+    8 bytes   header length (little-endian uint64)
+    header    JSON: format version, source stamps, array table
+    blobs     the JSON objects (raw data, seat keys) and the raw arrays,
+              each 64-byte aligned
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+import src.config as config
+from src.app_utils import load_json_data
+from src.calculations import CompiledArmTable
+from src.cargo_index import CargoIndex
+from src.seat_index import SeatIndex
+
+CACHE_MAGIC = b"WBCACHE\x00"
+CACHE_VERSION = 2  # Bump when the compiled structures change
+_ALIGN = 64
+
+# Attribute name -> config file path of every compiled source file
+SOURCE_FILES = {
+    "seat_map": config.SEAT_MAP_FILEPATH,
+    "cargo_data": config.CARGO_POSITIONS_FILEPATH,
+    "tank_data": config.FUEL_TANKS_FILEPATH,
+    "aircraft_ref": config.AIRCRAFT_REFERENCE_FILEPATH,
+    "limits": config.LIMITS_FILEPATH,
+}
+
+
+class CompiledData:
+    """
+    The aircraft data with its prebuilt lookup structures.
+
+    Attributes:
+        seat_map, cargo_data, tank_data, aircraft_ref, limits: The raw JSON data.
+        seat_index (SeatIndex): The seat arrays.
+        cargo_index (CargoIndex): The cargo slots and blocking graph.
+        arm_tables (dict): {tank name: CompiledArmTable}
+        from_cache (bool): True if loaded from the cache file, False if compiled.
+    """
+
+    def __init__(self, raw, seat_index, cargo_index, arm_tables, from_cache=False):
+        for name in SOURCE_FILES:
+            setattr(self, name, raw[name])
+        self.seat_index = seat_index
+        self.cargo_index = cargo_index
+        self.arm_tables = arm_tables
+        self.from_cache = from_cache
+
+
+def _source_stamps(sources, with_hash):
+    """Returns {path: {"mtime_ns", "size"[, "sha256"]}} for the source files."""
+    stamps = {}
+    for path in sources.values():
+        st = os.stat(path)
+        stamps[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        if with_hash:
+            with open(path, "rb") as f:
+                stamps[path]["sha256"] = hashlib.sha256(f.read()).hexdigest()
+    return stamps
+
+
+def compile_data(sources=SOURCE_FILES):
+    """
+    Loads the JSON source files and builds all lookup structures.
+
+    Args:
+        sources (dict, optional): {attribute name: file path}
+
+    Returns:
+        CompiledData: The freshly compiled data.
+    """
+    raw = {name: load_json_data(path) for name, path in sources.items()}
+    arm_tables = {t["tank"]: CompiledArmTable(t["arm_table"]) for t in raw["tank_data"]}
+    return CompiledData(raw, SeatIndex(raw["seat_map"]), CargoIndex(raw["cargo_data"]), arm_tables)
+
+
+def write_data_cache(data, cache_path=config.DATA_CACHE_FILEPATH, sources=SOURCE_FILES):
+    """
+    Writes compiled data to the cache file (atomically, via a temporary file).
+
+    Args:
+        data (CompiledData): The data to store.
+        cache_path (str, optional): The cache file path.
+        sources (dict, optional): The source files the data was compiled from.
+    """
+    seat_index = data.seat_index
+    arrays = {
+        "seat.arms": seat_index.arms,
+        "seat.rows": seat_index.rows,
+        "seat.letters": seat_index.letters,
+        "seat.class_codes": seat_index.class_codes,
+    }
+    for tname, table in data.arm_tables.items():
+        arrays[f"fuel.{tname}.liters"] = table._liters_array
+        arrays[f"fuel.{tname}.arms"] = table._arms_array
+
+    objects = json.dumps({
+        "raw": {name: getattr(data, name) for name in sources},
+        "seat_keys": seat_index.keys,
+        "seat_row_class": list(seat_index.row_class.items()),  # Integer keys
+    }).encode("utf-8")
+
+    # Lay out the blobs after the header, each aligned
+    blobs, table, offset = [], {}, 0
+    for name, array in (("objects", np.frombuffer(objects, dtype=np.uint8)), *arrays.items()):
+        array = np.ascontiguousarray(array)
+        offset += -offset % _ALIGN
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        blobs.append((offset, array))
+        offset += array.nbytes
+
+    header = json.dumps({
+        "version": CACHE_VERSION,
+        "sources": _source_stamps(sources, with_hash=True),
+        "arrays": table,
+    }).encode("utf-8")
+    data_start = len(CACHE_MAGIC) + 8 + len(header)
+    data_start += -data_start % _ALIGN
+
+    directory = os.path.dirname(cache_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cache-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(CACHE_MAGIC + struct.pack("<Q", len(header)) + header)
+            for blob_offset, array in blobs:
+                f.seek(data_start + blob_offset)
+                f.write(array.tobytes())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates the file private
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_data_cache(cache_path=config.DATA_CACHE_FILEPATH, sources=SOURCE_FILES, verify_hash=False):
+    """
+    Reads the cache file if it is still valid for the source files.
+
+    Args:
+        cache_path (str, optional): The cache file path.
+        sources (dict, optional): The source files the data must match.
+        verify_hash (bool, optional): Also compare the SHA-256 of every source file.
+
+    Returns:
+        CompiledData or None: The cached data, None if the cache is missing or stale.
+    """
+    with open(cache_path, "rb") as f:
+        prefix = f.read(len(CACHE_MAGIC) + 8)
+        if prefix[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+            return None
+        (header_length,) = struct.unpack("<Q", prefix[len(CACHE_MAGIC):])
+        header = json.loads(f.read(header_length))
+
+    if header.get("version") != CACHE_VERSION or set(header["sources"]) != set(sources.values()):
+        return None
+    current = _source_stamps(sources, with_hash=verify_hash)
+    for path, stamp in current.items():
+        if any(header["sources"][path].get(key) != value for key, value in stamp.items()):
+            return None
+
+    data_start = len(CACHE_MAGIC) + 8 + header_length
+    data_start += -data_start % _ALIGN
+    mm = np.memmap(cache_path, dtype=np.uint8, mode="r")
+
+    def array(name):
+        entry = header["arrays"][name]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = data_start + entry["offset"]
+        return mm[start:start + count * dtype.itemsize].view(dtype).reshape(entry["shape"])
+
+    objects = json.loads(array("objects").tobytes())
+    seat_keys = [tuple(key) for key in objects["seat_keys"]]
+    seat_index = SeatIndex.from_arrays(seat_keys, dict(objects["seat_row_class"]), array("seat.arms"),
+                                       array("seat.rows"), array("seat.letters"), array("seat.class_codes"))
+    arm_tables = {t["tank"]: CompiledArmTable.from_arrays(array(f"fuel.{t['tank']}.liters"),
+                                                          array(f"fuel.{t['tank']}.arms"))
+                  for t in objects["raw"]["tank_data"]}
+    cargo_index = CargoIndex(objects["raw"]["cargo_data"])
+    return CompiledData(objects["raw"], seat_index, cargo_index, arm_tables, from_cache=True)
+
+
+def load_compiled_data(cache_path=config.DATA_CACHE_FILEPATH, sources=SOURCE_FILES,
+                       verify_hash=config.DATA_CACHE_VERIFY_HASH):
+    """
+    Returns the compiled aircraft data, from the cache when it is valid.
+
+    A missing, stale or unreadable cache is rebuilt from the JSON files.
+    If the cache cannot be written (e.g. a read-only install), the freshly
+    compiled data is returned anyway.
+
+    Args:
+        cache_path (str, optional): The cache file path. None disables the cache.
+        sources (dict, optional): {attribute name: JSON file path}
+        verify_hash (bool, optional): Also compare source file hashes, not
+            only mtime and size.
+
+    Returns:
+        CompiledData: The data with all prebuilt lookup structures.
+
+    Raises:
+        FileNotFoundError: If a source file is missing.
+    """
+    if cache_path:
+        try:
+            data = read_data_cache(cache_path, sources, verify_hash)
+            if data is not None:
+                return data
+        except (OSError, ValueError, KeyError, EOFError, struct.error):
+            # Missing, corrupt or incompatible cache: rebuild it. A missing
+            # source file is reported by compile_data below.
+            pass
+
+    data = compile_data(sources)
+    if cache_path:
+        try:
+            write_data_cache(data, cache_path, sources)
+        except OSError:
+            pass  # The cache is an optimization only
+    return data
@@ -0,0 +1,142 @@
+"""
+This file contains the CG envelope engine. It precompiles the certified
+forward/aft limits and the restricted area from config.py and checks
+(weight, %MAC) points against them, for single values or NumPy arrays.
+"""
+import numpy as np
+
+import src.config as config
+
+
+class CGEnvelope:
+    """
+    A compiled, piecewise-linear CG envelope.
+
+    The forward limit follows CG_ENVELOPE_LOWER_POINTS and the aft limit
+    CG_ENVELOPE_UPPER_POINTS; these are the same segments as the
+    spreadsheet formulas in data/formule_neo.txt. All query methods accept
+    scalars or arrays and return values of the matching shape.
+    """
+
+    def __init__(self, lower_points=config.CG_ENVELOPE_LOWER_POINTS,
+                 upper_points=config.CG_ENVELOPE_UPPER_POINTS,
+                 restricted_points=config.RESTRICTED_AREA_POINTS):
+        """
+        Compiles the envelope from (weight_kg, %MAC) point lists.
+
+        Args:
+            lower_points (list[tuple]): Forward limit points, by increasing weight.
+            upper_points (list[tuple]): Aft limit points, by increasing weight.
+            restricted_points (list[tuple]): Polygon of the restricted area.
+        """
+        # The plotted outline closes the envelope with a vertical edge at
+        # the maximum weight; that edge is not part of the forward limit.
+        forward = list(lower_points)
+        while len(forward) > 1 and forward[-1][0] == forward[-2][0]:
+            forward.pop()
+
+        self._fwd_weights, self._fwd_mac = (np.asarray(v, dtype=float) for v in zip(*forward))
+        self._aft_weights, self._aft_mac = (np.asarray(v, dtype=float) for v in zip(*upper_points))
+
+        self.min_weight = max(self._fwd_weights[0], self._aft_weights[0])
+        self.max_weight = min(self._fwd_weights[-1], self._aft_weights[-1])
+
+        # Restricted area polygon, stored as edge arrays for the ray casting test
+        if restricted_points and len(restricted_points) >= 3:
+            weights, macs = (np.asarray(v, dtype=float) for v in zip(*restricted_points))
+            self._edges = (macs, weights, np.roll(macs, -1), np.roll(weights, -1))
+        else:
+            self._edges = None
+
+    @staticmethod
+    def _output(value, scalar):
+        """Returns a plain Python value for scalar queries."""
+        return value.item() if scalar else value
+
+    def _limit(self, weights, macs, weight):
+        """Interpolates a limit line, NaN outside the envelope's weight range."""
+        weight = np.asarray(weight, dtype=float)
+        limit = np.interp(weight, weights, macs)
+        return np.where((weight < self.min_weight) | (weight > self.max_weight), np.nan, limit)
+
+    def forward_limit(self, weight):
+        """
+        Returns the forward CG limit in %MAC at the given weight.
+
+        Args:
+            weight (float or array): Gross weight(s) in kg.
+
+        Returns:
+            float or numpy.ndarray: The forward limit, NaN outside the weight range.
+        """
+        return self._output(self._limit(self._fwd_weights, self._fwd_mac, weight), np.ndim(weight) == 0)
+
+    def aft_limit(self, weight):
+        """
+        Returns the aft CG limit in %MAC at the given weight.
+
+        Args:
+            weight (float or array): Gross weight(s) in kg.
+
+        Returns:
+            float or numpy.ndarray: The aft limit, NaN outside the weight range.
+        """
+        return self._output(self._limit(self._aft_weights, self._aft_mac, weight), np.ndim(weight) == 0)
+
+    def in_restricted_area(self, weight, mac):
+        """
+        Checks whether points lie inside the restricted area.
+
+        Args:
+            weight (float or array): Gross weight(s) in kg.
+            mac (float or array): CG position(s) in %MAC.
+
+        Returns:
+            bool or numpy.ndarray: True where the point is in the restricted area.
+        """
+        scalar = np.ndim(weight) == 0 and np.ndim(mac) == 0
+        weight, mac = np.broadcast_arrays(np.asarray(weight, dtype=float), np.asarray(mac, dtype=float))
+        inside = np.zeros(weight.shape, dtype=bool)
+        if self._edges is not None:
+            # Even-odd ray casting, vectorized over the points
+            x1, y1, x2, y2 = self._edges
+            for i in range(len(x1)):
+                crosses = (y1[i] > weight) != (y2[i] > weight)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    x_cross = x1[i] + (weight - y1[i]) * (x2[i] - x1[i]) / (y2[i] - y1[i])
+                inside ^= crosses & (mac < x_cross)
+        return self._output(inside, scalar)
+
+    def check(self, weight, mac):
+        """
+        Checks points against the envelope.
+
+        Args:
+            weight (float or array): Gross weight(s) in kg.
+            mac (float or array): CG position(s) in %MAC.
+
+        Returns:
+            dict: With the keys
+                - "in_envelope": True where the point is inside the certified envelope
+                - "in_restricted": True where the point is in the restricted area
+                - "forward_margin": %MAC aft of the forward limit (negative if forward of it)
+                - "aft_margin": %MAC forward of the aft limit (negative if aft of it)
+                Margins are NaN when the weight is outside the envelope's range.
+        """
+        scalar = np.ndim(weight) == 0 and np.ndim(mac) == 0
+        weight, mac = np.broadcast_arrays(np.asarray(weight, dtype=float), np.asarray(mac, dtype=float))
+
+        forward_margin = mac - self._limit(self._fwd_weights, self._fwd_mac, weight)
+        aft_margin = self._limit(self._aft_weights, self._aft_mac, weight) - mac
+        in_envelope = (forward_margin >= 0) & (aft_margin >= 0)
+
+        return {
+            "in_envelope": self._output(in_envelope, scalar),
+            "in_restricted": self._output(np.asarray(self.in_restricted_area(weight, mac)), scalar),
+            "forward_margin": self._output(forward_margin, scalar),
+            "aft_margin": self._output(aft_margin, scalar),
+        }
+
+
+# Shared instance compiled from the config envelope
+DEFAULT_ENVELOPE = CGEnvelope()
@@ -0,0 +1,98 @@
+"""
+This file contains the fleet comparison: one load (passengers, cargo,
+fuel) evaluated on every registration at once, for aircraft swaps.
+
+The tails only differ in their DOW and DOI, so the whole fleet is a single
+call of the vectorized engine with the DOW/DOI arrays against the same
+component loads, followed by one envelope check per trace point. The
+tails are ranked by their envelope margin: the smallest distance of any
+checked point (ZFW, TOW and, with a trip fuel, LW) to the forward or aft
+limit.
+"""
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+from src.batch_calculations import TRACE_POINTS, calculate_batch_summary
+from src.envelope import DEFAULT_ENVELOPE
+
+
+def compare_fleet(dow_options, pax, cargo, fuel, limits, landing_fuel=None,
+                  le_mac=config.LE_MAC_IN, mac_length=config.MAC_LENGTH_IN,
+                  reference_arm=config.KLM_REFERENCE_ARM_IN, envelope=DEFAULT_ENVELOPE):
+    """
+    Evaluates one load on every registration and ranks the tails.
+
+    Args:
+        dow_options (list): The "dow_options" of aircraft_reference.json.
+        pax, cargo, fuel (tuple): (weight, moment) of each load section.
+        limits (dict): The certified weight limits.
+        landing_fuel (tuple, optional): (weight, moment) of the fuel left at
+            landing; adds the LW to the checks.
+        le_mac (float, optional): Leading edge of MAC in inches.
+        mac_length (float, optional): MAC length in inches.
+        reference_arm (float, optional): KLM index reference arm in inches.
+        envelope (CGEnvelope, optional): The CG envelope to check against.
+
+    Returns:
+        list[dict]: One record per registration, best envelope margin first:
+            {"reg", "dow_weight", "doi", "trace": [(mac, weight), ...],
+             "weight": {point: kg}, "mac": {point: %MAC}, "klm_index": {"zfw", "tow"},
+             "margin": smallest margin (%MAC, -inf if a weight is outside
+             the envelope's range), "limiting": e.g. "TOW fwd",
+             "within_limits": bool, "breaches": [messages]}
+    """
+    dow_weight = np.array([d["dow_weight_kg"] for d in dow_options], dtype=float)
+    doi = np.array([d.get("doi", 0) for d in dow_options], dtype=float)
+    res = calculate_batch_summary(dow_weight, doi, *pax, *cargo, *fuel,
+                                  le_mac=le_mac, mac_length=mac_length, reference_arm=reference_arm)
+
+    points = ["zfw", "tow"]
+    if landing_fuel is not None:
+        # The LW is the ZFW plus the fuel left at landing
+        res["lw_weight"] = res["zfw_weight"] + landing_fuel[0]
+        lw_arm = (res["zfw_moment"] + landing_fuel[1]) / res["lw_weight"]
+        res["lw_mac"] = calc.calculate_mac_percent(lw_arm, le_mac, mac_length)
+        points.append("lw")
+
+    # Margins per point and side, NaN (weight out of range) counts as -inf
+    margins, labels = [], []
+    breach = (res["zfw_weight"] > limits["MZFW_kg"]) | (res["tow_weight"] > limits["MTOW_kg"]) \
+        | (res["tow_weight"] > limits["MTW_kg"]) | (res["zfw_weight"] < limits["MFW_kg"])
+    if landing_fuel is not None:
+        breach |= res["lw_weight"] > limits["MLW_kg"]
+    for point in points:
+        status = envelope.check(res[f"{point}_weight"], res[f"{point}_mac"])
+        breach |= ~status["in_envelope"] | status["in_restricted"]
+        for side in ("forward", "aft"):
+            margins.append(np.nan_to_num(status[f"{side}_margin"], nan=-np.inf))
+            labels.append(f"{point.upper()} {side[:3]}")
+    margins = np.array(margins)
+    margin = margins.min(axis=0)
+    limiting = margins.argmin(axis=0)
+
+    records = []
+    for i in np.argsort(-margin, kind="stable"):
+        breaches = []
+        if breach[i]:
+            # The message texts are only built for the tails that breach a limit
+            breaches = calc.check_limits(
+                float(res["zfw_weight"][i]), float(res["tow_weight"][i]), limits,
+                zfw_mac=float(res["zfw_mac"][i]), tow_mac=float(res["tow_mac"][i]), envelope=envelope,
+                lw_weight=float(res["lw_weight"][i]) if landing_fuel is not None else None,
+                lw_mac=float(res["lw_mac"][i]) if landing_fuel is not None else None)
+        records.append({
+            "reg": dow_options[i]["reg"],
+            "dow_weight": float(dow_weight[i]),
+            "doi": float(doi[i]),
+            "trace": [(float(res[f"{point}_mac"][i]), float(res[f"{point}_weight"][i]))
+                      for point in TRACE_POINTS],
+            "weight": {point: float(res[f"{point}_weight"][i]) for point in points},
+            "mac": {point: float(res[f"{point}_mac"][i]) for point in ["dow", "dow_pax"] + points},
+            "klm_index": {"zfw": float(res["klm_zfw"][i]), "tow": float(res["klm_tow"][i])},
+            "margin": float(margin[i]),
+            "limiting": labels[limiting[i]],
+            "within_limits": not breaches,
+            "breaches": breaches,
+        })
+    return records
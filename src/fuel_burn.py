@@ -0,0 +1,166 @@
+"""
+This file contains the fuel burn simulator: the aircraft CG from takeoff
+to landing while the trip fuel is burned in the standard order, center
+tank first, then the main tanks equally.
+
+The burn is stepped in small increments, but all steps are evaluated
+together: the tank liters of every step are computed as arrays and looked
+up on the compiled arm tables with one evaluate_many() call per tank.
+"""
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+from src.envelope import DEFAULT_ENVELOPE
+from src.load_state import CENTER_TANK_NAME, COMBINED_TABLE_NAME, MAIN_TANK_NAMES
+
+
+class FuelBurnCurve:
+    """
+    The TOW -> LW trace, one entry per burn step.
+
+    Attributes:
+        burned_kg (numpy.ndarray): Fuel burned at each step, from 0 to the trip fuel.
+        weight, moment, arm, mac (numpy.ndarray): The aircraft gross weight (kg),
+            moment (kg-in), CG arm (in) and CG (%MAC) at each step.
+        in_envelope, forward_margin, aft_margin (numpy.ndarray): The CG
+            envelope check of each step (see CGEnvelope.check).
+    """
+
+    def __init__(self, burned_kg, weight, moment, arm, mac, envelope=DEFAULT_ENVELOPE):
+        self.burned_kg = burned_kg
+        self.weight = weight
+        self.moment = moment
+        self.arm = arm
+        self.mac = mac
+        status = envelope.check(weight, mac)
+        self.in_envelope = status["in_envelope"]
+        self.forward_margin = status["forward_margin"]
+        self.aft_margin = status["aft_margin"]
+
+    @property
+    def landing_weight(self):
+        return float(self.weight[-1])
+
+    @property
+    def landing_arm(self):
+        return float(self.arm[-1])
+
+    @property
+    def landing_mac(self):
+        return float(self.mac[-1])
+
+    def min_margins(self):
+        """
+        Returns the smallest (forward, aft) margin along the curve in %MAC,
+        NaN where no step is within the envelope's weight range.
+        """
+        inside = ~np.isnan(self.forward_margin)
+        if not inside.any():
+            return float("nan"), float("nan")
+        return float(self.forward_margin[inside].min()), float(self.aft_margin[inside].min())
+
+    def first_excursion(self):
+        """
+        Returns the burned fuel (kg) at the first step outside the envelope,
+        or None if the whole curve stays inside.
+        """
+        outside = np.flatnonzero(~self.in_envelope)
+        return float(self.burned_kg[outside[0]]) if len(outside) else None
+
+    def trace(self):
+        """Returns the curve as a list of (mac, weight) points for plotting."""
+        return list(zip(self.mac.tolist(), self.weight.tolist()))
+
+
+def _burn_mains(main_liters, burn_l):
+    """
+    Burns the main tanks equally: every tank drops to the same level cut,
+    tanks below the cut are empty.
+
+    Args:
+        main_liters (numpy.ndarray): The liters in each main tank at takeoff.
+        burn_l (numpy.ndarray): The liters to burn from the mains per step.
+
+    Returns:
+        numpy.ndarray: The liters per main tank and step, shape (n_mains, n_steps).
+    """
+    levels = np.concatenate(([0.0], np.sort(main_liters)))
+    # Liters burned when every tank has dropped by `drop`: sum(min(M_i, drop))
+    burned_at = np.array([np.minimum(main_liters, level).sum() for level in levels])
+    drop = np.interp(burn_l, burned_at, levels)
+    return np.maximum(main_liters[:, None] - drop[None, :], 0.0)
+
+
+def simulate_fuel_burn(fuel, trip_kg, zfw_weight, zfw_moment, step_kg=config.FUEL_BURN_STEP_KG,
+                       le_mac=config.LE_MAC_IN, mac_length=config.MAC_LENGTH_IN, envelope=DEFAULT_ENVELOPE):
+    """
+    Simulates the burn of the trip fuel from the current fuel load.
+
+    Tank weights are rounded like in FuelLoad, so the first point equals
+    the TOW of the summary.
+
+    Args:
+        fuel (FuelLoad): The fuel at takeoff (liters per tank, density, arm tables).
+        trip_kg (float): The fuel burned until landing, in kg.
+        zfw_weight (float): The Zero Fuel Weight in kg.
+        zfw_moment (float): The Zero Fuel moment in kg-in.
+        step_kg (float, optional): The burn increment in kg.
+        le_mac (float, optional): Leading edge of MAC in inches.
+        mac_length (float, optional): MAC length in inches.
+        envelope (CGEnvelope, optional): The CG envelope to check against.
+
+    Returns:
+        FuelBurnCurve: The trace from TOW (first entry) to LW (last entry).
+
+    Raises:
+        ValueError: If the trip fuel is negative or exceeds the fuel on board.
+    """
+    density = fuel.density
+    liters = {tname: fuel.state.get(tname, {}).get("liters", 0) for tname in fuel.tank_names}
+    on_board_kg = sum(liters.values()) * density
+    if trip_kg < 0:
+        raise ValueError("Trip fuel must not be negative.")
+    if trip_kg > on_board_kg + 0.5:
+        raise ValueError(f"Trip fuel ({trip_kg:.1f} kg) exceeds the fuel on board ({on_board_kg:.1f} kg).")
+
+    burned_kg = np.arange(0.0, trip_kg, step_kg)
+    burned_kg = np.append(burned_kg, float(trip_kg)) if trip_kg > 0 else np.zeros(1)
+    burned_l = np.minimum(burned_kg / density, sum(liters.values()))
+
+    # Center tank first, then the mains equally; other tanks are not burned
+    center_l = liters.get(CENTER_TANK_NAME, 0)
+    step_liters = {tname: np.full(len(burned_kg), float(l)) for tname, l in liters.items()}
+    step_liters[CENTER_TANK_NAME] = np.maximum(center_l - burned_l, 0.0)
+    mains = np.array([liters.get(tname, 0) for tname in MAIN_TANK_NAMES], dtype=float)
+    for tname, values in zip(MAIN_TANK_NAMES, _burn_mains(mains, np.maximum(burned_l - center_l, 0.0))):
+        step_liters[tname] = values
+
+    # Weights and moments of all steps, rounded as in FuelLoad.set_liters
+    fuel_weight = np.zeros(len(burned_kg))
+    fuel_moment = np.zeros(len(burned_kg))
+    step_liters = {tname: np.round(values, 1) for tname, values in step_liters.items()}
+    combined_table = fuel.arm_tables.get(COMBINED_TABLE_NAME)
+    use_combined = np.zeros(len(burned_kg), dtype=bool)
+    if combined_table is not None:
+        use_combined = np.all([step_liters[tname] > 0 for tname in MAIN_TANK_NAMES], axis=0)
+        main_l = sum(step_liters[tname] for tname in MAIN_TANK_NAMES)
+        main_weight = np.round(main_l * density, 1)
+        fuel_weight += np.where(use_combined, main_weight, 0.0)
+        fuel_moment += np.where(use_combined, main_weight * combined_table.evaluate_many(main_l), 0.0)
+
+    for tname, values in step_liters.items():
+        weight = np.round(values * density, 1)
+        moment = weight * fuel.arm_tables[tname].evaluate_many(values)
+        if tname in MAIN_TANK_NAMES:
+            # Represented by the combined entry where all mains hold fuel
+            weight = np.where(use_combined, 0.0, weight)
+            moment = np.where(use_combined, 0.0, moment)
+        fuel_weight += weight
+        fuel_moment += moment
+
+    weight = zfw_weight + fuel_weight
+    moment = zfw_moment + fuel_moment
+    arm = moment / weight
+    mac = calc.calculate_mac_percent(arm, le_mac, mac_length)
+    return FuelBurnCurve(burned_kg, weight, moment, arm, mac, envelope)
@@ -0,0 +1,187 @@
+"""
+This file contains the FuelSchedule, which distributes a total fuel figure
+over the tanks in the standard loading order: the main tanks equally until
+they are full, then the center tank.
+
+The distribution is precomputed once as a 1-D schedule over the total fuel
+volume, with a breakpoint wherever one of the involved arm tables has a
+point. Between two breakpoints every tank's liters and arm are linear in
+the total, so any fuel figure resolves exactly with a binary search and
+one linear interpolation: with bisect on plain lists for a single figure,
+and with NumPy for whole arrays. The schedule is kept in liters, so the
+same schedule serves every density.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+
+class FuelSchedule:
+    """The per-tank fuel distribution as a function of the total fuel."""
+
+    def __init__(self, tanks, arm_tables, main_names, center_name, combined_table=None):
+        """
+        Builds the schedule.
+
+        Args:
+            tanks (dict): {tank name: tank data with "max_l"}
+            arm_tables (dict): {tank name: CompiledArmTable}
+            main_names (tuple): The main tanks, filled first and equally.
+            center_name (str): The center tank, filled last.
+            combined_table (CompiledArmTable, optional): The arm table for the
+                sum of the mains, used as in FuelLoad when all mains hold fuel.
+        """
+        self.main_names = tuple(main_names)
+        self.center_name = center_name
+        self.tank_names = self.main_names + (center_name,)
+        self._arm_tables = arm_tables
+        self._combined_table = combined_table
+
+        n_main = len(self.main_names)
+        self.main_max_l = min(tanks[name]["max_l"] for name in self.main_names)
+        self.center_max_l = tanks[center_name]["max_l"]
+        self.mains_full_l = n_main * self.main_max_l
+        self.capacity_l = self.mains_full_l + self.center_max_l
+
+        # Breakpoints of the schedule, in total liters
+        knots = {0.0, self.mains_full_l, self.capacity_l}
+        for name in self.main_names:
+            knots.update(n_main * l for l in arm_tables[name].liters if 0 < l < self.main_max_l)
+        if combined_table is not None:
+            knots.update(l for l in combined_table.liters if 0 < l < self.mains_full_l)
+        knots.update(self.mains_full_l + l for l in arm_tables[center_name].liters if 0 < l < self.center_max_l)
+        self.total_l = np.array(sorted(knots))
+
+        # Tank arms at the breakpoints
+        main_l, center_l = self._split(self.total_l)
+        self.arms = {name: arm_tables[name].evaluate_many(main_l) for name in self.main_names}
+        self.arms[center_name] = arm_tables[center_name].evaluate_many(center_l)
+        self.combined_arms = combined_table.evaluate_many(main_l * n_main) if combined_table is not None else None
+
+        # The same schedule as plain lists for single figures, where NumPy's call overhead dominates
+        self._knots = self.total_l.tolist()
+        self._arm_lists = {name: column.tolist() for name, column in self.arms.items()}
+        self._combined_list = self.combined_arms.tolist() if self.combined_arms is not None else None
+
+    def _split(self, total_l):
+        """Returns the liters per main tank and in the center tank for total liters."""
+        main_l = np.minimum(total_l / len(self.main_names), self.main_max_l)
+        center_l = np.clip(total_l - self.mains_full_l, 0, self.center_max_l)
+        return main_l, center_l
+
+    def capacity_kg(self, density):
+        """Returns the total capacity of the scheduled tanks in kg at a density."""
+        return self.capacity_l * density
+
+    def check(self, total_kg, density):
+        """
+        Checks that a single total fuel weight can be distributed.
+
+        Args:
+            total_kg (float): Total fuel in kg.
+            density (float): Fuel density in kg/L.
+
+        Raises:
+            ValueError: If the figure is negative or exceeds the tank capacity.
+        """
+        if total_kg < 0:
+            raise ValueError("Total fuel must not be negative.")
+        if total_kg / density > self.capacity_l * (1 + 1e-9):
+            raise ValueError(f"Total fuel exceeds the tank capacity of {self.capacity_kg(density):.1f} kg.")
+
+    def resolve_many(self, total_kg, density):
+        """
+        Distributes an array of total fuel weights.
+
+        Args:
+            total_kg (array-like): Total fuel in kg.
+            density (float or array-like): Fuel density in kg/L, or one
+                density per figure.
+
+        Returns:
+            dict: {"liters": {tank: array}, "arms": {tank: array},
+                   "weight": array, "moment": array}
+
+        Raises:
+            ValueError: If a figure is negative or exceeds the tank capacity.
+        """
+        density = np.asarray(density, dtype=float)
+        total_l = np.asarray(total_kg, dtype=float) / density
+        if np.any(total_l < 0):
+            raise ValueError("Total fuel must not be negative.")
+        over = total_l > self.capacity_l * (1 + 1e-9)
+        if np.any(over):
+            capacity = np.broadcast_to(self.capacity_kg(density), over.shape)[over][0]
+            raise ValueError(f"Total fuel exceeds the tank capacity of {capacity:.1f} kg.")
+
+        # Binary search for the schedule segment, then interpolate within it
+        knots = self.total_l
+        i = np.clip(np.searchsorted(knots, total_l, side="right"), 1, len(knots) - 1)
+        t = (total_l - knots[i - 1]) / (knots[i] - knots[i - 1])
+
+        def interpolate(column):
+            return column[i - 1] + (column[i] - column[i - 1]) * t
+
+        main_l, center_l = self._split(total_l)
+        liters = {name: main_l for name in self.main_names}
+        liters[self.center_name] = center_l
+        arms = {name: interpolate(column) for name, column in self.arms.items()}
+
+        main_weight = main_l * density
+        center_weight = center_l * density
+        if self.combined_arms is not None:
+            # All mains hold fuel whenever any does, so the combined table applies
+            main_moment = len(self.main_names) * main_weight * interpolate(self.combined_arms)
+        else:
+            main_moment = sum(main_weight * arms[name] for name in self.main_names)
+        return {
+            "liters": liters,
+            "arms": arms,
+            "weight": len(self.main_names) * main_weight + center_weight,
+            "moment": main_moment + center_weight * arms[self.center_name],
+        }
+
+    def distribute(self, total_kg, density):
+        """
+        Distributes a single total fuel weight.
+
+        Args:
+            total_kg (float): Total fuel in kg.
+            density (float): Fuel density in kg/L.
+
+        Returns:
+            dict: {"liters": {tank: l}, "arms": {tank: a}, "weight": kg, "moment": kg-in}
+
+        Raises:
+            ValueError: If the figure is negative or exceeds the tank capacity.
+        """
+        self.check(total_kg, density)
+        total_l = total_kg / density
+
+        # Same segment and interpolation as resolve_many
+        knots = self._knots
+        i = min(max(bisect_right(knots, total_l), 1), len(knots) - 1)
+        t = (total_l - knots[i - 1]) / (knots[i] - knots[i - 1])
+
+        def interpolate(column):
+            return column[i - 1] + (column[i] - column[i - 1]) * t
+
+        n_main = len(self.main_names)
+        main_l = min(total_l / n_main, self.main_max_l)
+        center_l = min(max(total_l - self.mains_full_l, 0.0), self.center_max_l)
+        liters = {name: main_l for name in self.main_names}
+        liters[self.center_name] = center_l
+        arms = {name: interpolate(column) for name, column in self._arm_lists.items()}
+
+        main_weight = main_l * density
+        center_weight = center_l * density
+        if self._combined_list is not None:
+            main_moment = n_main * main_weight * interpolate(self._combined_list)
+        else:
+            main_moment = sum(main_weight * arms[name] for name in self.main_names)
+        return {
+            "liters": liters,
+            "arms": arms,
+            "weight": n_main * main_weight + center_weight,
+            "moment": main_moment + center_weight * arms[self.center_name],
+        }
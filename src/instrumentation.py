@@ -0,0 +1,172 @@
+"""
+This file contains the hot-path instrumentation: per-stage timings, call
+counts and the end-to-end click-to-plot latency of the GUI.
+
+Stages are timed with `with PROFILER.stage("name"):` or the @timed
+decorator. While the profiler is disabled, stage() returns a shared
+do-nothing context manager, so the instrumented code pays only for one
+attribute check.
+"""
+import functools
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# Number of most recent samples per stage used for the percentiles
+DEFAULT_WINDOW = 1000
+PERCENTILES = (50, 95, 99)
+
+_NO_OP = nullcontext()
+
+
+class _Stage:
+    """Context manager that records the duration of one stage call."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Records durations per named stage in rolling windows, plus open
+    "spans" that start at one point in the code and end at another (e.g.
+    from a button click to the plot redraw).
+    """
+
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW):
+        """
+        Args:
+            enabled (bool, optional): Whether timings are recorded.
+            window (int, optional): Number of recent samples kept per stage.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """Discards all recorded samples and open spans."""
+        self._samples = {}  # {name: deque of durations in seconds}
+        self._counts = {}  # {name: total number of calls}
+        self._open_spans = {}  # {name: start time}
+
+    def stage(self, name):
+        """
+        Returns a context manager that times the enclosed block.
+
+        Args:
+            name (str): The stage name.
+        """
+        if not self.enabled:
+            return _NO_OP
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """Adds one duration sample for a stage."""
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+            self._counts[name] = 0
+        samples.append(seconds)
+        self._counts[name] += 1
+
+    def start_span(self, name):
+        """
+        Starts a span unless it is already open, so that with repeated
+        triggers (e.g. a held button) the span measures from the first one.
+        """
+        if self.enabled and name not in self._open_spans:
+            self._open_spans[name] = time.perf_counter()
+
+    def end_span(self, name):
+        """Ends an open span and records its duration. Does nothing if it is not open."""
+        start = self._open_spans.pop(name, None)
+        if start is not None and self.enabled:
+            self.record(name, time.perf_counter() - start)
+
+    def take_span(self, name):
+        """
+        Closes an open span without recording it, for a span that ends
+        elsewhere (e.g. in another process); record() its duration later.
+
+        Returns:
+            float or None: The perf_counter() start time, None if the span is not open.
+        """
+        start = self._open_spans.pop(name, None)
+        return start if self.enabled else None
+
+    def summary(self):
+        """
+        Returns the statistics of all stages.
+
+        Returns:
+            dict: {name: {"count", "mean_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms"}},
+                where the times cover the rolling window and "count" all calls.
+        """
+        stats = {}
+        for name, samples in self._samples.items():
+            values = np.fromiter(samples, dtype=float, count=len(samples)) * 1000
+            entry = {"count": self._counts[name], "mean_ms": float(values.mean()), "max_ms": float(values.max())}
+            for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                entry[f"p{p}_ms"] = float(value)
+            stats[name] = entry
+        return stats
+
+    def format_summary(self):
+        """Returns the statistics as a fixed-width text table."""
+        lines = [f"{'stage':28} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for name, s in sorted(self.summary().items()):
+            lines.append(f"{name:28} {s['count']:>7} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} "
+                         f"{s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}")
+        return "\n".join(lines)
+
+    def dump(self, filepath):
+        """
+        Writes the statistics and the raw samples of the window to a JSON file.
+
+        Args:
+            filepath (str): The output file path.
+        """
+        data = {
+            "window": self.window,
+            "stages": self.summary(),
+            "samples_ms": {name: [s * 1000 for s in samples] for name, samples in self._samples.items()},
+        }
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+# The application-wide profiler, disabled by default
+PROFILER = Profiler()
+
+
+def timed(name, profiler=PROFILER):
+    """
+    Decorator that times every call of a function as a stage.
+
+    Args:
+        name (str): The stage name.
+        profiler (Profiler, optional): The profiler to record to.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Stage(profiler, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -10,24 +10,37 @@ matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 import numpy as np
 import threading
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 # Import configuration constants and utilities
 import src.config as config
 import src.app_utils as utils
+from src.instrumentation import PROFILER
 
 
 class LiveCGPlot:
     """
     Manages a live Matplotlib window showing the 777-300ER CG envelope
-    and the sequential loading trace (DOW -> +Pax -> ZFW -> TOW).
+    and the sequential loading trace (DOW -> +Pax -> ZFW -> TOW), plus
+    the in-flight fuel burn curve (TOW -> LW) when a trip fuel is set.
 
     This class is designed to be thread-safe, allowing updates from
     different threads (e.g., the main tkinter app).
+
+    In blit mode the static envelope background is rendered once and
+    cached; updates only restore that background and redraw the eight
+    trace artists on top of it. The cache is refreshed whenever the
+    figure is fully redrawn, e.g. after a resize.
     """
 
-    def __init__(self):
-        """Initializes the plot figure, axes, and all dynamic artists."""
+    def __init__(self, blit=True):
+        """
+        Initializes the plot figure, axes, and all dynamic artists.
+
+        Args:
+            blit (bool, optional): Use blitting for trace updates when the
+                canvas supports it. Falls back to full redraws otherwise.
+        """
         # Handy feature: prevents race conditions when updating plot data
         self._lock = threading.Lock()
 
@@ -70,6 +83,14 @@ class LiveCGPlot:
             label="Fuel Load",
             zorder=4
         )[0]
+        self.line_burn = self.ax.plot(
+            [], [],
+            color='purple',
+            linewidth=2,
+            linestyle='--',
+            label="Fuel Burn (TOW -> LW)",
+            zorder=4
+        )[0]
 
         # 2. Weight Points (one for each point type)
         self.scatter_intermediate = self.ax.scatter(
@@ -95,14 +116,35 @@ class LiveCGPlot:
             zorder=6,
             label="TOW CG"
         )
+        self.scatter_lw = self.ax.scatter(
+            [], [],
+            color='purple',
+            marker='o',
+            s=120,
+            zorder=6,
+            label="LW CG"
+        )
 
         self.ax.legend()
 
+        # --- Blitting Setup ---
+        self._trace_artists = (self.line_pax, self.line_cargo, self.line_fuel, self.line_burn,
+                               self.scatter_intermediate, self.scatter_zfw, self.scatter_tow, self.scatter_lw)
+        self.blit = blit and getattr(self.fig.canvas, "supports_blit", False)
+        self._background = None  # Cached static background, set on every full draw
+        if self.blit:
+            # Animated artists are skipped by full draws and drawn by blitting only
+            for artist in self._trace_artists:
+                artist.set_animated(True)
+            self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+            self.fig.canvas.mpl_connect("resize_event", self._on_resize)
+
         # Enable interactive mode and show the plot without blocking
         plt.ion()
         plt.show(block=False)
 
-    def update_full_trace(self, trace_points: List[Tuple[float, float]]):
+    def update_full_trace(self, trace_points: List[Tuple[float, float]],
+                          burn_points: Optional[List[Tuple[float, float]]] = None):
         """
         Updates the entire sequential loading trace with 4 new points.
 
@@ -112,6 +154,8 @@ class LiveCGPlot:
                           [2] DOW + Passengers
                           [3] ZFW (Zero Fuel Weight)
                           [4] TOW (Takeoff Weight)
+            burn_points: The fuel burn curve as (mac, weight) tuples from
+                         TOW to LW. None or empty hides the burn segment.
         """
         if not trace_points or len(trace_points) != 4:
             return  # Invalid data, do nothing
@@ -142,29 +186,70 @@ class LiveCGPlot:
             # 6. Update TOW Point
             self.scatter_tow.set_offsets(np.array([p_tow]))
 
+            # 7. Update Fuel Burn Curve (TOW -> LW) and LW Point
+            if burn_points:
+                burn = np.asarray(burn_points, dtype=float)
+                self.line_burn.set_data(burn[:, 0], burn[:, 1])
+                self.scatter_lw.set_offsets(burn[-1:])
+            else:
+                self.line_burn.set_data([], [])
+                self.scatter_lw.set_offsets(np.empty((0, 2)))
+
             # Redraw the canvas with the new data
-            self.fig.canvas.draw_idle()
-            self.fig.canvas.flush_events()
+            with PROFILER.stage("plot.redraw"):
+                self._redraw()
+
+    def _on_draw(self, event):
+        """
+        Caches the freshly drawn static background and paints the trace on
+        top of it. Called by matplotlib after every full draw (without the
+        lock, as it may run inside flush_events of an update).
+        """
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_trace_artists()
+
+    def _on_resize(self, event):
+        """Invalidates the cached background; the next full draw recaches it."""
+        self._background = None
+
+    def _draw_trace_artists(self):
+        """Draws only the trace lines and points."""
+        for artist in self._trace_artists:
+            self.ax.draw_artist(artist)
+
+    def _redraw(self):
+        """Updates the window, by blitting when a cached background is available."""
+        canvas = self.fig.canvas
+        if self.blit and self._background is not None:
+            canvas.restore_region(self._background)
+            self._draw_trace_artists()
+            canvas.blit(self.fig.bbox)
+        else:
+            # No background yet (or no blit support): a full draw, which
+            # also (re)creates the cache through the draw_event
+            canvas.draw_idle()
+        canvas.flush_events()
 
     def reset_trace(self):
         """Clears all loading traces and points from the plot."""
         # Acquire lock to safely update plot artists
         with self._lock:
-            # Clear all 3 lines
+            # Clear all 4 lines
             self.line_pax.set_data([], [])
             self.line_cargo.set_data([], [])
             self.line_fuel.set_data([], [])
+            self.line_burn.set_data([], [])
 
-            # Clear all 3 scatter plots
+            # Clear all 4 scatter plots
             # Note: set_offsets requires an empty (0, 2) array
             empty_data = np.empty((0, 2))
             self.scatter_intermediate.set_offsets(empty_data)
             self.scatter_zfw.set_offsets(empty_data)
             self.scatter_tow.set_offsets(empty_data)
+            self.scatter_lw.set_offsets(empty_data)
 
             # Redraw the empty canvas
-            self.fig.canvas.draw_idle()
-            self.fig.canvas.flush_events()
+            self._redraw()
 
     def close(self):
         """Closes the Matplotlib plot window."""
@@ -0,0 +1,233 @@
+"""
+This file contains the MomentLedger and MaskLedger, running weight and
+moment totals that the load modules update by deltas, so their totals are
+available in constant time no matter how many items are loaded.
+
+Both ledgers count their changes in `version`, so that results derived
+from a ledger can be cached until the version moves.
+"""
+import numpy as np
+
+
+class MomentLedger:
+    """
+    Keeps per-item (weight, moment) entries plus running totals.
+
+    Every change adjusts the totals by the difference between the old and
+    the new entry. Because repeated float additions and subtractions can
+    drift, the totals are rebuilt from the entries every
+    `verify_interval` changes.
+    """
+
+    def __init__(self, verify_interval=500):
+        """
+        Initializes an empty ledger.
+
+        Args:
+            verify_interval (int, optional): Number of changes between two
+                full recomputations of the totals.
+        """
+        self.verify_interval = verify_interval
+        self._entries = {}  # {key: (weight, moment)}
+        self.total_weight = 0.0
+        self.total_moment = 0.0
+        self._changes_since_verify = 0
+        self.version = 0  # Incremented on every change of the entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def set(self, key, weight, arm):
+        """
+        Adds or replaces the entry for an item.
+
+        Args:
+            key (hashable): The item identifier (e.g. a seat or slot key).
+            weight (float): The item weight in kg. A weight of 0 removes it.
+            arm (float): The item arm in inches.
+        """
+        if not weight:
+            self.remove(key)
+            return
+
+        old_weight, old_moment = self._entries.get(key, (0.0, 0.0))
+        moment = weight * arm
+        self._entries[key] = (weight, moment)
+        self.total_weight += weight - old_weight
+        self.total_moment += moment - old_moment
+        self.version += 1
+        self._count_change()
+
+    def remove(self, key):
+        """
+        Removes the entry for an item, if present.
+
+        Args:
+            key (hashable): The item identifier.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if not self._entries:
+            self.clear()  # Avoid leaving float residue on an empty ledger
+            return
+        self.total_weight -= entry[0]
+        self.total_moment -= entry[1]
+        self.version += 1
+        self._count_change()
+
+    def clear(self):
+        """Removes all entries and resets the totals."""
+        self._entries.clear()
+        self.total_weight = 0.0
+        self.total_moment = 0.0
+        self._changes_since_verify = 0
+        self.version += 1
+
+    def totals(self):
+        """
+        Returns the current totals.
+
+        Returns:
+            tuple (float, float, float):
+                - total_weight (kg)
+                - total_moment (kg-in)
+                - cg (inches), 0 if nothing is loaded
+        """
+        cg = self.total_moment / self.total_weight if self.total_weight > 0 else 0
+        return self.total_weight, self.total_moment, cg
+
+    def recompute(self):
+        """
+        Rebuilds the totals from the individual entries.
+
+        Returns:
+            tuple (float, float): The (weight, moment) drift that was corrected.
+        """
+        weight = sum(w for w, _ in self._entries.values())
+        moment = sum(m for _, m in self._entries.values())
+        drift = (self.total_weight - weight, self.total_moment - moment)
+        self.total_weight = weight
+        self.total_moment = moment
+        self._changes_since_verify = 0
+        return drift
+
+    def _count_change(self):
+        """Triggers the periodic full recompute."""
+        self._changes_since_verify += 1
+        if self._changes_since_verify >= self.verify_interval:
+            self.recompute()
+
+
+class MaskLedger:
+    """
+    A ledger for items that live at fixed positions in arrays.
+
+    The selection is a boolean mask: a single change adjusts the running
+    totals by one item, and bulk changes replace the mask and recompute
+    the totals with one dot product. As with MomentLedger, the totals are
+    rebuilt every `verify_interval` single changes.
+
+    With `lateral_arms`, the same mask also accumulates the lateral
+    (left/right) moment in `total_lateral_moment`.
+    """
+
+    def __init__(self, arms, weights=None, verify_interval=500, lateral_arms=None):
+        """
+        Initializes an empty selection.
+
+        Args:
+            arms (numpy.ndarray): The arm of each item in inches.
+            weights (numpy.ndarray, optional): The weight of each item.
+                Defaults to 1 per item, so the totals become the item
+                count and the sum of arms.
+            verify_interval (int, optional): Number of single changes
+                between two full recomputations of the totals.
+            lateral_arms (numpy.ndarray, optional): The lateral arm of each
+                item in inches, positive to the right.
+        """
+        self.arms = np.asarray(arms, dtype=float)
+        self.weights = np.ones_like(self.arms) if weights is None else np.asarray(weights, dtype=float)
+        self.moments = self.weights * self.arms
+        self.lateral_moments = None if lateral_arms is None \
+            else self.weights * np.asarray(lateral_arms, dtype=float)
+        self.mask = np.zeros(len(self.arms), dtype=bool)
+        self.verify_interval = verify_interval
+        self.total_weight = 0.0
+        self.total_moment = 0.0
+        self.total_lateral_moment = 0.0
+        self._changes_since_verify = 0
+        self.version = 0  # Incremented on every change of the selection
+
+    def set_selected(self, i, selected):
+        """
+        Selects or deselects a single item.
+
+        Args:
+            i (int): The item position.
+            selected (bool): The new selection state.
+        """
+        if self.mask[i] == selected:
+            return
+        self.mask[i] = selected
+        self.version += 1
+        sign = 1 if selected else -1
+        self.total_weight += sign * self.weights[i]
+        self.total_moment += sign * self.moments[i]
+        if self.lateral_moments is not None:
+            self.total_lateral_moment += sign * self.lateral_moments[i]
+
+        self._changes_since_verify += 1
+        if self._changes_since_verify >= self.verify_interval:
+            self.recompute()
+
+    def update_mask(self, mask):
+        """
+        Replaces the whole selection.
+
+        Args:
+            mask (numpy.ndarray): The new boolean selection mask.
+
+        Returns:
+            numpy.ndarray: Mask of the items whose state changed.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        changed = mask != self.mask
+        self.mask = mask.copy()
+        if changed.any():
+            self.version += 1
+        self.recompute()
+        return changed
+
+    def totals(self):
+        """
+        Returns the current totals.
+
+        Returns:
+            tuple (float, float, float):
+                - total_weight
+                - total_moment
+                - cg (inches), 0 if nothing is selected
+        """
+        cg = self.total_moment / self.total_weight if self.total_weight > 0 else 0
+        return self.total_weight, self.total_moment, cg
+
+    def recompute(self):
+        """
+        Rebuilds the totals from the mask.
+
+        Returns:
+            tuple (float, float): The (weight, moment) drift that was corrected.
+        """
+        weight = float(self.weights @ self.mask)
+        moment = float(self.moments @ self.mask)
+        drift = (self.total_weight - weight, self.total_moment - moment)
+        self.total_weight = weight
+        self.total_moment = moment
+        if self.lateral_moments is not None:
+            self.total_lateral_moment = float(self.lateral_moments @ self.mask)
+        self._changes_since_verify = 0
+        return drift
@@ -0,0 +1,383 @@
+"""
+This file contains the streaming load sheet engine used by batch.py.
+
+Load plans are plain dictionaries (one JSON object per input line). Each
+plan is reduced to its passenger, cargo and fuel weight and moment in pure
+Python; the DOW -> ZFW -> TOW chain, KLM indices and envelope checks are
+then evaluated for a whole chunk of plans at once with the vectorized
+engine. Only a single chunk is held in memory at any time.
+
+A load plan looks like this (all load keys are optional):
+
+    {"id": "KL0867-20251104", "registration": "PH-BVA",
+     "seats": ["1A", "1C", "12K"],           # or "pax": 312 / {"F": 30, "Y": 282}
+     "cargo": {"11P": 4676, "31": 1200},      # kg per cargo position
+     "fuel": {"Main Tank 1": 20000, "Main Tank 2": 20000, "Center Tank": 30000},
+                                              # or total kg, loaded mains first: 60000
+     "pax_weight": 88.5, "fuel_density": 0.8507}
+"""
+import json
+import math
+
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+from src.data_cache import load_compiled_data
+from src.batch_calculations import calculate_batch_summary
+from src.cargo_index import CargoIndex
+from src.envelope import DEFAULT_ENVELOPE
+from src.load_state import FuelLoad
+from src.seat_index import CLASS_CODES, SeatIndex
+
+# Number of plans evaluated together by the vectorized engine
+DEFAULT_CHUNK_SIZE = 2048
+
+
+class LoadPlanError(ValueError):
+    """Raised when a load plan cannot be evaluated."""
+
+
+def _quantity(value, what):
+    """
+    Checks a count, weight or volume of a load plan.
+
+    Args:
+        value: The value from the plan.
+        what (str): Description of the value for the error message.
+
+    Returns:
+        int or float: The value.
+
+    Raises:
+        LoadPlanError: If the value is not a finite number (JSON true/false
+            and NaN/Infinity included).
+    """
+    # Exact types first: JSON gives plain ints and floats (bool is a subclass of int)
+    if type(value) is int or type(value) is float and math.isfinite(value):
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise LoadPlanError(f"{what} must be a finite number.")
+    return value
+
+
+class LoadSheetEngine:
+    """
+    Evaluates load plans into load sheet records without any tkinter state.
+    """
+
+    def __init__(self, seat_map, cargo_data, tank_data, aircraft_ref, limits,
+                 le_mac=config.LE_MAC_IN, mac_length=config.MAC_LENGTH_IN,
+                 reference_arm=config.KLM_REFERENCE_ARM_IN, envelope=DEFAULT_ENVELOPE,
+                 seat_index=None, cargo_index=None, arm_tables=None):
+        """
+        Args:
+            seat_map (list): The seat map data.
+            cargo_data (list): The cargo positions data.
+            tank_data (list): The fuel tanks data.
+            aircraft_ref (dict): The aircraft reference data with "dow_options".
+            limits (dict): The certified weight limits.
+            le_mac (float, optional): Leading edge of MAC in inches.
+            mac_length (float, optional): MAC length in inches.
+            reference_arm (float, optional): KLM index reference arm in inches.
+            envelope (CGEnvelope, optional): The CG envelope to check against.
+            seat_index, cargo_index, arm_tables (optional): Prebuilt indexes of
+                the data, e.g. from the compiled data cache.
+        """
+        self.aircraft = {d["reg"]: d for d in aircraft_ref["dow_options"]}
+        self.limits = limits
+        self.le_mac = le_mac
+        self.mac_length = mac_length
+        self.reference_arm = reference_arm
+        self.envelope = envelope
+
+        # Seats by their printed name, e.g. "12K"
+        if seat_index is None:
+            seat_index = SeatIndex(seat_map)
+        self.seat_arms = {f"{row}{seat}": float(arm) for (row, seat), arm in zip(seat_index.keys, seat_index.arms)}
+        # Seat count and mean arm per class, for plans that only give pax counts
+        self.class_seats = {}
+        for cabin_class in CLASS_CODES:
+            arms = seat_index.arms[seat_index.class_mask(cabin_class)]
+            self.class_seats[cabin_class] = (len(arms), float(arms.mean()) if len(arms) else 0.0)
+        self.cabin_seats = (len(seat_index), float(seat_index.arms.mean()))
+
+        # Cargo slots by position name; position names are unique over the holds
+        self.cargo_index = cargo_index if cargo_index is not None else CargoIndex(cargo_data)
+        self.cargo_keys = {key[1]: key for key in self.cargo_index.slots}
+
+        self.fuel = FuelLoad(tank_data, arm_tables=arm_tables)
+        self.tank_names = set(self.fuel.tank_names)
+
+    @classmethod
+    def from_compiled(cls, data, **kwargs):
+        """Creates an engine from compiled data, reusing its prebuilt indexes."""
+        return cls(data.seat_map, data.cargo_data, data.tank_data, data.aircraft_ref, data.limits,
+                   seat_index=data.seat_index, cargo_index=data.cargo_index, arm_tables=data.arm_tables,
+                   **kwargs)
+
+    @classmethod
+    def from_files(cls, **kwargs):
+        """Creates an engine from the data files in config.py (via the compiled data cache)."""
+        return cls.from_compiled(load_compiled_data(), **kwargs)
+
+    # --- Per-plan reduction ---
+
+    def _passenger_load(self, plan):
+        """Returns (pax_count, weight, moment) of a plan."""
+        pax_weight = _quantity(plan.get("pax_weight", config.DEFAULT_PASSENGER_WEIGHT_KG), "'pax_weight'")
+        seats = plan.get("seats")
+        pax = plan.get("pax")
+        if seats is not None and pax is not None:
+            raise LoadPlanError("Give either 'seats' or 'pax', not both.")
+
+        if seats is not None:
+            if not isinstance(seats, list):
+                raise LoadPlanError("'seats' must be a list of seat names.")
+            if len(set(seats)) != len(seats):
+                raise LoadPlanError("Duplicate seats in 'seats'.")
+            try:
+                arm_sum = sum(map(self.seat_arms.__getitem__, seats))
+            except KeyError as e:
+                raise LoadPlanError(f"Unknown seat '{e.args[0]}'.") from None
+            return len(seats), pax_weight * len(seats), pax_weight * arm_sum
+
+        if pax is None:
+            return 0, 0.0, 0.0
+        counts = pax if isinstance(pax, dict) else {None: pax}
+        count, moment = 0, 0.0
+        for cabin_class, n in counts.items():
+            capacity, mean_arm = self.cabin_seats if cabin_class is None else self.class_seats.get(cabin_class,
+                                                                                                   (None, None))
+            if capacity is None:
+                raise LoadPlanError(f"Unknown cabin class '{cabin_class}'.")
+            if isinstance(n, bool) or not isinstance(n, int) or not 0 <= n <= capacity:
+                raise LoadPlanError(f"Passenger count must be an integer between 0 and {capacity}.")
+            # Unassigned passengers are placed at the mean seat arm of their cabin
+            count += n
+            moment += n * mean_arm
+        return count, pax_weight * count, pax_weight * moment
+
+    def _cargo_load(self, plan, notes):
+        """Returns (weight, moment) of a plan's cargo; loading breaches go to `notes`."""
+        cargo = plan.get("cargo")
+        if cargo is None:
+            return 0.0, 0.0
+        if not isinstance(cargo, dict):
+            raise LoadPlanError("'cargo' must be an object of kg per position.")
+        state = {}
+        weight, moment = 0.0, 0.0
+        for position, kg in cargo.items():
+            key = self.cargo_keys.get(position)
+            if key is None:
+                raise LoadPlanError(f"Unknown cargo position '{position}'.")
+            kg = _quantity(kg, f"Cargo weight for position '{position}'")
+            if kg < 0:
+                raise LoadPlanError(f"Negative cargo weight for position '{position}'.")
+            if not kg:
+                continue
+            allowed_ULDs = self.cargo_index.slots[key].get("allowed_ULDs", [])
+            max_kg = allowed_ULDs[0]["max_kg"] if allowed_ULDs else 0
+            if kg > max_kg:
+                notes.append(f"Cargo position {position} ({kg:.1f} kg) exceeds its maximum of {max_kg} kg.")
+            state[key] = kg
+            weight += kg
+            moment += kg * self.cargo_index.arms[key]
+
+        # A pallet and a container it covers can never both be loaded
+        for key in state:
+            for container in self.cargo_index.covers.get(key, ()):
+                if container in state:
+                    notes.append(f"Cargo position {container[1]} is loaded but blocked by pallet {key[1]}.")
+        return weight, moment
+
+    @staticmethod
+    def _fuel_density(plan):
+        """Returns the fuel density of a plan in kg/L."""
+        density = _quantity(plan.get("fuel_density", config.DEFAULT_FUEL_DENSITY_KG_L), "'fuel_density'")
+        if density <= 0:
+            raise LoadPlanError("'fuel_density' must be positive.")
+        return density
+
+    def _fuel_load(self, plan, notes):
+        """
+        Returns (weight, moment) of a plan's fuel; loading breaches go to `notes`.
+        A total fuel figure returns (total kg, None): its moment is resolved
+        by evaluate() with the fuel schedule for the whole chunk.
+        """
+        fuel = plan.get("fuel")
+        if fuel is not None and not isinstance(fuel, dict):
+            # Total fuel in kg; anything else is neither liters per tank nor a total
+            fuel = _quantity(fuel, "'fuel' (liters per tank or total kg)")
+        if not fuel:
+            return 0.0, 0.0
+        density = self._fuel_density(plan)
+        if not isinstance(fuel, dict):
+            try:
+                self.fuel.schedule.check(fuel, density)
+            except ValueError as e:
+                raise LoadPlanError(str(e)) from None
+            return fuel, None
+        self.fuel.density = density
+        self.fuel.clear()
+        for tname, liters in fuel.items():
+            if tname not in self.tank_names:
+                raise LoadPlanError(f"Unknown fuel tank '{tname}'.")
+            liters = _quantity(liters, f"Fuel quantity for '{tname}'")
+            if liters < 0:
+                raise LoadPlanError(f"Negative fuel quantity for '{tname}'.")
+            max_l = self.fuel.tanks[tname]["max_l"]
+            if liters > max_l:
+                notes.append(f"{tname} ({liters:.1f} L) exceeds its capacity of {max_l} L.")
+            self.fuel.set_liters(tname, liters)
+        weight, moment, _ = self.fuel.get_cg()
+        if weight > config.MAX_TOTAL_FUEL_KG:
+            notes.append(f"Fuel weight ({weight:.1f} kg) exceeds the tank capacity of {config.MAX_TOTAL_FUEL_KG} kg.")
+        return weight, moment
+
+    def reduce_plan(self, plan):
+        """
+        Reduces a load plan to its component loads.
+
+        Args:
+            plan (dict): The load plan.
+
+        Returns:
+            tuple: (aircraft_ref, pax_count, (pax_w, pax_m), (cargo_w, cargo_m),
+                (fuel_w, fuel_m), notes); fuel_m is None for a total fuel
+                figure, which evaluate() distributes.
+
+        Raises:
+            LoadPlanError: If the plan is invalid.
+        """
+        if not isinstance(plan, dict):
+            raise LoadPlanError("A load plan must be a JSON object.")
+        aircraft_ref = self.aircraft.get(plan.get("registration"))
+        if aircraft_ref is None:
+            raise LoadPlanError(f"Unknown registration '{plan.get('registration')}'.")
+
+        notes = []
+        pax_count, pax_w, pax_m = self._passenger_load(plan)
+        cargo = self._cargo_load(plan, notes)
+        fuel = self._fuel_load(plan, notes)
+        return aircraft_ref, pax_count, (pax_w, pax_m), cargo, fuel, notes
+
+    # --- Chunk evaluation ---
+
+    def evaluate(self, reduced):
+        """
+        Evaluates a chunk of reduced plans with the vectorized engine.
+
+        Args:
+            reduced (list): (line, plan, reduce_plan() result) tuples.
+
+        Returns:
+            list[dict]: One load sheet record per plan, in input order.
+        """
+        if not reduced:
+            return []
+        columns = np.array([(r[2][0]["dow_weight_kg"], r[2][0].get("doi", 0), *r[2][2], *r[2][3], *r[2][4])
+                            for r in reduced], dtype=float).T
+        # Total fuel figures are distributed for the whole chunk in one schedule lookup
+        scheduled = [i for i, r in enumerate(reduced) if r[2][4][1] is None]
+        if scheduled:
+            fuel = self.fuel.schedule.resolve_many(columns[6, scheduled],
+                                                   [self._fuel_density(reduced[i][1]) for i in scheduled])
+            columns[6, scheduled] = fuel["weight"]
+            columns[7, scheduled] = fuel["moment"]
+        res = calculate_batch_summary(*columns, le_mac=self.le_mac, mac_length=self.mac_length,
+                                      reference_arm=self.reference_arm)
+        zfw_env = self.envelope.check(res["zfw_weight"], res["zfw_mac"])
+        tow_env = self.envelope.check(res["tow_weight"], res["tow_mac"])
+
+        limits = self.limits
+        breach = ((res["zfw_weight"] > limits["MZFW_kg"]) | (res["tow_weight"] > limits["MTOW_kg"])
+                  | (res["tow_weight"] > limits["MTW_kg"]) | (res["zfw_weight"] < limits["MFW_kg"])
+                  | ~zfw_env["in_envelope"] | ~tow_env["in_envelope"]
+                  | zfw_env["in_restricted"] | tow_env["in_restricted"])
+
+        # Plain Python columns rounded as on the printed load sheet (weights
+        # to 0.1 kg, the rest to 0.01); NaN margins (weight out of range) become None
+        out = {}
+        for name, values in (("dow", columns[0]), ("pax", columns[2]), ("cargo", columns[4]),
+                             ("fuel", columns[6]), ("zfw", res["zfw_weight"]), ("tow", res["tow_weight"])):
+            out[f"{name}_weight"] = np.round(values, 1).tolist()
+        for name in ("dow_arm", "zfw_arm", "tow_arm", "dow_mac", "dow_pax_mac", "zfw_mac", "tow_mac",
+                     "klm_dow", "klm_pax", "klm_cargo", "klm_fuel", "klm_zfw", "klm_tow"):
+            out[name] = np.round(res[name], 2).tolist()
+        for label, env in (("zfw", zfw_env), ("tow", tow_env)):
+            for side in ("forward", "aft"):
+                values = np.round(env[f"{side}_margin"], 2)
+                out[f"{label}_{side}_margin"] = np.where(np.isnan(values), None, values).tolist()
+        breach = np.flatnonzero(breach).tolist()
+
+        records = []
+        for i, (line, plan, (aircraft_ref, pax_count, _, _, _, notes)) in enumerate(reduced):
+            records.append({
+                "line": line,
+                "id": plan.get("id"),
+                "registration": aircraft_ref["reg"],
+                "pax_count": pax_count,
+                "weight": {"dow": out["dow_weight"][i], "pax": out["pax_weight"][i], "cargo": out["cargo_weight"][i],
+                           "fuel": out["fuel_weight"][i], "zfw": out["zfw_weight"][i], "tow": out["tow_weight"][i]},
+                "cg_in": {"dow": out["dow_arm"][i], "zfw": out["zfw_arm"][i], "tow": out["tow_arm"][i]},
+                "mac": {"dow": out["dow_mac"][i], "dow_pax": out["dow_pax_mac"][i],
+                        "zfw": out["zfw_mac"][i], "tow": out["tow_mac"][i]},
+                "klm_index": {"dow": out["klm_dow"][i], "pax": out["klm_pax"][i], "cargo": out["klm_cargo"][i],
+                              "fuel": out["klm_fuel"][i], "zfw": out["klm_zfw"][i], "tow": out["klm_tow"][i]},
+                "envelope_margin": {"zfw": [out["zfw_forward_margin"][i], out["zfw_aft_margin"][i]],
+                                    "tow": [out["tow_forward_margin"][i], out["tow_aft_margin"][i]]},
+                "within_limits": not notes,
+                "breaches": list(notes),
+            })
+
+        # The message texts are only built for the plans that breach a limit
+        for i in breach:
+            records[i]["breaches"] += calc.check_limits(float(res["zfw_weight"][i]), float(res["tow_weight"][i]),
+                                                        limits, zfw_mac=float(res["zfw_mac"][i]),
+                                                        tow_mac=float(res["tow_mac"][i]), envelope=self.envelope)
+            records[i]["within_limits"] = not records[i]["breaches"]
+        return records
+
+    def iter_load_sheets(self, lines, chunk_size=DEFAULT_CHUNK_SIZE, first_line=1):
+        """
+        Streams load sheet records for an iterable of JSONL lines.
+
+        Lines are consumed lazily and records are yielded in input order,
+        so memory use is bounded by `chunk_size` no matter how long the
+        input is. Invalid plans yield {"line", "id", "error"} records.
+
+        Args:
+            lines (iterable[str or dict]): JSONL input, e.g. an open file or
+                sys.stdin. Already parsed plans may be passed as dicts.
+            chunk_size (int, optional): Number of plans evaluated together.
+            first_line (int, optional): Line number of the first item.
+
+        Yields:
+            dict: One record per non-blank input line.
+        """
+        pending = []  # (line, plan, reduced) or (line, error record)
+        reduced = []
+
+        def flush():
+            records = iter(self.evaluate(reduced))
+            for item in pending:
+                yield next(records) if len(item) == 3 else item[1]
+            pending.clear()
+            reduced.clear()
+
+        for line_no, line in enumerate(lines, start=first_line):
+            if isinstance(line, str) and not line.strip():
+                continue
+            plan = None
+            try:
+                plan = json.loads(line) if isinstance(line, str) else line
+                item = (line_no, plan, self.reduce_plan(plan))
+                reduced.append(item)
+            except (ValueError, TypeError) as e:
+                plan_id = plan.get("id") if isinstance(plan, dict) else None
+                item = (line_no, {"line": line_no, "id": plan_id, "error": str(e)})
+            pending.append(item)
+            if len(pending) >= chunk_size:
+                yield from flush()
+        yield from flush()
@@ -0,0 +1,522 @@
+"""
+This file contains the headless load state of the aircraft: passengers,
+cargo and fuel, with all weight, moment and blocking logic, but without
+any tkinter or matplotlib dependency.
+
+The GUI modules are views over these classes, and the same classes can be
+used from worker processes, command-line tools and tests.
+"""
+import src.config as config
+from src.data_cache import load_compiled_data
+from src.fuel_schedule import FuelSchedule
+from src.calculations import CompiledArmTable
+from src.cargo_index import CargoIndex
+from src.load_ledger import MaskLedger, MomentLedger
+from src.seat_index import SeatIndex
+
+# Name of the backend-only fuel table used when both main tanks hold fuel
+COMBINED_TABLE_NAME = "main_tanks_combined_table"
+COMBINED_STATE_NAME = "Main Tanks Combined"
+MAIN_TANK_NAMES = ("Main Tank 1", "Main Tank 2")
+CENTER_TANK_NAME = "Center Tank"
+
+
+class PassengerLoad:
+    """Seat selection and passenger weight/moment."""
+
+    def __init__(self, seat_map, seat_index=None):
+        """
+        Args:
+            seat_map (list): The list of dictionaries defining the seat layout.
+            seat_index (SeatIndex, optional): A prebuilt index of seat_map.
+        """
+        self.seat_map = seat_map
+        self.seat_index = seat_index if seat_index is not None else SeatIndex(seat_map)
+        # One unit of weight per seat: the ledger weight is the passenger
+        # count and its moments the sums of the selected (lateral) arms
+        self.ledger = MaskLedger(self.seat_index.arms, lateral_arms=self.seat_index.lateral_arms)
+
+    @property
+    def mask(self):
+        """The boolean selection mask over seat_index positions."""
+        return self.ledger.mask
+
+    @property
+    def version(self):
+        """Change counter of the selection."""
+        return self.ledger.version
+
+    @property
+    def selected(self):
+        """The selected seats as a set of (row, seat) tuples."""
+        return set(self.seat_index.keys_for(self.ledger.mask))
+
+    @property
+    def count(self):
+        """The number of selected seats."""
+        return int(round(self.ledger.total_weight))
+
+    def is_selected(self, key):
+        """Returns True if the (row, seat) key is selected."""
+        i = self.seat_index.position.get(key)
+        return i is not None and bool(self.ledger.mask[i])
+
+    def toggle(self, key):
+        """
+        Toggles a single seat.
+
+        Args:
+            key (tuple): (row, seat) of the seat.
+
+        Returns:
+            bool or None: The new selection state, None for an unknown seat.
+        """
+        i = self.seat_index.position.get(key)
+        if i is None:
+            return None
+        selected = not self.ledger.mask[i]
+        self.ledger.set_selected(i, selected)
+        return selected
+
+    def set_mask(self, mask):
+        """
+        Replaces the whole selection.
+
+        Args:
+            mask (numpy.ndarray): The new boolean seat mask.
+
+        Returns:
+            numpy.ndarray: Mask of the seats whose state changed.
+        """
+        return self.ledger.update_mask(mask)
+
+    def select_seats(self, keys):
+        """Adds the given (row, seat) keys to the selection. Unknown seats are ignored."""
+        mask = self.ledger.mask.copy()
+        for key in keys:
+            i = self.seat_index.position.get(key)
+            if i is not None:
+                mask[i] = True
+        return self.set_mask(mask)
+
+    def select_all(self):
+        """Selects every seat."""
+        return self.set_mask(~self.seat_index.empty_mask())
+
+    def deselect_all(self):
+        """Clears the selection."""
+        return self.set_mask(self.seat_index.empty_mask())
+
+    def select_row(self, row):
+        """Adds all seats of a row to the selection."""
+        return self.set_mask(self.ledger.mask | self.seat_index.row_mask(row))
+
+    def select_letter(self, letter):
+        """Adds all seats with a seat letter to the selection."""
+        return self.set_mask(self.ledger.mask | self.seat_index.letter_mask(letter))
+
+    def get_cg(self, pax_weight=config.DEFAULT_PASSENGER_WEIGHT_KG):
+        """
+        Calculates the total weight, moment, and CG of the selected passengers.
+
+        Args:
+            pax_weight (float, optional): The weight of a single passenger.
+
+        Returns:
+            tuple (float, float, float): total_weight (kg), total_moment (kg-in), cg (inches)
+        """
+        total_weight = pax_weight * self.ledger.total_weight
+        total_moment = pax_weight * self.ledger.total_moment
+        cg = total_moment / total_weight if total_weight > 0 else 0
+        return total_weight, total_moment, cg
+
+    def get_lateral_moment(self, pax_weight=config.DEFAULT_PASSENGER_WEIGHT_KG):
+        """
+        Returns the lateral moment (kg-in, positive to the right) of the
+        selected passengers.
+
+        Args:
+            pax_weight (float, optional): The weight of a single passenger.
+        """
+        return pax_weight * self.ledger.total_lateral_moment
+
+
+class CargoLoad:
+    """ULD loads per cargo slot, blocking state and cargo weight/moment."""
+
+    def __init__(self, cargo_data, index=None):
+        """
+        Args:
+            cargo_data (list): The list of dictionaries defining cargo slots.
+            index (CargoIndex, optional): A prebuilt index of cargo_data.
+        """
+        self.cargo_data = cargo_data
+        self.index = index if index is not None else CargoIndex(cargo_data)
+        self.state = {}  # {key: {"weight": w, "ULD_type": t} or None}
+        self.blocked = set()  # Keys of the currently blocked slots
+        self.ledger = MomentLedger()
+
+    @property
+    def version(self):
+        """Change counter of the loaded weights."""
+        return self.ledger.version
+
+    def default_uld(self, key):
+        """
+        Returns the default (first allowed) ULD for a slot.
+
+        Args:
+            key (tuple): (compartment, position) of the slot.
+
+        Returns:
+            dict or None: The ULD entry, None if the slot allows no ULD.
+        """
+        allowed_ULDs = self.index.slots[key].get("allowed_ULDs", [])
+        return allowed_ULDs[0] if allowed_ULDs else None
+
+    def set_load(self, key, load):
+        """
+        Stores the load for a slot and updates the ledger and blocking state.
+
+        Args:
+            key (tuple): (compartment, position) of the slot.
+            load (dict or None): {"weight": w, "ULD_type": t}, or None to empty it.
+
+        Returns:
+            tuple: The keys whose loaded or blocked state may have changed.
+        """
+        self.state[key] = load
+        if load:
+            self.ledger.set(key, load["weight"], self.index.arms.get(key, 0))
+        else:
+            self.ledger.remove(key)
+
+        affected = (key, *self.index.neighbours(key))
+        for k in affected:
+            if self.index.is_blocked(k, self.state):
+                self.blocked.add(k)
+            else:
+                self.blocked.discard(k)
+        return affected
+
+    def load_max(self, key):
+        """
+        Loads the maximum weight of the default ULD into a slot.
+
+        Returns:
+            tuple or None: The affected keys, None if the slot allows no ULD.
+        """
+        uld = self.default_uld(key)
+        if uld is None:
+            return None
+        return self.set_load(key, {"weight": uld["max_kg"], "ULD_type": uld["type"]})
+
+    def toggle(self, key):
+        """
+        Toggles a slot between empty and max weight.
+
+        Returns:
+            tuple or None: The affected keys, None if the slot allows no ULD.
+        """
+        if self.state.get(key):
+            return self.set_load(key, None)
+        return self.load_max(key)
+
+    def load_max_all(self):
+        """Loads max weight to all CONTAINER slots. Skips pallet slots."""
+        for key in self.index.covered_by:
+            uld = self.default_uld(key)
+            if uld:
+                self.state[key] = {"weight": uld["max_kg"], "ULD_type": uld["type"]}
+                self.ledger.set(key, uld["max_kg"], self.index.arms[key])
+            else:
+                self.state[key] = None
+                self.ledger.remove(key)
+        self.recompute_blocks()
+
+    def clear(self):
+        """Empties all slots."""
+        self.state.clear()
+        self.ledger.clear()
+        self.blocked.clear()
+
+    def assign(self, assignment):
+        """
+        Replaces the whole cargo load, e.g. with a plan of the cargo auto-loader.
+
+        Args:
+            assignment (dict): {key: {"weight": w, "ULD_type": t}}
+        """
+        self.clear()
+        for key, load in assignment.items():
+            self.state[key] = load
+            self.ledger.set(key, load["weight"], self.index.arms[key])
+        self.recompute_blocks()
+
+    def recompute_blocks(self):
+        """Recomputes the full blocked set from the state."""
+        self.blocked = self.index.blocked_keys(self.state)
+
+    def get_cg(self):
+        """
+        Returns the total weight, moment, and CG of all loaded cargo.
+
+        Returns:
+            tuple (float, float, float): total_weight (kg), total_moment (kg-in), cg (inches)
+        """
+        return self.ledger.totals()
+
+
+class FuelLoad:
+    """Fuel liters per tank and the resulting fuel weight/moment."""
+
+    def __init__(self, tank_data, fuel_density=config.DEFAULT_FUEL_DENSITY_KG_L, arm_tables=None):
+        """
+        Args:
+            tank_data (list): The list of dictionaries defining the fuel tanks.
+            fuel_density (float, optional): Fuel density in kg/L.
+            arm_tables (dict, optional): Prebuilt {tank name: CompiledArmTable}.
+        """
+        self.tank_data = tank_data
+        self.tanks = {t["tank"]: t for t in tank_data}
+        self._tank_names = tuple(t["tank"] for t in tank_data if t["tank"] != COMBINED_TABLE_NAME)
+        self.lateral_arms = {tname: config.TANK_LATERAL_ARMS_IN.get(tname, 0.0) for tname in self._tank_names}
+        if arm_tables is None:
+            arm_tables = {t["tank"]: CompiledArmTable(t["arm_table"]) for t in tank_data}
+        self.arm_tables = arm_tables
+        # Table for the sum of both mains, None if the data has no combined table
+        self._combined_table = arm_tables.get(COMBINED_TABLE_NAME)
+        self._density = fuel_density
+        self.state = {}  # {tname: {"liters": l, "arm": a, "weight": w}}
+        self.version = 0  # Incremented on every change of the tank state or density
+        self._totals = None  # (version, (weight, moment, cg)) of the last aggregation
+        self._lateral = None  # (version, (lateral moment, imbalance, main fuel)) of the last lateral aggregation
+        self._schedule = None
+
+    @property
+    def tank_names(self):
+        """Names of the loadable tanks (without the combined table)."""
+        return self._tank_names
+
+    @property
+    def schedule(self):
+        """The FuelSchedule for total fuel figures, built on first use."""
+        if self._schedule is None:
+            self._schedule = FuelSchedule(self.tanks, self.arm_tables, MAIN_TANK_NAMES, CENTER_TANK_NAME,
+                                          self._combined_table)
+        return self._schedule
+
+    @property
+    def density(self):
+        """The fuel density in kg/L."""
+        return self._density
+
+    @density.setter
+    def density(self, density):
+        # The combined main tank weight depends on the density directly
+        self._density = density
+        self.version += 1
+
+    def set_liters(self, tname, liters):
+        """
+        Sets the liter amount for a tank and recalculates its arm and weight.
+
+        Args:
+            tname (str): The tank name.
+            liters (float): The amount of fuel in liters.
+
+        Returns:
+            dict: The new tank state {"liters", "arm", "weight"}.
+        """
+        liters = round(liters, 1)
+        arm = self.arm_tables[tname](liters)
+        kg = round(liters * self.density, 1)
+        self.state[tname] = {"liters": liters, "arm": arm, "weight": kg}
+        self.version += 1
+        return self.state[tname]
+
+    def set_density(self, density):
+        """Sets the fuel density and recalculates all tank weights."""
+        self.density = density
+        for tname in self.tank_names:
+            self.set_liters(tname, self.state.get(tname, {}).get("liters", 0))
+
+    def distribute(self, total_kg):
+        """
+        Loads a total fuel weight at the current density in the standard
+        loading order (mains first, then center). Other tanks are emptied.
+
+        Args:
+            total_kg (float): Total fuel in kg.
+
+        Returns:
+            dict: The distribution from FuelSchedule.distribute.
+
+        Raises:
+            ValueError: If the figure is negative or exceeds the tank capacity.
+        """
+        result = self.schedule.distribute(total_kg, self._density)
+        for tname in self._tank_names:
+            self.set_liters(tname, result["liters"].get(tname, 0))
+        return result
+
+    def clear(self):
+        """Sets all tanks to 0 liters."""
+        for tname in self.tank_names:
+            self.state[tname] = {"liters": 0, "arm": 0, "weight": 0}
+        self.version += 1
+
+    def get_cg(self):
+        """
+        Returns total fuel weight, moment, and CG.
+
+        When BOTH main tanks hold fuel, their sum is evaluated on the
+        combined main tank table and stored as "Main Tanks Combined" in the
+        state; otherwise each tank uses its own table.
+
+        The result is computed once per change of the liters or the
+        density; calls in between return the cached totals.
+
+        Returns:
+            tuple (float, float, float): total_weight (kg), total_moment (kg-in), cg (inches)
+        """
+        if self._totals is None or self._totals[0] != self.version:
+            self._totals = (self.version, self._aggregate())
+        return self._totals[1]
+
+    def _aggregate(self):
+        """Computes the totals and the combined main tank entry in a single pass over the tanks."""
+        total_weight, total_moment = 0, 0
+        main_liters, main_weight, main_moment, mains_filled = 0, 0, 0, 0
+
+        for tname in self._tank_names:
+            tank = self.state.get(tname)
+            if tank is None:
+                continue
+            if tname in MAIN_TANK_NAMES:
+                # Kept apart until it is known whether the combined table applies
+                main_liters += tank["liters"]
+                main_weight += tank["weight"]
+                main_moment += tank["weight"] * tank["arm"]
+                mains_filled += tank["liters"] > 0
+            else:
+                total_weight += tank["weight"]
+                total_moment += tank["weight"] * tank["arm"]
+
+        if self._combined_table is not None and mains_filled == len(MAIN_TANK_NAMES):
+            combined_arm = self._combined_table(main_liters)
+            combined_weight = round(main_liters * self._density, 1)
+            self.state[COMBINED_STATE_NAME] = {"liters": main_liters, "arm": combined_arm,
+                                               "weight": combined_weight}
+            total_weight += combined_weight
+            total_moment += combined_weight * combined_arm
+        else:
+            self.state.pop(COMBINED_STATE_NAME, None)
+            total_weight += main_weight
+            total_moment += main_moment
+
+        cg = total_moment / total_weight if total_weight > 0 else 0
+        return total_weight, total_moment, cg
+
+    def get_lateral(self):
+        """
+        Returns the lateral moment of the fuel and the main tank imbalance,
+        cached like get_cg.
+
+        Returns:
+            tuple (float, float, float):
+                - lateral moment (kg-in, positive to the right)
+                - Main Tank 2 minus Main Tank 1 weight (kg)
+                - Main Tank 1 plus Main Tank 2 weight (kg)
+        """
+        if self._lateral is None or self._lateral[0] != self.version:
+            weights = {tname: self.state.get(tname, {}).get("weight", 0) for tname in self._tank_names}
+            moment = sum(weights[tname] * self.lateral_arms[tname] for tname in self._tank_names)
+            left, right = (weights.get(tname, 0) for tname in MAIN_TANK_NAMES)
+            self._lateral = (self.version, (moment, right - left, left + right))
+        return self._lateral[1]
+
+
+class LoadState:
+    """The complete aircraft load: passengers, cargo and fuel."""
+
+    def __init__(self, seat_map, cargo_data, tank_data, fuel_density=config.DEFAULT_FUEL_DENSITY_KG_L):
+        """
+        Args:
+            seat_map (list): The seat map data.
+            cargo_data (list): The cargo positions data.
+            tank_data (list): The fuel tanks data.
+            fuel_density (float, optional): Fuel density in kg/L.
+        """
+        self.pax = PassengerLoad(seat_map)
+        self.cargo = CargoLoad(cargo_data)
+        self.fuel = FuelLoad(tank_data, fuel_density)
+        self._component_cache = {}  # {name: (cache key, (w, m, cg))}
+
+    @classmethod
+    def from_compiled(cls, data, fuel_density=config.DEFAULT_FUEL_DENSITY_KG_L):
+        """
+        Creates an empty LoadState that shares the prebuilt indexes of
+        compiled data instead of building its own.
+
+        Args:
+            data (CompiledData): The compiled aircraft data.
+            fuel_density (float, optional): Fuel density in kg/L.
+        """
+        state = cls.__new__(cls)
+        state.pax = PassengerLoad(data.seat_map, data.seat_index)
+        state.cargo = CargoLoad(data.cargo_data, data.cargo_index)
+        state.fuel = FuelLoad(data.tank_data, fuel_density, data.arm_tables)
+        state._component_cache = {}
+        return state
+
+    @classmethod
+    def from_files(cls, fuel_density=config.DEFAULT_FUEL_DENSITY_KG_L):
+        """Creates an empty LoadState from the data files in config.py (via the compiled data cache)."""
+        return cls.from_compiled(load_compiled_data(), fuel_density)
+
+    def versions(self):
+        """Returns the (pax, cargo, fuel) change counters."""
+        return self.pax.version, self.cargo.version, self.fuel.version
+
+    def component_loads(self, pax_weight=config.DEFAULT_PASSENGER_WEIGHT_KG):
+        """
+        Returns the (weight, moment, cg) tuples of all three load sections.
+        Each section is only recomputed if it changed since the last call.
+
+        Args:
+            pax_weight (float, optional): The weight of a single passenger.
+
+        Returns:
+            dict: {"pax": (w, m, cg), "cargo": (w, m, cg), "fuel": (w, m, cg)}
+        """
+        return {
+            "pax": self._cached("pax", (self.pax.version, pax_weight), lambda: self.pax.get_cg(pax_weight)),
+            "cargo": self._cached("cargo", self.cargo.version, self.cargo.get_cg),
+            "fuel": self._cached("fuel", self.fuel.version, self.fuel.get_cg),
+        }
+
+    def lateral_balance(self, pax_weight=config.DEFAULT_PASSENGER_WEIGHT_KG):
+        """
+        Returns the lateral (left/right) balance of the load. The cargo
+        positions lie on the centerline and add no lateral moment.
+
+        Args:
+            pax_weight (float, optional): The weight of a single passenger.
+
+        Returns:
+            dict: {"pax", "fuel", "total": lateral moments (kg-in, positive
+                to the right), "fuel_imbalance": Main Tank 2 - Main Tank 1 (kg),
+                "main_fuel": Main Tank 1 + Main Tank 2 (kg)}
+        """
+        pax_moment = self.pax.get_lateral_moment(pax_weight)
+        fuel_moment, fuel_imbalance, main_fuel = self.fuel.get_lateral()
+        return {"pax": pax_moment, "fuel": fuel_moment, "total": pax_moment + fuel_moment,
+                "fuel_imbalance": fuel_imbalance, "main_fuel": main_fuel}
+
+    def _cached(self, name, key, compute):
+        """Returns the cached result of a section, recomputing it if its key changed."""
+        entry = self._component_cache.get(name)
+        if entry is None or entry[0] != key:
+            entry = self._component_cache[name] = (key, compute())
+        return entry[1]
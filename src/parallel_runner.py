@@ -0,0 +1,102 @@
+"""
+This file contains the parallel runner for large batches and scenario
+sweeps. Plans are split into chunks that are evaluated by a pool of
+worker processes, each holding its own LoadSheetEngine.
+
+The data files are loaded once per worker by the pool initializer, not
+per task. Results are yielded in input order, so the output of a
+parallel run is identical to the serial LoadSheetEngine.iter_load_sheets.
+"""
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.load_sheet import DEFAULT_CHUNK_SIZE, LoadSheetEngine
+
+# Engine of the current worker process, set by _init_worker
+_engine = None
+
+
+def _init_worker(engine_kwargs):
+    """Pool initializer: loads the aircraft data once per worker."""
+    global _engine
+    _engine = LoadSheetEngine.from_files(**engine_kwargs)
+
+
+def _evaluate_chunk(first_line, items, encode):
+    """Evaluates one chunk of lines or plans in a worker."""
+    records = _engine.iter_load_sheets(items, chunk_size=len(items), first_line=first_line)
+    return [(json.dumps(r), "error" in r) for r in records] if encode else list(records)
+
+
+def iter_load_sheets_parallel(lines, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, encode=False, **engine_kwargs):
+    """
+    Streams load sheet records for JSONL lines or plan dicts, using a
+    process pool.
+
+    At most two chunks per worker are in flight, so memory use stays
+    bounded for inputs of any length.
+
+    Args:
+        lines (iterable[str or dict]): JSONL lines or already parsed plans.
+        workers (int, optional): Number of worker processes, defaults to
+            the number of CPUs.
+        chunk_size (int, optional): Number of plans per task.
+        encode (bool, optional): If True, the workers also JSON-encode the
+            records, which keeps the parent process off the critical path.
+            Each record then comes as a (JSON string, is error) pair.
+        **engine_kwargs: Passed on to LoadSheetEngine.from_files in every worker.
+
+    Yields:
+        dict or tuple: The same records, in the same order, as the serial
+            LoadSheetEngine.iter_load_sheets ((JSON string, is error) if `encode`).
+    """
+    workers = workers or os.cpu_count() or 1
+    lines = iter(lines)
+    first_line = 1
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(engine_kwargs,)) as pool:
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(itertools.islice(lines, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_evaluate_chunk, first_line, chunk, encode))
+                first_line += len(chunk)
+            if not pending:
+                break
+            yield from pending.popleft().result()
+
+
+def sweep_plans(registrations, pax_loads=(None,), cargo_loads=(None,), fuel_loads=(None,), **plan_options):
+    """
+    Generates the load plans of a full scenario sweep, in a fixed order.
+
+    Every combination of registration x pax x cargo x fuel yields one
+    plan, with the indices of the combination as its id.
+
+    Args:
+        registrations (iterable[str]): Aircraft registrations.
+        pax_loads (sequence, optional): "pax" values (counts or {class: count}).
+        cargo_loads (sequence, optional): "cargo" values ({position: kg}).
+        fuel_loads (sequence, optional): "fuel" values ({tank: liters}).
+        **plan_options: Extra keys added to every plan (e.g. pax_weight).
+
+    Yields:
+        dict: One load plan per combination.
+    """
+    for reg in registrations:
+        for (p, pax), (c, cargo), (f, fuel) in itertools.product(enumerate(pax_loads), enumerate(cargo_loads),
+                                                                 enumerate(fuel_loads)):
+            plan = {"id": f"{reg}/{p}/{c}/{f}", "registration": reg, **plan_options}
+            if pax is not None:
+                plan["pax"] = pax
+            if cargo is not None:
+                plan["cargo"] = cargo
+            if fuel is not None:
+                plan["fuel"] = fuel
+            yield plan
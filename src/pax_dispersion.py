@@ -0,0 +1,139 @@
+"""
+This file contains the passenger CG dispersion: before check-in closes
+only the booked passenger count per cabin class is known, not the seats.
+The ZFW and TOW CG are simulated over many random seatings of these
+passengers in the free seats of their class.
+
+A seating only matters through its moment, and seats with the same arm
+are interchangeable, so each draw is the number of passengers per
+distinct arm: one multivariate hypergeometric draw over the arm groups
+of a class, done by NumPy for a whole batch of draws at once. When more
+than half of the free seats are taken, the empty seats are drawn instead
+and subtracted from the full class.
+"""
+import numpy as np
+
+import src.config as config
+import src.calculations as calc
+from src.envelope import DEFAULT_ENVELOPE
+from src.seat_index import CLASS_CODES
+
+
+class PaxDispersion:
+    """
+    The ZFW and TOW CG of every draw.
+
+    The drawn seatings all carry the same weight, so each point has a
+    single weight and a distribution of CGs.
+
+    Attributes:
+        counts (dict): The simulated passengers per class.
+        weight (dict): {"zfw", "tow": weight (kg)}
+        mac (dict): {"zfw", "tow": numpy.ndarray of the CG (%MAC) of each draw}
+        out_of_envelope (dict): {"zfw", "tow": boolean numpy.ndarray, True
+            where the draw is outside the envelope or in the restricted area}
+    """
+
+    def __init__(self, counts, zfw_weight, tow_weight, zfw_mac, tow_mac, envelope=DEFAULT_ENVELOPE):
+        self.counts = counts
+        self.weight = {"zfw": zfw_weight, "tow": tow_weight}
+        self.mac = {"zfw": zfw_mac, "tow": tow_mac}
+        self.out_of_envelope = {}
+        for point in ("zfw", "tow"):
+            status = envelope.check(np.full_like(self.mac[point], self.weight[point]), self.mac[point])
+            self.out_of_envelope[point] = ~status["in_envelope"] | status["in_restricted"]
+
+    @property
+    def n_draws(self):
+        return len(self.mac["zfw"])
+
+    def stats(self, point, percentiles=config.PAX_DISPERSION_PERCENTILES):
+        """
+        Summarizes the CG distribution of a point.
+
+        Args:
+            point (str): "zfw" or "tow".
+            percentiles (tuple, optional): The percentiles to report.
+
+        Returns:
+            dict: {"mean", "std", "min", "max": %MAC, "percentiles": {p: %MAC},
+                   "p_out": fraction of the draws out of the envelope}
+        """
+        mac = self.mac[point]
+        return {
+            "mean": float(mac.mean()),
+            "std": float(mac.std()),
+            "min": float(mac.min()),
+            "max": float(mac.max()),
+            "percentiles": dict(zip(percentiles, np.percentile(mac, percentiles).tolist())),
+            "p_out": float(self.out_of_envelope[point].mean()),
+        }
+
+
+def simulate_pax_dispersion(seat_index, counts, zfw_weight, zfw_moment, fuel_weight=0.0, fuel_moment=0.0,
+                            occupied=None, n_draws=config.PAX_DISPERSION_DRAWS, seed=config.PAX_DISPERSION_SEED,
+                            pax_weight=config.DEFAULT_PASSENGER_WEIGHT_KG,
+                            batch_size=config.PAX_DISPERSION_BATCH_SIZE, le_mac=config.LE_MAC_IN,
+                            mac_length=config.MAC_LENGTH_IN, envelope=DEFAULT_ENVELOPE):
+    """
+    Simulates random seatings of unassigned passengers. The draws are
+    reproducible for the same seed and batch size.
+
+    Args:
+        seat_index (SeatIndex): The seat arrays.
+        counts (dict): {class: number of unassigned passengers}, e.g. {"F": 20, "Y": 300}.
+        zfw_weight (float): The ZFW without the unassigned passengers (kg).
+        zfw_moment (float): The ZFW moment without the unassigned passengers (kg-in).
+        fuel_weight (float, optional): The fuel weight (kg) added for the TOW.
+        fuel_moment (float, optional): The fuel moment (kg-in).
+        occupied (numpy.ndarray, optional): Mask of the seats already assigned,
+            which are not drawn.
+        n_draws (int, optional): The number of random seatings.
+        seed (int, optional): The random seed.
+        pax_weight (float, optional): The weight of a single passenger.
+        batch_size (int, optional): Draws computed per NumPy batch.
+        le_mac (float, optional): Leading edge of MAC in inches.
+        mac_length (float, optional): MAC length in inches.
+        envelope (CGEnvelope, optional): The CG envelope to check against.
+
+    Returns:
+        PaxDispersion: The CG of every draw.
+
+    Raises:
+        ValueError: If a class has fewer free seats than passengers, or n_draws < 1.
+    """
+    if n_draws < 1:
+        raise ValueError("The number of draws must be at least 1.")
+    free = ~occupied if occupied is not None else ~seat_index.empty_mask()
+
+    # Per class: the distinct arms of the free seats and the seats per arm
+    classes = []
+    for cabin_class, count in counts.items():
+        if cabin_class not in CLASS_CODES:
+            raise ValueError(f"Unknown cabin class '{cabin_class}'.")
+        arms, sizes = np.unique(seat_index.arms[free & seat_index.class_mask(cabin_class)], return_counts=True)
+        n_free = int(sizes.sum())
+        if not 0 <= count <= n_free:
+            raise ValueError(f"Class {cabin_class} has {n_free} free seats for {count} passengers.")
+        # Draw the smaller of the taken and the empty seats
+        complement = count > n_free / 2
+        classes.append((arms, sizes, n_free - count if complement else count,
+                        float(arms @ sizes) if complement else None))
+
+    rng = np.random.default_rng(seed)
+    pax_moment = np.zeros(n_draws)
+    for start in range(0, n_draws, batch_size):
+        size = min(batch_size, n_draws - start)
+        batch = pax_moment[start:start + size]
+        for arms, sizes, k, full_moment in classes:
+            moment = rng.multivariate_hypergeometric(sizes, k, size=size, method="count") @ arms if k else 0.0
+            batch += full_moment - moment if full_moment is not None else moment
+    pax_moment *= pax_weight
+
+    pax_total = pax_weight * sum(counts.values())
+    zfw_weight = zfw_weight + pax_total
+    zfw_moment = zfw_moment + pax_moment
+    tow_weight = zfw_weight + fuel_weight
+    zfw_mac = calc.calculate_mac_percent(zfw_moment / zfw_weight, le_mac, mac_length)
+    tow_mac = calc.calculate_mac_percent((zfw_moment + fuel_moment) / tow_weight, le_mac, mac_length)
+    return PaxDispersion(dict(counts), zfw_weight, tow_weight, zfw_mac, tow_mac, envelope)
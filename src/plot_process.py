@@ -0,0 +1,181 @@
+"""
+This file contains the out-of-process live CG plot.
+
+PlotProcessClient has the same interface as LiveCGPlot, but only puts
+compact messages on a multiprocessing queue. A renderer process owns the
+matplotlib window, drains the queue and draws only the latest trace, so
+a slow redraw never blocks the Tk main loop of the application.
+
+For the click-to-plot latency, a trace can carry an id: the renderer then
+sends back the id with the perf_counter() time at which it was drawn. The
+clock is system-wide (CLOCK_MONOTONIC, QueryPerformanceCounter), so the
+parent can subtract its own start time from it.
+"""
+import multiprocessing as mp
+import queue
+import time
+
+from src.instrumentation import PROFILER
+
+# Seconds the renderer waits for a message before servicing its own window events
+RENDERER_POLL_INTERVAL_S = 0.03
+
+
+def drain_latest(message_queue, timeout=RENDERER_POLL_INTERVAL_S):
+    """
+    Waits up to `timeout` for a message, then takes everything else that
+    is queued and keeps only the latest. A "close" message always wins.
+
+    Args:
+        message_queue: The queue to read from.
+        timeout (float, optional): Seconds to wait for the first message.
+
+    Returns:
+        tuple or None: The message to act on, None if nothing arrived.
+    """
+    try:
+        latest = message_queue.get(timeout=timeout)
+    except queue.Empty:
+        return None
+    while latest[0] != "close":
+        try:
+            latest = message_queue.get_nowait()
+        except queue.Empty:
+            break
+    return latest
+
+
+def _run_renderer(message_queue, blit, drawn_queue=None):
+    """Entry point of the renderer process."""
+    import matplotlib.pyplot as plt
+    from src.live_cg_plot import LiveCGPlot
+
+    plot = LiveCGPlot(blit=blit)
+    while plt.fignum_exists(plot.fig.number):
+        message = drain_latest(message_queue)
+        if message is None:
+            plot.fig.canvas.flush_events()  # Keep the window responsive
+        elif message[0] == "trace":
+            plot.update_full_trace(list(message[1]), list(message[2]))
+            if message[3] is not None and drawn_queue is not None:
+                drawn_queue.put_nowait((message[3], time.perf_counter()))
+        elif message[0] == "reset":
+            plot.reset_trace()
+        elif message[0] == "close":
+            break
+    plot.close()
+
+
+class PlotProcessClient:
+    """
+    Drop-in replacement for LiveCGPlot that renders in a separate process.
+
+    The renderer is started on the first update and restarted on the next
+    update if the operator closed its window. If it crashed instead, it is
+    not restarted and updates are dropped. No method ever waits for
+    rendering.
+
+    With a `span`, an open profiler span of that name is handed over to the
+    next trace and recorded by poll_drawn() once the renderer has drawn it.
+    """
+
+    def __init__(self, blit=True, span=None, profiler=PROFILER):
+        """
+        Args:
+            blit (bool, optional): Passed on to the LiveCGPlot of the renderer.
+            span (str, optional): The profiler span that ends when a trace is drawn.
+            profiler (Profiler, optional): The profiler of the span.
+        """
+        self.blit = blit
+        self.span = span
+        self.profiler = profiler
+        # Spawn instead of fork: the parent runs a Tk main loop
+        self._context = mp.get_context("spawn")
+        self._queue = None
+        self._drawn_queue = None
+        self._process = None
+        self._trace_id = 0
+        self._span_starts = {}  # {trace id: span start time} of the traces not drawn yet
+        self.failed = False  # Set when the renderer exited with an error
+
+    def _ensure_renderer(self):
+        """
+        Starts the renderer process if it is not running.
+
+        Returns:
+            bool: True if a renderer is available.
+        """
+        if self._process is not None:
+            if self._process.is_alive():
+                return True
+            self.failed = self._process.exitcode != 0
+        if self.failed:
+            return False
+        self._queue = self._context.Queue()
+        self._drawn_queue = self._context.Queue()
+        self._span_starts.clear()  # Traces queued to a previous renderer are never drawn
+        self._process = self._context.Process(target=_run_renderer,
+                                              args=(self._queue, self.blit, self._drawn_queue),
+                                              name="LiveCGPlotRenderer", daemon=True)
+        self._process.start()
+        return True
+
+    def update_full_trace(self, trace_points, burn_points=None):
+        """
+        Queues a new 4-point trace for the renderer.
+
+        Args:
+            trace_points: A list of 4 (mac, weight) tuples (DOW, DOW + Pax, ZFW, TOW).
+            burn_points (optional): The fuel burn curve as (mac, weight) tuples, TOW to LW.
+        """
+        if not trace_points or len(trace_points) != 4:
+            return  # Invalid data, do nothing
+        if self._ensure_renderer():
+            trace = tuple((float(mac), float(weight)) for mac, weight in trace_points)
+            burn = tuple((float(mac), float(weight)) for mac, weight in burn_points or ())
+            trace_id = None
+            start = self.profiler.take_span(self.span) if self.span else None
+            if start is not None:
+                self._trace_id += 1
+                trace_id = self._trace_id
+                self._span_starts[trace_id] = start
+            self._queue.put_nowait(("trace", trace, burn, trace_id))
+
+    @property
+    def pending(self):
+        """True while a trace with a span is queued or being drawn."""
+        return bool(self._span_starts)
+
+    def poll_drawn(self):
+        """
+        Records the span of every trace the renderer has drawn since the last
+        call. A drawn trace also ends the spans of the earlier traces it
+        replaced in the queue. Never waits.
+
+        Returns:
+            bool: True while traces with a span are still pending.
+        """
+        if not self._span_starts:
+            return False
+        while True:
+            try:
+                drawn_id, drawn_at = self._drawn_queue.get_nowait()
+            except queue.Empty:
+                break
+            for trace_id in [i for i in self._span_starts if i <= drawn_id]:
+                self.profiler.record(self.span, drawn_at - self._span_starts.pop(trace_id))
+        if self._span_starts and (self._process is None or not self._process.is_alive()):
+            self._span_starts.clear()  # The window was closed before the trace was drawn
+        return self.pending
+
+    def reset_trace(self):
+        """Queues a reset of the plotted trace. Nothing to do if no window is open."""
+        if self._process is not None and self._process.is_alive():
+            self._queue.put_nowait(("reset",))
+
+    def close(self):
+        """Asks the renderer process to close its window and exit."""
+        if self._process is not None and self._process.is_alive():
+            self._queue.put_nowait(("close",))
+        self._process = None
+        self._span_starts.clear()
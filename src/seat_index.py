@@ -0,0 +1,118 @@
+"""
+This file contains the SeatIndex, a compact array representation of the
+seat map built once at load time for fast passenger calculations.
+"""
+import numpy as np
+
+import src.config as config
+
+# Integer codes for the cabin classes in the seat map
+CLASS_CODES = {"F": 0, "Y": 1}
+
+
+def lateral_arms(letters, class_codes, arms_by_class=config.SEAT_LATERAL_ARMS_IN):
+    """
+    Looks up the lateral arm of each seat from its class and seat letter.
+
+    Args:
+        letters (numpy.ndarray): The seat letter of each position.
+        class_codes (numpy.ndarray): The CLASS_CODES value of each position.
+        arms_by_class (dict, optional): {class: {letter: lateral arm in inches}}
+
+    Returns:
+        numpy.ndarray: The lateral arm of each position (positive to the right).
+    """
+    classes = {code: cabin_class for cabin_class, code in CLASS_CODES.items()}
+    return np.array([arms_by_class[classes[code]][letter] for letter, code in zip(letters, class_codes)],
+                    dtype=float)
+
+
+class SeatIndex:
+    """
+    Flattens the seat map into contiguous arrays.
+
+    Every seat gets a fixed position i, so that a passenger selection can
+    be stored as a boolean mask and summed with a single dot product
+    against `arms` (and `lateral_arms` for the left/right balance).
+    """
+
+    def __init__(self, seat_map):
+        """
+        Builds the index from the seat map data.
+
+        Args:
+            seat_map (list): The list of row dictionaries from the seat map file.
+        """
+        self.keys = []  # (row, seat) tuple for each position
+        arms, rows, letters, classes = [], [], [], []
+        self.row_class = {}  # {row: "F" or "Y"}
+
+        for row_data in seat_map:
+            self.row_class[row_data["row"]] = row_data["class"]
+            for seat in row_data["seats"]:
+                self.keys.append((row_data["row"], seat["seat"]))
+                arms.append(seat["arm_in"])
+                rows.append(row_data["row"])
+                letters.append(seat["seat"])
+                classes.append(CLASS_CODES[row_data["class"]])
+
+        self.position = {key: i for i, key in enumerate(self.keys)}  # {(row, seat): i}
+        self.arms = np.asarray(arms, dtype=float)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.letters = np.asarray(letters)
+        self.class_codes = np.asarray(classes, dtype=np.int8)
+        self.lateral_arms = lateral_arms(self.letters, self.class_codes)
+
+    @classmethod
+    def from_arrays(cls, keys, row_class, arms, rows, letters, class_codes):
+        """
+        Creates an index from prebuilt arrays (e.g. memory-mapped from the
+        compiled data cache) without walking the seat map.
+
+        Args:
+            keys (list[tuple]): The (row, seat) key of each position.
+            row_class (dict): {row: "F" or "Y"}
+            arms, rows, letters, class_codes (numpy.ndarray): The per-seat arrays.
+        """
+        index = cls.__new__(cls)
+        index.keys = keys
+        index.row_class = row_class
+        index.position = {key: i for i, key in enumerate(keys)}
+        index.arms = arms
+        index.rows = rows
+        index.letters = letters
+        index.class_codes = class_codes
+        # Derived from config, so not part of the cached arrays
+        index.lateral_arms = lateral_arms(letters, class_codes)
+        return index
+
+    def __len__(self):
+        return len(self.keys)
+
+    def empty_mask(self):
+        """Returns an all-False selection mask."""
+        return np.zeros(len(self.keys), dtype=bool)
+
+    def row_mask(self, row):
+        """Returns a mask of all seats in the given row."""
+        return self.rows == row
+
+    def letter_mask(self, letter):
+        """Returns a mask of all seats with the given seat letter."""
+        return self.letters == letter
+
+    def class_mask(self, cabin_class):
+        """Returns a mask of all seats in the given class ("F" or "Y")."""
+        return self.class_codes == CLASS_CODES[cabin_class]
+
+    def keys_for(self, mask):
+        """
+        Converts a mask back to seat keys.
+
+        Args:
+            mask (numpy.ndarray): A boolean seat mask.
+
+        Returns:
+            list[tuple]: The (row, seat) keys of the masked seats.
+        """
+        return [self.keys[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,137 @@
+"""
+This file contains the SeatMapLayout, the geometry of the canvas seat map:
+where every row, seat cell and "Select Row" button is drawn, which rows
+intersect a vertical range and which item lies under a point.
+
+It has no tkinter dependency, so the seat map view only has to draw the
+rectangles it is given and can hit-test clicks with arithmetic instead of
+one widget per seat.
+"""
+from bisect import bisect_right
+
+import src.config as config
+
+# Geometry in canvas pixels
+ROW_HEIGHT = 52
+SEPARATOR_HEIGHT = 24  # Extra space above the first row of a new class
+ROW_LABEL_WIDTH = 80
+SEAT_WIDTH = 56
+AISLE_WIDTH = 30
+CELL_GAP = 8
+ROW_BUTTON_WIDTH = 96
+PADDING = 10
+
+
+class RowLayout:
+    """The geometry of one seat row."""
+
+    __slots__ = ("row", "cabin_class", "top", "bottom", "separator_y", "cells", "cell_x0", "row_button")
+
+    def __init__(self, row, cabin_class, top, separator_y):
+        self.row = row
+        self.cabin_class = cabin_class
+        self.top = top
+        self.bottom = top + ROW_HEIGHT
+        self.separator_y = separator_y  # y of the class divider above this row, or None
+        self.cells = []  # (kind, x0, x1, letter, seat position) with kind "seat", "empty" or "aisle"
+        self.cell_x0 = []  # x0 of each cell, for bisection
+        self.row_button = None  # (x0, x1)
+
+
+class SeatMapLayout:
+    """
+    Lays out the seat map rows top to bottom, with the seat columns of the
+    business or economy seat plan from config.py.
+    """
+
+    def __init__(self, seat_map, seat_index):
+        """
+        Args:
+            seat_map (list): The list of row dictionaries from the seat map file.
+            seat_index (SeatIndex): The index that numbers the seats.
+        """
+        self.rows = []
+        self.row_number_index = {}  # {row number: index into self.rows}
+        y = PADDING
+        current_class = None
+
+        for row_data in seat_map:
+            separator_y = None
+            if current_class is not None and current_class != row_data["class"]:
+                separator_y = y + SEPARATOR_HEIGHT // 2
+                y += SEPARATOR_HEIGHT
+            current_class = row_data["class"]
+
+            row = RowLayout(row_data["row"], row_data["class"], y, separator_y)
+            seat_plan = config.BUSINESS_SEATPLAN if row_data["class"] == "F" else config.ECONOMY_SEATPLAN
+            present = {seat["seat"] for seat in row_data["seats"]}
+            x = PADDING + ROW_LABEL_WIDTH
+            for letter in seat_plan:
+                if letter is None:
+                    row.cells.append(("aisle", x, x + AISLE_WIDTH, None, None))
+                    x += AISLE_WIDTH
+                elif letter in present:
+                    position = seat_index.position[(row_data["row"], letter)]
+                    row.cells.append(("seat", x, x + SEAT_WIDTH, letter, position))
+                    x += SEAT_WIDTH
+                else:
+                    row.cells.append(("empty", x, x + SEAT_WIDTH, letter, None))
+                    x += SEAT_WIDTH
+                row.cell_x0.append(row.cells[-1][1])
+                x += CELL_GAP
+            row.row_button = (x, x + ROW_BUTTON_WIDTH)
+
+            self.row_number_index[row.row] = len(self.rows)
+            self.rows.append(row)
+            y = row.bottom
+
+        self._tops = [row.top for row in self.rows]
+        self.height = y + PADDING
+        self.width = max(row.row_button[1] for row in self.rows) + PADDING if self.rows else 0
+
+        # Seat position -> (row index, cell) for restyling single seats
+        self.seat_cells = {}
+        for r, row in enumerate(self.rows):
+            for cell in row.cells:
+                if cell[0] == "seat":
+                    self.seat_cells[cell[4]] = (r, cell)
+
+    def rows_between(self, y0, y1):
+        """
+        Returns the indices of the rows that intersect the range [y0, y1].
+
+        Args:
+            y0, y1 (float): The vertical range in canvas coordinates.
+
+        Returns:
+            range: Indices into self.rows.
+        """
+        first = max(bisect_right(self._tops, y0) - 1, 0)
+        if first < len(self.rows) and self.rows[first].bottom < y0:
+            first += 1
+        return range(first, bisect_right(self._tops, y1))
+
+    def hit(self, x, y):
+        """
+        Finds the item under a canvas point.
+
+        Args:
+            x, y (float): The point in canvas coordinates.
+
+        Returns:
+            tuple or None: ("seat", seat position), ("row", row number) or None.
+        """
+        r = bisect_right(self._tops, y) - 1
+        if r < 0 or y > self.rows[r].bottom:
+            return None
+        row = self.rows[r]
+
+        if row.row_button[0] <= x <= row.row_button[1]:
+            return ("row", row.row)
+        c = bisect_right(row.cell_x0, x) - 1
+        if c < 0:
+            return None
+        kind, _, x1, _, position = row.cells[c]
+        if kind == "seat" and x <= x1:
+            return ("seat", position)
+        return None
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from src import calculations as calc
+from src import config
+from src.app_utils import load_json_data
+
+
+class TestCompiledArmTable(unittest.TestCase):
+
+    def test_matches_interpolate_arm(self):
+        """Compiled lookups equal interpolate_arm for every fuel tank."""
+        tanks = load_json_data(config.FUEL_TANKS_FILEPATH)
+        rng = np.random.default_rng(7)
+        for tank in tanks:
+            table = tank["arm_table"]
+            compiled = calc.CompiledArmTable(table)
+            # Breakpoints, off-grid values and both out-of-range ends
+            liters = [l for l, _ in table] + list(rng.uniform(-500, tank["max_l"] + 500, 500))
+            liters += [-100, 0, table[0][0], table[-1][0], table[-1][0] + 1]
+
+            expected = [calc.interpolate_arm(table, l) for l in liters]
+            self.assertEqual([compiled(l) for l in liters], expected)
+            np.testing.assert_array_equal(compiled.evaluate_many(liters), expected)
+
+    def test_clamping(self):
+        """Values outside the table return the boundary arms."""
+        compiled = calc.CompiledArmTable([[0, 1200], [10000, 1250], [20000, 1300]])
+        self.assertEqual(compiled(-100), 1200)
+        self.assertEqual(compiled(30000), 1300)
+        np.testing.assert_array_equal(compiled.evaluate_many([-100, 5000, 30000]), [1200, 1225, 1300])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from src import calculations as calc
+from src import batch_calculations as batch
+
+
+def scalar_summary(dow_weight, doi, pax_w, pax_m, cargo_w, cargo_m, fuel_w, fuel_m):
+    """Same chain as AircraftSummaryApp.calculate_aircraft_summary."""
+    dow_arm = calc.calculate_arm_from_doi(doi, dow_weight)
+    dow_moment = dow_weight * dow_arm
+    pax_cg = pax_m / pax_w if pax_w > 0 else 0
+    cargo_cg = cargo_m / cargo_w if cargo_w > 0 else 0
+    fuel_cg = fuel_m / fuel_w if fuel_w > 0 else 0
+
+    dp_w = dow_weight + pax_w
+    dp_m = dow_moment + pax_m
+    dp_cg = dp_m / dp_w if dp_w > 0 else dow_arm
+    zfw_w = dp_w + cargo_w
+    zfw_m = dp_m + cargo_m
+    zfw_cg = zfw_m / zfw_w if zfw_w > 0 else dp_cg
+    tow_w = zfw_w + fuel_w
+    tow_m = zfw_m + fuel_m
+    tow_cg = tow_m / tow_w if tow_w > 0 else zfw_cg
+
+    klm_zfw = (calc.klm_index_base(dow_weight, dow_arm)
+               + calc.klm_index_component(pax_w, pax_cg)
+               + calc.klm_index_component(cargo_w, cargo_cg))
+    klm_tow = klm_zfw + calc.klm_index_component(fuel_w, fuel_cg)
+    return {
+        "dow_mac": calc.calculate_mac_percent(dow_arm),
+        "dow_pax_mac": calc.calculate_mac_percent(dp_cg),
+        "zfw_weight": zfw_w,
+        "zfw_mac": calc.calculate_mac_percent(zfw_cg),
+        "tow_weight": tow_w,
+        "tow_mac": calc.calculate_mac_percent(tow_cg),
+        "klm_zfw": klm_zfw,
+        "klm_tow": klm_tow,
+    }
+
+
+class TestBatchCalculations(unittest.TestCase):
+
+    def test_matches_scalar_path(self):
+        """Every scenario must equal the GUI (scalar) chain exactly."""
+        rng = np.random.default_rng(42)
+        n = 200
+        pax_w = rng.integers(0, 400, n) * 88.5
+        pax_m = pax_w * rng.uniform(800, 1500, n)
+        cargo_w = np.where(rng.random(n) < 0.2, 0.0, rng.uniform(0, 40000, n))
+        cargo_m = cargo_w * rng.uniform(900, 1600, n)
+        fuel_w = np.where(rng.random(n) < 0.2, 0.0, rng.uniform(0, 140000, n))
+        fuel_m = fuel_w * rng.uniform(1150, 1300, n)
+
+        result = batch.calculate_batch_summary(170200, 45.3, pax_w, pax_m, cargo_w, cargo_m, fuel_w, fuel_m)
+
+        for i in range(n):
+            expected = scalar_summary(170200, 45.3, pax_w[i], pax_m[i], cargo_w[i], cargo_m[i],
+                                      fuel_w[i], fuel_m[i])
+            for key, value in expected.items():
+                self.assertEqual(result[key][i], value, msg=f"{key} differs for scenario {i}")
+
+    def test_empty_aircraft(self):
+        """An unloaded aircraft stays at DOW for every trace point."""
+        result = batch.calculate_batch_summary([170200, 170359], [45.3, 45.6], 0, 0, 0, 0, 0, 0)
+        np.testing.assert_array_equal(result["tow_mac"], result["dow_mac"])
+        np.testing.assert_allclose(result["klm_tow"], [45.3, 45.6])
+
+
+if __name__ == '__main__':
+    unittest.main()
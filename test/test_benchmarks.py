@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from benchmarks import run
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_measure(self):
+        """measure() reports consistent time, rate and memory figures."""
+        result = run.measure(lambda: [0] * 1000, repeat=1, min_time=0.01)
+        self.assertGreater(result["per_op_s"], 0)
+        self.assertAlmostEqual(result["ops_per_s"] * result["per_op_s"], 1)
+        self.assertGreaterEqual(result["peak_bytes"], 8000)
+
+    def test_compare(self):
+        """Only slowdowns above the threshold are flagged."""
+        baseline = {"a": {"per_op_s": 1.0}, "b": {"per_op_s": 1.0}, "c": {"per_op_s": 1.0}}
+        results = {"a": {"per_op_s": 1.2}, "b": {"per_op_s": 1.5}, "c": {"per_op_s": 0.5}, "new": {"per_op_s": 9}}
+        regressions = run.compare(results, baseline, threshold=0.25)
+        self.assertEqual(list(regressions), ["b"])
+        self.assertAlmostEqual(regressions["b"], 0.5)
+
+    def test_filter_before_fixtures(self):
+        """A suite's fixtures are only built when the filter selects one of its benchmarks."""
+        with mock.patch.object(run, "gui_fixture") as gui_fixture:
+            benchmarks = run.select_benchmarks("compiledarmtable")
+            gui_fixture.assert_not_called()
+        self.assertEqual([name for name, _ in benchmarks], ["calc.CompiledArmTable"])
+        self.assertIsInstance(benchmarks[0][1](), float)
+
+        with mock.patch.object(run, "headless_fixture") as headless_fixture, \
+                mock.patch.object(run, "gui_fixture", return_value=None) as gui_fixture:
+            self.assertEqual(run.select_benchmarks("SeatSelector"), [])
+        headless_fixture.assert_not_called()
+        gui_fixture.assert_called_once()
+
+    def test_unique_names(self):
+        names = [name for name, _ in run.HEADLESS_BENCHMARKS + run.GUI_BENCHMARKS]
+        self.assertEqual(len(names), len(set(names)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from src import config
+from src.app_utils import load_json_data
+from src.cargo_index import CargoIndex
+
+
+class TestCargoIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.cargo_data = load_json_data(config.CARGO_POSITIONS_FILEPATH)
+        self.index = CargoIndex(self.cargo_data)
+
+    def test_blocking_graph(self):
+        """Pallets cover the containers listed in their "blocks" entry."""
+        self.assertEqual(len(self.index.slots), len(self.cargo_data))
+        self.assertEqual(self.index.covers[("FWD", "24P")], [("FWD", "25"), ("FWD", "26"), ("FWD", "27")])
+        self.assertEqual(self.index.covered_by[("FWD", "12")], [("FWD", "11P"), ("FWD", "12P")])
+        self.assertEqual(self.index.neighbours(("BULK", "1")), [])
+
+    def test_blocking_rules(self):
+        """Loaded pallets block containers and loaded containers block empty pallets."""
+        load = {"weight": 1000, "ULD_type": "LD-3"}
+        state = {("FWD", "11P"): load}
+        self.assertEqual(self.index.blocked_keys(state), {("FWD", "11"), ("FWD", "12")})
+
+        state = {("AFT", "32"): load}
+        self.assertEqual(self.index.blocked_keys(state), {("AFT", "31P"), ("AFT", "32P")})
+
+    def test_incremental_matches_full(self):
+        """Re-evaluating only neighbours keeps the same blocked set."""
+        rnd = random.Random(5)
+        keys = list(self.index.slots)
+        state, blocked = {}, set()
+        for _ in range(500):
+            key = rnd.choice(keys)
+            state[key] = None if state.get(key) else {"weight": 1000, "ULD_type": "LD-3"}
+            for k in (key, *self.index.neighbours(key)):
+                if self.index.is_blocked(k, state):
+                    blocked.add(k)
+                else:
+                    blocked.discard(k)
+            self.assertEqual(blocked, self.index.blocked_keys(state))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import itertools
+import unittest
+
+import src.calculations as calc
+import src.config as config
+from src.cargo_index import CargoIndex
+from src.cargo_planner import parse_manifest, plan_cargo
+from src.load_state import LoadState
+
+BASE_WEIGHT = 200000.0
+BASE_MOMENT = BASE_WEIGHT * 1250.0
+
+# A small hold: four containers, two pallets covering two containers each
+SMALL_HOLD = [
+    {"compartment": "FWD", "position": "1", "arm_in": 300.0, "allowed_ULDs": [{"type": "LD-3", "max_kg": 1500}]},
+    {"compartment": "FWD", "position": "2", "arm_in": 500.0, "allowed_ULDs": [{"type": "LD-3", "max_kg": 1500}]},
+    {"compartment": "FWD", "position": "3", "arm_in": 1500.0, "allowed_ULDs": [{"type": "LD-3", "max_kg": 1000}]},
+    {"compartment": "FWD", "position": "4", "arm_in": 1700.0, "allowed_ULDs": [{"type": "LD-3", "max_kg": 1500}]},
+    {"compartment": "FWD", "position": "1P", "arm_in": 420.0, "blocks": ["1", "2"],
+     "allowed_ULDs": [{"type": "P1", "max_kg": 4500}, {"type": "LD-3", "max_kg": 1500}]},
+    {"compartment": "FWD", "position": "3P", "arm_in": 1600.0, "blocks": ["3", "4"],
+     "allowed_ULDs": [{"type": "P1", "max_kg": 4500}]},
+]
+
+
+def brute_force(manifest, index, target_mac):
+    """The smallest |ZFW %MAC - target| over every valid assignment."""
+    best = None
+    for positions in itertools.permutations(index.slots, len(manifest)):
+        if any(k in positions for key in positions for k in index.neighbours(key)):
+            continue
+        if not all(any(u["type"] == uld["ULD_type"] and uld["weight"] <= u["max_kg"]
+                       for u in index.slots[key]["allowed_ULDs"]) for uld, key in zip(manifest, positions)):
+            continue
+        moment = BASE_MOMENT + sum(uld["weight"] * index.arms[key] for uld, key in zip(manifest, positions))
+        weight = BASE_WEIGHT + sum(uld["weight"] for uld in manifest)
+        deviation = abs(calc.calculate_mac_percent(moment / weight, config.LE_MAC_IN, config.MAC_LENGTH_IN)
+                        - target_mac)
+        best = deviation if best is None else min(best, deviation)
+    return best
+
+
+class TestCargoPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.index = LoadState.from_files().cargo.index
+
+    def assert_valid(self, plan, manifest, index):
+        self.assertEqual(sorted((l["ULD_type"], l["weight"]) for l in plan.assignment.values()),
+                         sorted((u["ULD_type"], u["weight"]) for u in manifest))
+        for key, load in plan.assignment.items():
+            self.assertTrue(any(u["type"] == load["ULD_type"] and load["weight"] <= u["max_kg"]
+                                for u in index.slots[key]["allowed_ULDs"]))
+            for neighbour in index.neighbours(key):
+                self.assertNotIn(neighbour, plan.assignment)
+
+    def test_parse_manifest(self):
+        manifest = parse_manifest("P1 4200, LD-3: 1100\nHalf Pallet 2000;")
+        self.assertEqual(manifest, [{"ULD_type": "P1", "weight": 4200}, {"ULD_type": "LD-3", "weight": 1100},
+                                    {"ULD_type": "Half Pallet", "weight": 2000}])
+        with self.assertRaises(ValueError):
+            parse_manifest("P1")
+        with self.assertRaises(ValueError):
+            parse_manifest("4200")
+
+    def test_hits_target(self):
+        manifest = parse_manifest("P1 4200, P1 3900, LD-7 3100, Half Pallet 2300, Half Pallet 1800, "
+                                  + ", ".join(f"LD-3 {kg}" for kg in range(600, 1600, 100)))
+        for target in (22.0, 28.0, 33.0):
+            plan = plan_cargo(manifest, self.index, BASE_WEIGHT, BASE_MOMENT, target)
+            self.assert_valid(plan, manifest, self.index)
+            self.assertLessEqual(plan.deviation, config.CARGO_PLANNER_TOLERANCE_MAC)
+            self.assertTrue(plan.complete)
+
+    def test_optimal_on_small_hold(self):
+        """With no tolerance the plan is as good as the best of all assignments."""
+        index = CargoIndex(SMALL_HOLD)
+        manifests = [parse_manifest("P1 4000, LD-3 1200, LD-3 900"),
+                     parse_manifest("LD-3 1400, LD-3 1300, LD-3 700"),
+                     parse_manifest("P1 3000, LD-3 1400, LD-3 600")]
+        for manifest in manifests:
+            for target in (10.0, 26.8, 27.2, 45.0):
+                plan = plan_cargo(manifest, index, BASE_WEIGHT, BASE_MOMENT, target, tolerance=0)
+                self.assert_valid(plan, manifest, index)
+                self.assertAlmostEqual(plan.deviation, brute_force(manifest, index, target), places=9)
+
+    def test_cannot_load(self):
+        with self.assertRaises(ValueError):
+            plan_cargo(parse_manifest("P1 5000"), self.index, BASE_WEIGHT, BASE_MOMENT, 28)
+        with self.assertRaises(ValueError):
+            plan_cargo(parse_manifest("LD-3 100, LD-3 200"), CargoIndex(SMALL_HOLD[:1]), BASE_WEIGHT, BASE_MOMENT, 28)
+        # Both pallets in use leave no container free
+        with self.assertRaises(ValueError):
+            plan_cargo(parse_manifest("P1 3000, P1 2500, LD-3 800, LD-3 700"), CargoIndex(SMALL_HOLD),
+                       BASE_WEIGHT, BASE_MOMENT, 28)
+
+    def test_assign_to_cargo_load(self):
+        """The plan goes straight into the CargoLoad, with its blocks."""
+        cargo = LoadState.from_files().cargo
+        manifest = parse_manifest("P1 4000, LD-3 1000, LD-3 1200")
+        plan = plan_cargo(manifest, cargo.index, BASE_WEIGHT, BASE_MOMENT, 28)
+        cargo.assign(plan.assignment)
+        weight, moment, _ = cargo.get_cg()
+        self.assertEqual(weight, 6200)
+        self.assertAlmostEqual(moment, plan.cargo_moment)
+        pallet = next(key for key in plan.assignment if cargo.index.is_pallet(key))
+        self.assertTrue(set(cargo.index.neighbours(pallet)) <= cargo.blocked)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+
+from modules.cargo_module import CargoLoadSystem
+from src.change_batch import ChangeNotifier
+from src.load_state import LoadState
+
+
+class TestChangeNotifier(unittest.TestCase):
+
+    def test_notify_outside_batch(self):
+        callback = mock.Mock()
+        notifier = ChangeNotifier(callback)
+        notifier.notify()
+        notifier.notify()
+        self.assertEqual(callback.call_count, 2)
+
+    def test_batch_coalesces(self):
+        """Nested batches call the flush callback once, at the end of the outermost."""
+        callback, flush = mock.Mock(), mock.Mock()
+        notifier = ChangeNotifier(callback, flush=flush)
+        with notifier.batch():
+            notifier.notify()
+            with notifier.batch():
+                notifier.notify()
+                self.assertTrue(notifier.batching)
+            flush.assert_not_called()
+        callback.assert_not_called()
+        flush.assert_called_once_with()
+        self.assertFalse(notifier.batching)
+
+    def test_batch_without_change(self):
+        callback = mock.Mock()
+        with ChangeNotifier(callback).batch():
+            pass
+        callback.assert_not_called()
+
+    def test_batch_flushes_on_error(self):
+        callback = mock.Mock()
+        notifier = ChangeNotifier(callback)
+        with self.assertRaises(RuntimeError):
+            with notifier.batch():
+                notifier.notify()
+                raise RuntimeError
+        callback.assert_called_once_with()
+        notifier.notify()
+        self.assertEqual(callback.call_count, 2)
+
+
+class TestCargoNotifications(unittest.TestCase):
+    """The cargo view without a display: widgets are mocks."""
+
+    def setUp(self):
+        state = LoadState.from_files()
+        self.callback = mock.Mock()
+
+        def create_widgets(view):
+            view.summary_label = mock.Mock()
+            view.buttons = {key: (mock.Mock(), mock.Mock(), mock.Mock()) for key in view.index.slots}
+
+        with mock.patch.object(CargoLoadSystem, "create_widgets", create_widgets):
+            self.cargo = CargoLoadSystem(None, state.cargo.cargo_data, self.callback, load=state.cargo)
+        self.key = next(key for key in self.cargo.index.slots if self.cargo.load.default_uld(key))
+
+    def test_toggle_notifies_once(self):
+        self.cargo.toggle_load(self.key)
+        self.assertTrue(self.cargo.state.get(self.key))
+        self.callback.assert_called_once_with()
+
+        self.cargo.toggle_load(self.key)
+        self.assertFalse(self.cargo.state.get(self.key))
+        self.assertEqual(self.callback.call_count, 2)
+
+    def test_batch_notifies_once(self):
+        with self.cargo.batch():
+            self.cargo.load_max_all()
+            self.cargo.deselect_all()
+            self.cargo.toggle_load(self.key)
+        self.callback.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
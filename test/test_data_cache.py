@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src import data_cache
+from src.load_state import LoadState
+
+
+class TestDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        # Private copies of the data files, so their mtimes can be changed
+        self.sources = {}
+        for name, path in data_cache.SOURCE_FILES.items():
+            self.sources[name] = shutil.copy(path, self.tmpdir)
+        self.cache_path = os.path.join(self.tmpdir, "cache.bin")
+
+    def load(self, **kwargs):
+        return data_cache.load_compiled_data(self.cache_path, self.sources, **kwargs)
+
+    def test_round_trip(self):
+        """The cached data equals the data compiled from the JSON files."""
+        compiled = self.load()
+        self.assertFalse(compiled.from_cache)
+        cached = self.load()
+        self.assertTrue(cached.from_cache)
+
+        for name in data_cache.SOURCE_FILES:
+            self.assertEqual(getattr(cached, name), getattr(compiled, name))
+        for attr in ("arms", "rows", "letters", "class_codes"):
+            np.testing.assert_array_equal(getattr(cached.seat_index, attr), getattr(compiled.seat_index, attr))
+        self.assertEqual(cached.seat_index.keys, compiled.seat_index.keys)
+        self.assertEqual(cached.seat_index.position, compiled.seat_index.position)
+        self.assertEqual(cached.cargo_index.covers, compiled.cargo_index.covers)
+        self.assertEqual(cached.cargo_index.covered_by, compiled.cargo_index.covered_by)
+        for tname, table in compiled.arm_tables.items():
+            cached_table = cached.arm_tables[tname]
+            fills = np.linspace(-100, table.liters[-1] + 100, 97)
+            np.testing.assert_array_equal(cached_table.evaluate_many(fills), table.evaluate_many(fills))
+            self.assertEqual([cached_table(f) for f in fills], [table(f) for f in fills])
+
+    def test_arrays_are_memory_mapped(self):
+        """Cached arrays are read-only views of the cache file."""
+        self.load()
+        arms = self.load().seat_index.arms
+        self.assertIsInstance(arms.base, np.memmap)
+        self.assertFalse(arms.flags.writeable)
+
+    def test_invalidated_by_mtime(self):
+        """Touching a source file rebuilds the cache with the new content."""
+        self.load()
+        limits_path = self.sources["limits"]
+        with open(limits_path, "w", encoding="utf-8") as f:
+            f.write('{"changed": 1}')
+        st = os.stat(limits_path)
+        os.utime(limits_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        rebuilt = self.load()
+        self.assertFalse(rebuilt.from_cache)
+        self.assertEqual(rebuilt.limits, {"changed": 1})
+        self.assertTrue(self.load().from_cache)
+
+    def test_invalidated_by_hash(self):
+        """With verify_hash, a changed file with the same mtime and size is detected."""
+        self.load()
+        limits_path = self.sources["limits"]
+        st = os.stat(limits_path)
+        with open(limits_path, "rb") as f:
+            content = f.read()
+        with open(limits_path, "wb") as f:
+            f.write(content.replace(b"0", b"1", 1))
+        os.utime(limits_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        self.assertTrue(self.load().from_cache)
+        self.assertFalse(self.load(verify_hash=True).from_cache)
+
+    def test_corrupt_cache_is_rebuilt(self):
+        with open(self.cache_path, "wb") as f:
+            f.write(b"not a cache")
+        self.assertFalse(self.load().from_cache)
+        self.assertTrue(self.load().from_cache)
+
+        # Truncated inside the header and inside the data blobs
+        with open(self.cache_path, "rb") as f:
+            content = f.read()
+        for size in (12, len(content) // 2):
+            with open(self.cache_path, "wb") as f:
+                f.write(content[:size])
+            self.assertFalse(self.load().from_cache)
+
+    def test_unexpected_errors_are_raised(self):
+        """Only read failures of the cache file fall back to a rebuild."""
+        self.load()
+        with mock.patch.object(data_cache.SeatIndex, "from_arrays", side_effect=TypeError("bug")):
+            with self.assertRaises(TypeError):
+                self.load()
+
+    def test_load_state_from_compiled(self):
+        """A LoadState on cached data computes the same loads as one built from JSON."""
+        self.load()
+        cached = LoadState.from_compiled(self.load())
+        fresh = LoadState(*(data_cache.load_json_data(self.sources[n]) for n in ("seat_map", "cargo_data", "tank_data")))
+        for state in (cached, fresh):
+            state.pax.select_row(10)
+            state.fuel.set_liters("Center Tank", 12345.6)
+        self.assertEqual(cached.component_loads(), fresh.component_loads())
+
+
+if __name__ == "__main__":
+    unittest.main()
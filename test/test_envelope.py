@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from src import calculations as calc
+from src.envelope import CGEnvelope
+
+
+def formula_limits(w):
+    """Forward and aft limits as spelled out in data/formule_neo.txt."""
+    def seg(w, w1, m1, w2, m2):
+        return (m2 - m1) / (w2 - w1) * w - ((m2 - m1) / (w2 - w1) * w1 - m1)
+
+    if w <= 204116:
+        fwd = 7.5
+    elif w <= 237682:
+        fwd = seg(w, 204116, 7.5, 237682, 10.5)
+    elif w <= 251290:
+        fwd = seg(w, 237682, 10.5, 251290, 11.5)
+    elif w <= 325996:
+        fwd = seg(w, 251290, 11.5, 325996, 15.4)
+    elif w <= 345455:
+        fwd = seg(w, 325996, 15.4, 345455, 17.8)
+    else:
+        fwd = seg(w, 345455, 17.8, 352441, 22)
+
+    if w <= 158031:
+        aft = seg(w, 138573, 26.9, 158031, 34.1)
+    elif w <= 224029:
+        aft = seg(w, 158031, 34.1, 224029, 44)
+    elif w <= 304814:
+        aft = 44
+    elif w <= 343414:
+        aft = seg(w, 304814, 44, 343414, 38.1)
+    else:
+        aft = seg(w, 343414, 38.1, 352441, 27.4)
+    return fwd, aft
+
+
+class TestCGEnvelope(unittest.TestCase):
+
+    def setUp(self):
+        self.envelope = CGEnvelope()
+
+    def test_limits_match_spreadsheet(self):
+        """Compiled limits agree with the spreadsheet formulas."""
+        weights = np.linspace(138573, 352441, 500)
+        fwd = self.envelope.forward_limit(weights)
+        aft = self.envelope.aft_limit(weights)
+        for i, w in enumerate(weights):
+            expected_fwd, expected_aft = formula_limits(w)
+            self.assertAlmostEqual(fwd[i], expected_fwd, places=9)
+            self.assertAlmostEqual(aft[i], expected_aft, places=9)
+
+    def test_scalar_and_array_agree(self):
+        """Scalar queries return the same values as array queries."""
+        weights = np.array([150000, 230000, 300000, 351000])
+        macs = np.array([30.0, 8.0, 43.0, 25.0])
+        batch = self.envelope.check(weights, macs)
+        for i in range(len(weights)):
+            single = self.envelope.check(weights[i], macs[i])
+            for key in batch:
+                self.assertEqual(single[key], batch[key][i])
+
+    def test_containment(self):
+        """Points inside, forward, aft, restricted and out of range."""
+        status = self.envelope.check([200000, 200000, 200000, 250000, 100000],
+                                     [25.0, 5.0, 45.0, 43.0, 25.0])
+        np.testing.assert_array_equal(status["in_envelope"], [True, False, False, True, False])
+        np.testing.assert_array_equal(status["in_restricted"], [False, False, False, True, False])
+        self.assertTrue(np.isnan(status["forward_margin"][4]))
+
+    def test_check_limits_reports_cg(self):
+        """check_limits reports CG violations when %MAC is supplied."""
+        limits = {"MZFW_kg": 237682, "MTOW_kg": 351534, "MTW_kg": 352441, "MFW_kg": 138573}
+        self.assertEqual(calc.check_limits(230000, 340000, limits, zfw_mac=25.0, tow_mac=25.0), [])
+        messages = calc.check_limits(230000, 340000, limits, zfw_mac=5.0, tow_mac=25.0)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("forward limit", messages[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import src.calculations as calc
+import src.config as config
+from src.app_utils import load_json_data
+from src.fleet import compare_fleet
+
+DOW_OPTIONS = load_json_data(config.AIRCRAFT_REFERENCE_FILEPATH)["dow_options"]
+LIMITS = load_json_data(config.LIMITS_FILEPATH)
+PAX = (25000.0, 25000.0 * 1200.0)
+CARGO = (10000.0, 10000.0 * 1300.0)
+FUEL = (60000.0, 60000.0 * 1280.0)
+
+
+class TestFleet(unittest.TestCase):
+
+    def test_matches_single_aircraft(self):
+        """Each record equals the summary of that registration on its own."""
+        records = {r["reg"]: r for r in compare_fleet(DOW_OPTIONS, PAX, CARGO, FUEL, LIMITS)}
+        self.assertEqual(set(records), {d["reg"] for d in DOW_OPTIONS})
+        for d in DOW_OPTIONS:
+            record = records[d["reg"]]
+            dow_arm = calc.calculate_arm_from_doi(d["doi"], d["dow_weight_kg"], config.KLM_REFERENCE_ARM_IN)
+            tow_weight = d["dow_weight_kg"] + PAX[0] + CARGO[0] + FUEL[0]
+            tow_moment = d["dow_weight_kg"] * dow_arm + PAX[1] + CARGO[1] + FUEL[1]
+            tow_mac = calc.calculate_mac_percent(tow_moment / tow_weight, config.LE_MAC_IN, config.MAC_LENGTH_IN)
+            self.assertAlmostEqual(record["weight"]["tow"], tow_weight)
+            self.assertAlmostEqual(record["mac"]["tow"], tow_mac, places=9)
+            self.assertEqual(record["trace"][-1], (record["mac"]["tow"], record["weight"]["tow"]))
+            self.assertEqual(len(record["trace"]), 4)
+
+    def test_ranked_by_margin(self):
+        records = compare_fleet(DOW_OPTIONS, PAX, CARGO, FUEL, LIMITS)
+        margins = [r["margin"] for r in records]
+        self.assertEqual(margins, sorted(margins, reverse=True))
+        for record in records:
+            self.assertRegex(record["limiting"], r"^(ZFW|TOW) (fwd|aft)$")
+
+    def test_breaches(self):
+        records = compare_fleet(DOW_OPTIONS, PAX, (60000.0, 60000.0 * 1300.0), FUEL, LIMITS)
+        for record in records:
+            self.assertFalse(record["within_limits"])
+            self.assertTrue(any("ZFW" in message for message in record["breaches"]))
+        for record in compare_fleet(DOW_OPTIONS, PAX, CARGO, FUEL, LIMITS):
+            self.assertEqual(record["within_limits"], not record["breaches"])
+
+    def test_landing_weight(self):
+        landing_fuel = (15000.0, 15000.0 * 1270.0)
+        records = compare_fleet(DOW_OPTIONS, PAX, CARGO, FUEL, LIMITS, landing_fuel=landing_fuel)
+        for record in records:
+            zfw_weight = record["weight"]["zfw"]
+            self.assertAlmostEqual(record["weight"]["lw"], zfw_weight + landing_fuel[0])
+            self.assertIn("lw", record["mac"])
+        self.assertNotIn("lw", compare_fleet(DOW_OPTIONS, PAX, CARGO, FUEL, LIMITS)[0]["weight"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+import src.calculations as calc
+from src.fuel_burn import simulate_fuel_burn
+from src.load_state import LoadState
+
+ZFW_WEIGHT = 180000.0
+ZFW_ARM = 1250.0
+
+
+class TestFuelBurn(unittest.TestCase):
+
+    def setUp(self):
+        self.fuel = LoadState.from_files().fuel
+        self.fuel.set_liters("Main Tank 1", 30000)
+        self.fuel.set_liters("Main Tank 2", 30000)
+        self.fuel.set_liters("Center Tank", 20000)
+
+    def simulate(self, trip_kg, **kwargs):
+        return simulate_fuel_burn(self.fuel, trip_kg, ZFW_WEIGHT, ZFW_WEIGHT * ZFW_ARM, **kwargs)
+
+    def test_first_point_is_tow(self):
+        curve = self.simulate(30000)
+        weight, moment, _ = self.fuel.get_cg()
+        self.assertAlmostEqual(curve.weight[0], ZFW_WEIGHT + weight, places=6)
+        self.assertAlmostEqual(curve.moment[0], ZFW_WEIGHT * ZFW_ARM + moment, delta=1e-6 * moment)
+
+    def test_landing_weight(self):
+        curve = self.simulate(30000)
+        tow = curve.weight[0]
+        self.assertAlmostEqual(curve.landing_weight, tow - 30000, delta=0.5)
+        self.assertEqual(curve.burned_kg[-1], 30000)
+        self.assertTrue(np.all(np.diff(curve.weight) < 0))
+
+    def test_landing_point_matches_fuel_load(self):
+        """The last step equals a FuelLoad holding the remaining fuel: center empty, mains equal."""
+        curve = self.simulate(30000)
+        density = self.fuel.density
+        main_l = (80000 - 30000 / density) / 2
+        self.fuel.set_liters("Center Tank", 0)
+        self.fuel.set_liters("Main Tank 1", main_l)
+        self.fuel.set_liters("Main Tank 2", main_l)
+        weight, moment, _ = self.fuel.get_cg()
+        self.assertAlmostEqual(curve.landing_weight, ZFW_WEIGHT + weight, delta=0.2)
+        self.assertAlmostEqual(curve.landing_arm, (ZFW_WEIGHT * ZFW_ARM + moment) / (ZFW_WEIGHT + weight),
+                               delta=1e-3)
+
+    def test_center_burns_first(self):
+        """Burning less than the center tank holds gives the same CG as emptying it by hand."""
+        center_kg = 20000 * self.fuel.density
+        curve = self.simulate(center_kg, step_kg=500)
+        self.fuel.set_liters("Center Tank", 0)
+        weight, moment, _ = self.fuel.get_cg()
+        self.assertAlmostEqual(curve.landing_weight, ZFW_WEIGHT + weight, delta=0.2)
+        self.assertAlmostEqual(curve.moment[-1], ZFW_WEIGHT * ZFW_ARM + moment, delta=1e-5 * moment)
+
+    def test_invalid_trip(self):
+        with self.assertRaises(ValueError):
+            self.simulate(-1)
+        with self.assertRaises(ValueError):
+            self.simulate(10 ** 6)
+
+    def test_zero_trip(self):
+        curve = self.simulate(0)
+        self.assertEqual(len(curve.weight), 1)
+        self.assertEqual(curve.landing_weight, curve.weight[0])
+
+    def test_check_limits_landing_weight(self):
+        limits = {"MZFW_kg": 237682, "MTOW_kg": 351534, "MTW_kg": 352441, "MFW_kg": 138573, "MLW_kg": 251290}
+        messages = calc.check_limits(200000, 300000, limits, lw_weight=260000)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("Maximum LW", messages[0])
+        self.assertEqual(calc.check_limits(200000, 300000, limits, lw_weight=250000), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
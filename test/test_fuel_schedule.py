@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+
+from src.load_sheet import LoadPlanError, LoadSheetEngine
+from src.load_state import LoadState
+
+
+class TestFuelSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.fuel = LoadState.from_files().fuel
+        self.schedule = self.fuel.schedule
+        self.density = self.fuel.density
+
+    def direct(self, total_kg):
+        """The distribution evaluated directly on the arm tables, without the schedule."""
+        total_l = total_kg / self.density
+        main_l = min(total_l / 2, self.schedule.main_max_l)
+        center_l = max(total_l - self.schedule.mains_full_l, 0)
+        tables = self.fuel.arm_tables
+        main_arm = tables["main_tanks_combined_table"](2 * main_l)
+        center_arm = tables["Center Tank"](center_l)
+        return main_l, center_l, (2 * main_l * main_arm + center_l * center_arm) * self.density
+
+    def test_loading_order(self):
+        """Mains fill equally first, the center only once they are full."""
+        half_mains = self.schedule.main_max_l * self.density
+        result = self.schedule.distribute(half_mains, self.density)
+        self.assertAlmostEqual(result["liters"]["Main Tank 1"], self.schedule.main_max_l / 2)
+        self.assertAlmostEqual(result["liters"]["Main Tank 2"], self.schedule.main_max_l / 2)
+        self.assertEqual(result["liters"]["Center Tank"], 0)
+
+        result = self.schedule.distribute(self.schedule.capacity_kg(self.density), self.density)
+        self.assertAlmostEqual(result["liters"]["Main Tank 1"], self.schedule.main_max_l)
+        self.assertAlmostEqual(result["liters"]["Center Tank"], self.schedule.center_max_l)
+
+    def test_matches_direct_evaluation(self):
+        """The binary-searched schedule gives the same moment as the arm tables."""
+        totals = np.linspace(0, self.schedule.capacity_kg(self.density), 1001)
+        result = self.schedule.resolve_many(totals, self.density)
+        for i in range(0, len(totals), 10):
+            main_l, center_l, moment = self.direct(totals[i])
+            self.assertAlmostEqual(result["liters"]["Main Tank 1"][i], main_l, places=6)
+            self.assertAlmostEqual(result["liters"]["Center Tank"][i], center_l, places=6)
+            self.assertAlmostEqual(result["moment"][i], moment, delta=1e-6 * max(moment, 1))
+        np.testing.assert_allclose(result["weight"], totals)
+
+    def test_distribute_matches_resolve_many(self):
+        """The scalar path is the same computation as the array path."""
+        for total in (0, 1234.5, self.schedule.main_max_l * self.density, 100000,
+                      self.schedule.capacity_kg(self.density)):
+            single = self.schedule.distribute(total, self.density)
+            many = self.schedule.resolve_many([total], self.density)
+            self.assertAlmostEqual(single["moment"], many["moment"][0], places=6)
+            self.assertAlmostEqual(single["weight"], many["weight"][0], places=9)
+            for name, arm in single["arms"].items():
+                self.assertAlmostEqual(arm, many["arms"][name][0], places=9)
+        with self.assertRaises(ValueError):
+            self.schedule.resolve_many([1000, 10 ** 6], [self.density, 0.8])
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.schedule.distribute(-1, self.density)
+        with self.assertRaises(ValueError):
+            self.schedule.distribute(self.schedule.capacity_kg(self.density) + 10, self.density)
+
+    def test_fuel_load_distribute(self):
+        """FuelLoad.distribute fills the tanks like entering the liters by hand."""
+        self.fuel.distribute(100000)
+        weight, moment, _ = self.fuel.get_cg()
+        self.assertAlmostEqual(weight, 100000, delta=0.2)
+        self.assertAlmostEqual(moment, self.direct(100000)[2], delta=1e-4 * moment)
+        self.assertGreater(self.fuel.state["Center Tank"]["liters"], 0)
+
+    def test_load_plan_total_fuel(self):
+        engine = LoadSheetEngine.from_files()
+        plan = {"registration": "PH-BVA", "fuel": 60000}
+        _, _, _, _, (weight, moment), _ = engine.reduce_plan(plan)
+        self.assertAlmostEqual(weight, 60000, delta=0.2)
+        # The moment is resolved per chunk, with each plan's own density
+        plans = [plan, {"registration": "PH-BVA", "fuel": 60000, "fuel_density": 0.78},
+                 {"registration": "PH-BVA", "fuel": {"Center Tank": 1000}}]
+        records = list(engine.iter_load_sheets(plans))
+        for record, density in zip(records, (self.density, 0.78)):
+            self.fuel.density = density
+            self.fuel.distribute(60000)
+            _, moment, cg = self.fuel.get_cg()
+            self.assertAlmostEqual(record["weight"]["fuel"], 60000, delta=0.2)
+            fuel_moment = (record["weight"]["tow"] * record["cg_in"]["tow"]
+                           - record["weight"]["zfw"] * record["cg_in"]["zfw"])
+            self.assertAlmostEqual(fuel_moment, moment, delta=2e-4 * moment)
+        self.assertNotEqual(records[0]["cg_in"]["tow"], records[1]["cg_in"]["tow"])
+        with self.assertRaises(LoadPlanError):
+            engine.reduce_plan({"registration": "PH-BVA", "fuel": 10 ** 6})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from src.instrumentation import Profiler, timed
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        """A disabled profiler ignores stages, spans and timed calls."""
+        profiler = Profiler()
+
+        @timed("f", profiler)
+        def f(x):
+            return x * 2
+
+        with profiler.stage("a"):
+            pass
+        profiler.start_span("s")
+        profiler.end_span("s")
+        self.assertEqual(f(2), 4)
+        self.assertEqual(profiler.summary(), {})
+
+    def test_stages_and_spans(self):
+        """Stages count every call; spans measure from the first start."""
+        profiler = Profiler(enabled=True, window=10)
+
+        @timed("f", profiler)
+        def f():
+            return "done"
+
+        for _ in range(25):
+            with profiler.stage("a"):
+                pass
+        self.assertEqual(f(), "done")
+        profiler.start_span("click")
+        profiler.start_span("click")  # Already open, keeps the first start
+        profiler.end_span("click")
+        profiler.end_span("click")  # Not open any more, ignored
+
+        summary = profiler.summary()
+        self.assertEqual(summary["a"]["count"], 25)
+        self.assertEqual(summary["f"]["count"], 1)
+        self.assertEqual(summary["click"]["count"], 1)
+        self.assertLessEqual(summary["a"]["p50_ms"], summary["a"]["p99_ms"])
+        self.assertIn("click", profiler.format_summary())
+
+    def test_record_and_dump(self):
+        """Percentiles cover the rolling window, and dump() writes them as JSON."""
+        profiler = Profiler(enabled=True, window=100)
+        for ms in range(1, 201):
+            profiler.record("x", ms / 1000)
+        stats = profiler.summary()["x"]
+        self.assertEqual(stats["count"], 200)
+        self.assertAlmostEqual(stats["p50_ms"], 150.5)
+        self.assertAlmostEqual(stats["max_ms"], 200)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "diag.json")
+            profiler.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(len(data["samples_ms"]["x"]), 100)
+        self.assertEqual(data["stages"]["x"]["count"], 200)
+
+    def test_take_span(self):
+        """A taken span is closed without a sample, for recording elsewhere."""
+        profiler = Profiler(enabled=True)
+        self.assertIsNone(profiler.take_span("click"))
+        profiler.start_span("click")
+        start = profiler.take_span("click")
+        self.assertLessEqual(start, time.perf_counter())
+        profiler.end_span("click")  # Already taken, ignored
+        self.assertEqual(profiler.summary(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import importlib
+import unittest
+import warnings
+from unittest import mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+# The module selects TkAgg on import; keep the headless backend for the tests
+with mock.patch("matplotlib.use"):
+    live_cg_plot = importlib.import_module("src.live_cg_plot")
+
+TRACE = [(28.5, 170200), (30.4, 207800), (29.1, 245000), (24.2, 320000)]
+
+
+class TestLiveCGPlotBlit(unittest.TestCase):
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Agg is non-interactive
+            self.plot = live_cg_plot.LiveCGPlot()
+        self.canvas = self.plot.fig.canvas
+
+    def tearDown(self):
+        self.plot.close()
+
+    def test_background_cached_and_blitted(self):
+        """After a full draw, updates only blit the trace onto the cached background."""
+        self.assertTrue(self.plot.blit)
+        self.canvas.draw()
+        self.assertIsNotNone(self.plot._background)
+
+        with mock.patch.object(self.canvas, "draw_idle") as draw_idle, \
+                mock.patch.object(self.canvas, "blit") as blit:
+            self.plot.update_full_trace(TRACE)
+            self.plot.reset_trace()
+        draw_idle.assert_not_called()
+        self.assertEqual(blit.call_count, 2)
+
+    def test_burn_curve(self):
+        """The burn curve is drawn from TOW and cleared again by an update without it."""
+        burn = [(24.2, 320000), (25.0, 300000), (26.1, 280000)]
+        self.plot.update_full_trace(TRACE, burn)
+        self.assertEqual(list(self.plot.line_burn.get_ydata()), [320000, 300000, 280000])
+        self.assertEqual(self.plot.scatter_lw.get_offsets().tolist(), [[26.1, 280000]])
+        self.plot.update_full_trace(TRACE)
+        self.assertEqual(len(self.plot.line_burn.get_xdata()), 0)
+        self.assertEqual(len(self.plot.scatter_lw.get_offsets()), 0)
+
+    def test_resize_forces_full_draw(self):
+        """A resize drops the cache, so the next update does a full draw."""
+        self.canvas.draw()
+        self.plot._on_resize(None)
+        self.assertIsNone(self.plot._background)
+        with mock.patch.object(self.canvas, "draw_idle") as draw_idle:
+            self.plot.update_full_trace(TRACE)
+        draw_idle.assert_called_once()
+
+    def test_blit_off(self):
+        """With blit=False every update is a full draw."""
+        plot = live_cg_plot.LiveCGPlot(blit=False)
+        plot.fig.canvas.draw()
+        with mock.patch.object(plot.fig.canvas, "draw_idle") as draw_idle:
+            plot.update_full_trace(TRACE)
+        draw_idle.assert_called()
+        self.assertFalse(plot.line_pax.get_animated())
+        plot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
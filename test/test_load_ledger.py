@@ -0,0 +1,84 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.load_ledger import MaskLedger, MomentLedger
+
+
+class TestMomentLedger(unittest.TestCase):
+
+    def test_running_totals(self):
+        """Totals follow adds, replacements and removals."""
+        ledger = MomentLedger()
+        ledger.set("a", 100, 1000)
+        ledger.set("b", 50, 2000)
+        self.assertEqual(ledger.totals(), (150, 200000, 200000 / 150))
+
+        ledger.set("a", 200, 1000)  # Replace
+        ledger.remove("b")
+        self.assertEqual(ledger.totals(), (200, 200000, 1000))
+
+        ledger.remove("a")
+        self.assertEqual(ledger.totals(), (0, 0, 0))
+
+    def test_matches_full_sum_after_many_changes(self):
+        """Incremental totals stay equal to a full recomputation."""
+        rnd = random.Random(3)
+        ledger = MomentLedger(verify_interval=100)
+        expected = {}
+        for _ in range(5000):
+            key = rnd.randrange(50)
+            if rnd.random() < 0.3:
+                ledger.remove(key)
+                expected.pop(key, None)
+            else:
+                weight, arm = rnd.uniform(1, 5000), rnd.uniform(200, 2200)
+                ledger.set(key, weight, arm)
+                expected[key] = (weight, weight * arm)
+
+        self.assertAlmostEqual(ledger.total_weight, sum(w for w, _ in expected.values()), places=6)
+        self.assertAlmostEqual(ledger.total_moment, sum(m for _, m in expected.values()), delta=1e-3)
+        drift = ledger.recompute()
+        self.assertLess(abs(drift[1]), 1e-3)
+
+    def test_version(self):
+        """Every change moves the version, no-op removals do not."""
+        ledger = MomentLedger()
+        ledger.set("a", 100, 1000)
+        ledger.set("a", 100, 1100)
+        self.assertEqual(ledger.version, 2)
+        ledger.remove("b")
+        ledger.recompute()
+        self.assertEqual(ledger.version, 2)
+        ledger.remove("a")
+        self.assertEqual(ledger.version, 3)
+
+
+class TestMaskLedger(unittest.TestCase):
+
+    def test_version(self):
+        """Only real selection changes move the version."""
+        ledger = MaskLedger(np.array([100.0, 200.0, 300.0]))
+        ledger.set_selected(0, True)
+        ledger.set_selected(0, True)
+        self.assertEqual(ledger.version, 1)
+        ledger.update_mask(ledger.mask)
+        self.assertEqual(ledger.version, 1)
+        ledger.update_mask([True, True, False])
+        self.assertEqual(ledger.version, 2)
+
+    def test_lateral_moment(self):
+        """Single toggles keep the lateral total equal to the dot product over the mask."""
+        rng = np.random.default_rng(2)
+        arms, lateral_arms = rng.uniform(200, 2500, 50), rng.uniform(-100, 100, 50)
+        ledger = MaskLedger(arms, lateral_arms=lateral_arms)
+        for i in rng.integers(0, 50, 400):
+            ledger.set_selected(i, not ledger.mask[i])
+        self.assertAlmostEqual(ledger.total_lateral_moment, lateral_arms @ ledger.mask, places=9)
+        ledger.update_mask(~ledger.mask)
+        self.assertAlmostEqual(ledger.total_lateral_moment, lateral_arms @ ledger.mask, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+import batch
+from src import calculations as calc
+from src.load_sheet import LoadSheetEngine
+from src.load_state import LoadState
+
+
+class TestLoadSheet(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = LoadSheetEngine.from_files()
+
+    def sheets(self, *plans, chunk_size=2):
+        lines = [p if isinstance(p, str) else json.dumps(p) for p in plans]
+        return list(self.engine.iter_load_sheets(lines, chunk_size=chunk_size))
+
+    def test_matches_load_state(self):
+        """Seat, cargo and fuel loads give the same totals as the GUI state."""
+        plan = {"id": "A", "registration": "PH-BVA", "seats": ["1A", "10A", "40K"],
+                "cargo": {"11P": 4676, "31": 1200}, "fuel": {"Main Tank 1": 20000, "Main Tank 2": 20000}}
+        state = LoadState.from_files()
+        state.pax.select_seats([(1, "A"), (10, "A"), (40, "K")])
+        state.cargo.set_load(("FWD", "11P"), {"weight": 4676, "ULD_type": "PMC"})
+        state.cargo.set_load(("AFT", "31"), {"weight": 1200, "ULD_type": "LD-3"})
+        state.fuel.set_liters("Main Tank 1", 20000)
+        state.fuel.set_liters("Main Tank 2", 20000)
+
+        (record,) = self.sheets(plan)
+        loads = state.component_loads()
+        dow_w = 170200
+        dow_arm = calc.calculate_arm_from_doi(45.3, dow_w)
+        tow_w = dow_w + sum(w for w, _, _ in loads.values())
+        tow_m = dow_w * dow_arm + sum(m for _, m, _ in loads.values())
+
+        self.assertEqual(record["id"], "A")
+        self.assertEqual(record["pax_count"], 3)
+        self.assertAlmostEqual(record["weight"]["tow"], tow_w, places=1)
+        self.assertAlmostEqual(record["cg_in"]["tow"], tow_m / tow_w, places=2)
+        self.assertTrue(record["within_limits"])
+
+    def test_breaches_and_errors(self):
+        """Limit breaches are reported, invalid lines yield error records in order."""
+        records = self.sheets(
+            {"registration": "PH-BVA", "pax": 40, "cargo": {"11P": 3000, "11": 500}},
+            "not json",
+            {"id": 7, "registration": "PH-XXX"},
+            "",
+            {"registration": "PH-BVA", "pax": {"F": 30, "Y": 300},
+             "fuel": {"Main Tank 1": 40000, "Main Tank 2": 40000, "Center Tank": 100000}},
+        )
+        self.assertEqual([r["line"] for r in records], [1, 2, 3, 5])
+        self.assertIn("blocked by pallet 11P", records[0]["breaches"][0])
+        self.assertFalse(records[0]["within_limits"])
+        self.assertIn("error", records[1])
+        self.assertEqual(records[2]["id"], 7)
+        self.assertIn("Unknown registration", records[2]["error"])
+        self.assertTrue(any("Maximum TOW" in m for m in records[3]["breaches"]))
+
+    def test_overfilled_tank(self):
+        """A single tank above its own capacity is a breach, even with the total within limits."""
+        (record,) = self.sheets({"registration": "PH-BVA", "fuel": {"Main Tank 1": 70000}})
+        self.assertFalse(record["within_limits"])
+        self.assertTrue(any("Main Tank 1 (70000.0 L) exceeds its capacity" in m for m in record["breaches"]))
+
+    def test_invalid_loads(self):
+        """Unknown seats, positions, tanks and impossible counts are errors."""
+        for plan in ({"registration": "PH-BVA", "seats": ["99Z"]},
+                     {"registration": "PH-BVA", "seats": ["1A", "1A"]},
+                     {"registration": "PH-BVA", "pax": {"F": 500}},
+                     {"registration": "PH-BVA", "cargo": {"99": 100}},
+                     {"registration": "PH-BVA", "fuel": {"Aux Tank": 100}},
+                     {"registration": "PH-BVA", "fuel": {"Center Tank": -100}}):
+            (record,) = self.sheets(plan)
+            self.assertIn("error", record, plan)
+
+    def test_malformed_loads(self):
+        """Wrongly typed and non-finite loads are error records and the stream goes on."""
+        lines = ['{"registration": "PH-BVA", "cargo": [1]}',
+                 '{"registration": "PH-BVA", "cargo": {"11P": NaN}}',
+                 '{"registration": "PH-BVA", "cargo": {"11P": "100"}}',
+                 '{"registration": "PH-BVA", "fuel": "5000"}',
+                 '{"registration": "PH-BVA", "fuel": ["Center Tank"]}',
+                 '{"registration": "PH-BVA", "fuel": {"Center Tank": NaN}}',
+                 '{"registration": "PH-BVA", "fuel": NaN}',
+                 '{"registration": "PH-BVA", "fuel": Infinity}',
+                 '{"registration": "PH-BVA", "fuel": true}',
+                 '{"registration": "PH-BVA", "fuel": 60000, "fuel_density": 0}',
+                 '{"registration": "PH-BVA", "pax": true}',
+                 '{"registration": "PH-BVA", "pax": {"Y": false}}',
+                 '{"registration": "PH-BVA", "pax": 10, "pax_weight": NaN}',
+                 '{"registration": "PH-BVA", "seats": "1A"}']
+        records = self.sheets(*lines, '{"registration": "PH-BVA", "pax": 10}', chunk_size=4)
+        self.assertEqual(len(records), len(lines) + 1)
+        for line, record in zip(lines, records):
+            self.assertIn("error", record, line)
+        self.assertEqual(records[-1]["pax_count"], 10)
+
+    def test_batch_error_count(self):
+        """The CLI counts error records, not "error" in the plan text."""
+        plans = "\n".join([json.dumps({"id": '{"error": 1}', "registration": "PH-BVA"}),
+                           json.dumps({"id": "error", "registration": "PH-BVA", "pax": 10})])
+        with mock.patch("sys.stdin", io.StringIO(plans)), mock.patch("sys.stdout", io.StringIO()) as out:
+            self.assertEqual(batch.main(["-q"]), 0)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+        with mock.patch("sys.stdin", io.StringIO(plans + "\nnot json")), mock.patch("sys.stdout", io.StringIO()):
+            self.assertEqual(batch.main(["-q"]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from src import calculations as calc
+from src import config
+from src.load_state import LoadState
+
+
+class TestLoadState(unittest.TestCase):
+
+    def setUp(self):
+        self.state = LoadState.from_files()
+
+    def test_headless_import(self):
+        """The core must not pull in tkinter or matplotlib."""
+        code = ("import sys, src.load_state; "
+                "print(any(m in sys.modules for m in ('tkinter', 'matplotlib')))")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_passengers(self):
+        """Row and seat selections give the summed seat arms."""
+        pax = self.state.pax
+        pax.select_row(1)
+        self.assertIs(pax.toggle((10, "A")), True)
+        row1 = next(r for r in pax.seat_map if r["row"] == 1)
+        arms = [s["arm_in"] for s in row1["seats"]] + [pax.seat_index.arms[pax.seat_index.position[(10, "A")]]]
+
+        weight, moment, cg = pax.get_cg(88.5)
+        self.assertEqual(pax.count, len(arms))
+        self.assertEqual(weight, 88.5 * len(arms))
+        self.assertEqual(moment, 88.5 * sum(arms))
+
+        self.assertIs(pax.toggle((10, "A")), False)
+        pax.deselect_all()
+        self.assertEqual(pax.get_cg(), (0, 0, 0))
+
+    def test_cargo_blocking_and_totals(self):
+        """Loading a pallet blocks its containers and adds its moment."""
+        cargo = self.state.cargo
+        affected = cargo.load_max(("FWD", "11P"))
+        self.assertEqual(set(affected), {("FWD", "11P"), ("FWD", "11"), ("FWD", "12")})
+        self.assertEqual(cargo.blocked, {("FWD", "11"), ("FWD", "12")})
+        self.assertEqual(cargo.get_cg(), (4676, 4676 * 245.2, 245.2))
+
+        cargo.toggle(("FWD", "11P"))
+        self.assertEqual(cargo.blocked, set())
+        self.assertEqual(cargo.get_cg(), (0, 0, 0))
+
+    def test_fuel_combined_main_tanks(self):
+        """Both mains filled use the combined table; one main uses its own."""
+        fuel = self.state.fuel
+        table = {t["tank"]: t["arm_table"] for t in fuel.tank_data}
+
+        fuel.set_liters("Main Tank 1", 20000)
+        weight, moment, _ = fuel.get_cg()
+        kg = round(20000 * fuel.density, 1)
+        self.assertEqual((weight, moment), (kg, kg * calc.interpolate_arm(table["Main Tank 1"], 20000)))
+
+        fuel.set_liters("Main Tank 2", 20000)
+        fuel.set_liters("Center Tank", 30000)
+        weight, moment, _ = fuel.get_cg()
+        mains = round(40000 * fuel.density, 1)
+        center = round(30000 * fuel.density, 1)
+        self.assertEqual(weight, mains + center)
+        self.assertEqual(moment, mains * calc.interpolate_arm(table["main_tanks_combined_table"], 40000)
+                         + center * calc.interpolate_arm(table["Center Tank"], 30000))
+        self.assertIn("Main Tanks Combined", fuel.state)
+
+        fuel.clear()
+        self.assertEqual(fuel.get_cg(), (0, 0, 0))
+        self.assertNotIn("Main Tanks Combined", fuel.state)
+
+    def test_fuel_totals_cached(self):
+        """The fuel totals are aggregated once per change of liters or density."""
+        fuel = self.state.fuel
+        fuel.set_liters("Main Tank 1", 20000)
+        fuel.set_liters("Main Tank 2", 20000)
+        with mock.patch.object(fuel, "_aggregate", wraps=fuel._aggregate) as aggregate:
+            first = fuel.get_cg()
+            self.assertIs(fuel.get_cg(), first)
+            self.assertEqual(aggregate.call_count, 1)
+
+            # The combined main tank weight follows the density without set_liters
+            fuel.density = 0.8
+            weight, _, _ = fuel.get_cg()
+            self.assertEqual(aggregate.call_count, 2)
+            self.assertEqual(weight, round(40000 * 0.8, 1))
+
+    def test_component_loads_cached(self):
+        """Only the changed sections are recomputed."""
+        state = self.state
+        state.pax.select_row(3)
+        state.fuel.set_liters("Center Tank", 10000)
+        first = state.component_loads()
+
+        with mock.patch.object(state.pax, "get_cg", wraps=state.pax.get_cg) as pax_cg, \
+                mock.patch.object(state.cargo, "get_cg", wraps=state.cargo.get_cg) as cargo_cg, \
+                mock.patch.object(state.fuel, "get_cg", wraps=state.fuel.get_cg) as fuel_cg:
+            self.assertEqual(state.component_loads(), first)
+            state.cargo.load_max(("FWD", "11P"))
+            loads = state.component_loads()
+            self.assertEqual((pax_cg.call_count, cargo_cg.call_count, fuel_cg.call_count), (0, 1, 0))
+            self.assertEqual(loads["cargo"], state.cargo.get_cg())
+
+            # A different passenger weight is a different result
+            state.component_loads(pax_weight=100)
+            self.assertEqual(pax_cg.call_count, 1)
+
+    def test_lateral_balance(self):
+        """Seat letters and main tanks give the lateral moments; a symmetric load is balanced."""
+        state = self.state
+        state.pax.select_seats([(10, "A"), (10, "K")])
+        state.fuel.set_liters("Main Tank 1", 10000)
+        state.fuel.set_liters("Main Tank 2", 10000)
+        state.fuel.set_liters("Center Tank", 5000)
+        balance = state.lateral_balance()
+        self.assertEqual(balance["total"], 0.0)
+        self.assertEqual(balance["fuel_imbalance"], 0.0)
+        self.assertEqual(calc.check_lateral_balance(0.0, 0.0, 300000, balance["main_fuel"]), [])
+
+        state.pax.toggle((10, "K"))
+        state.fuel.set_liters("Main Tank 1", 14000)
+        balance = state.lateral_balance(pax_weight=100)
+        fuel_weight = {t: state.fuel.state[t]["weight"] for t in ("Main Tank 1", "Main Tank 2")}
+        self.assertEqual(balance["pax"], 100 * config.SEAT_LATERAL_ARMS_IN["Y"]["A"])
+        self.assertAlmostEqual(balance["fuel"], sum(w * config.TANK_LATERAL_ARMS_IN[t] for t, w in fuel_weight.items()))
+        self.assertAlmostEqual(balance["fuel_imbalance"], fuel_weight["Main Tank 2"] - fuel_weight["Main Tank 1"])
+
+        self.assertAlmostEqual(balance["main_fuel"], sum(fuel_weight.values()))
+
+        # 3403 kg imbalance: above the 2041 kg fuel limit, below the 2.54e6 kg-in flight limit
+        messages = calc.check_lateral_balance(balance["total"], balance["fuel_imbalance"], 300000,
+                                              balance["main_fuel"])
+        self.assertEqual(len(messages), 1)
+        self.assertIn("Main Tank 1 heavier", messages[0])
+        self.assertIn("2041 kg", messages[0])
+
+        state.fuel.set_liters("Main Tank 1", 38000)
+        balance = state.lateral_balance()
+        messages = calc.check_lateral_balance(balance["total"], balance["fuel_imbalance"], 300000,
+                                              balance["main_fuel"], lw_weight=250000)
+        self.assertEqual(len(messages), 3)
+        self.assertIn("left", messages[0])
+        self.assertIn("TOW limit (2540000 kg-in", messages[0])
+        self.assertIn("LW limit", messages[1])
+
+    def test_lateral_limits(self):
+        """The WBM 1-04-004 and 1-22-002 limit lines."""
+        self.assertEqual(calc.lateral_imbalance_limit(300000), 2.54e6)
+        self.assertAlmostEqual(calc.lateral_imbalance_limit(352441), 2.02e6)
+        self.assertEqual(calc.lateral_imbalance_limit(240000, landing=True), 2.54e6)
+        self.assertAlmostEqual(calc.lateral_imbalance_limit(251290, landing=True), 1.38e6)
+        self.assertEqual(calc.fuel_imbalance_limit(30000), 2041)
+        self.assertAlmostEqual(calc.fuel_imbalance_limit((40823 + 55791) / 2), (2041 + 1360) / 2)
+        self.assertEqual(calc.fuel_imbalance_limit(60000), 1360)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from src.load_sheet import LoadSheetEngine
+from src.parallel_runner import iter_load_sheets_parallel, sweep_plans
+
+
+class TestParallelRunner(unittest.TestCase):
+
+    def test_matches_serial_run(self):
+        """A parallel sweep gives exactly the serial records, in order."""
+        plans = list(sweep_plans(["PH-BVA", "PH-BVB"],
+                                 pax_loads=[0, {"F": 20, "Y": 250}, 400],
+                                 cargo_loads=[None, {"11P": 4676}, {"31": 1500, "31P": 2000}],
+                                 fuel_loads=[{"Center Tank": 30000}, {"Main Tank 1": 30000, "Main Tank 2": 30000}]))
+        self.assertEqual(len(plans), 2 * 3 * 3 * 2)
+        self.assertEqual(plans[1]["id"], "PH-BVA/0/0/1")
+
+        serial = list(LoadSheetEngine.from_files().iter_load_sheets(plans, chunk_size=7))
+        parallel = list(iter_load_sheets_parallel(plans, workers=2, chunk_size=5))
+        self.assertEqual(parallel, serial)
+
+        encoded = list(iter_load_sheets_parallel(plans + ["not json"], workers=2, chunk_size=5, encode=True))
+        self.assertEqual(encoded[:-1], [(json.dumps(r), False) for r in serial])
+        self.assertEqual(json.loads(encoded[-1][0])["line"], len(plans) + 1)
+        self.assertIs(encoded[-1][1], True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+import src.calculations as calc
+import src.config as config
+from src.load_state import LoadState
+from src.pax_dispersion import simulate_pax_dispersion
+
+BASE_WEIGHT = 200000.0
+BASE_MOMENT = BASE_WEIGHT * 1250.0
+FUEL_WEIGHT = 60000.0
+FUEL_MOMENT = FUEL_WEIGHT * 1270.0
+
+
+class TestPaxDispersion(unittest.TestCase):
+
+    def setUp(self):
+        self.index = LoadState.from_files().pax.seat_index
+
+    def simulate(self, counts, **kwargs):
+        kwargs.setdefault("n_draws", 20000)
+        return simulate_pax_dispersion(self.index, counts, BASE_WEIGHT, BASE_MOMENT, FUEL_WEIGHT, FUEL_MOMENT,
+                                       **kwargs)
+
+    def mac(self, moment, weight):
+        return calc.calculate_mac_percent(moment / weight, config.LE_MAC_IN, config.MAC_LENGTH_IN)
+
+    def test_mean_matches_expected_moment(self):
+        """The mean moment of a random seating is the count times the mean arm of the free seats."""
+        counts = {"F": 12, "Y": 150}
+        result = self.simulate(counts)
+        pax_moment = sum(88.5 * n * self.index.arms[self.index.class_mask(c)].mean() for c, n in counts.items())
+        weight = BASE_WEIGHT + 88.5 * 162
+        self.assertAlmostEqual(result.weight["zfw"], weight)
+        self.assertAlmostEqual(result.weight["tow"], weight + FUEL_WEIGHT)
+        stats = result.stats("zfw")
+        self.assertAlmostEqual(stats["mean"], self.mac(BASE_MOMENT + pax_moment, weight), delta=0.02)
+        values = [stats["min"], *stats["percentiles"].values(), stats["max"]]
+        self.assertEqual(values, sorted(values))
+
+    def test_full_class_is_exact(self):
+        """Filling every free seat (drawn as its complement) leaves no dispersion."""
+        occupied = self.index.row_mask(1)
+        n_free = int((self.index.class_mask("F") & ~occupied).sum())
+        result = self.simulate({"F": n_free}, occupied=occupied, n_draws=100)
+        moment = BASE_MOMENT + 88.5 * self.index.arms[self.index.class_mask("F") & ~occupied].sum()
+        np.testing.assert_allclose(result.mac["zfw"], self.mac(moment, BASE_WEIGHT + 88.5 * n_free))
+
+    def test_reproducible(self):
+        first = self.simulate({"Y": 200}, seed=1)
+        np.testing.assert_array_equal(first.mac["tow"], self.simulate({"Y": 200}, seed=1).mac["tow"])
+        self.assertFalse(np.array_equal(first.mac["tow"], self.simulate({"Y": 200}, seed=2).mac["tow"]))
+
+    def test_out_of_envelope(self):
+        """A base far aft of the envelope puts every draw out of it."""
+        result = simulate_pax_dispersion(self.index, {"Y": 100}, BASE_WEIGHT, BASE_WEIGHT * 1350, n_draws=1000)
+        self.assertEqual(result.stats("zfw")["p_out"], 1.0)
+        self.assertEqual(self.simulate({"Y": 100}).stats("zfw")["p_out"], 0.0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.simulate({"F": 1000})
+        with self.assertRaises(ValueError):
+            self.simulate({"C": 10})
+        with self.assertRaises(ValueError):
+            self.simulate({"Y": 10}, n_draws=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import queue
+import time
+import unittest
+from unittest import mock
+
+from src.instrumentation import Profiler
+from src.plot_process import PlotProcessClient, _run_renderer, drain_latest
+
+TRACE = [(28.5, 170200), (27.0, 190000), (26.0, 200000), (25.5, 260000)]
+
+
+class TestPlotProcess(unittest.TestCase):
+
+    def test_drain_latest_coalesces(self):
+        """Only the latest queued message is acted on; close always wins."""
+        q = queue.Queue()
+        self.assertIsNone(drain_latest(q, timeout=0.01))
+
+        for i in range(5):
+            q.put(("trace", ((i, 1), (i, 2), (i, 3), (i, 4))))
+        q.put(("reset",))
+        q.put(("trace", ((9, 1), (9, 2), (9, 3), (9, 4))))
+        self.assertEqual(drain_latest(q), ("trace", ((9, 1), (9, 2), (9, 3), (9, 4))))
+        self.assertTrue(q.empty())
+
+        q.put(("trace", ((1, 1),) * 4))
+        q.put(("close",))
+        q.put(("trace", ((2, 2),) * 4))
+        self.assertEqual(drain_latest(q), ("close",))
+
+    def test_crashed_renderer_is_not_restarted(self):
+        """Updates never block, and a renderer that failed stays stopped."""
+        client = PlotProcessClient()
+        # A renderer process that crashed
+        client._process = mock.Mock(**{"is_alive.return_value": False, "exitcode": 1})
+        with mock.patch.object(client._context, "Process") as spawn:
+            self.assertFalse(client._ensure_renderer())
+            self.assertTrue(client.failed)
+            self.assertFalse(client._ensure_renderer())
+
+            start = time.perf_counter()
+            client.update_full_trace([(28.5, 170200)] * 4)
+            client.reset_trace()
+            client.close()
+            self.assertFalse(client._ensure_renderer())
+            self.assertLess(time.perf_counter() - start, 0.1)
+        spawn.assert_not_called()
+        self.assertIsNone(client._queue)
+
+    def test_closed_renderer_is_restarted(self):
+        """A renderer whose window was closed normally (exit code 0) is started again."""
+        client = PlotProcessClient()
+        client._process = mock.Mock(**{"is_alive.return_value": False, "exitcode": 0})
+        with mock.patch.object(client._context, "Process") as spawn, mock.patch.object(client._context, "Queue"):
+            self.assertTrue(client._ensure_renderer())
+        self.assertFalse(client.failed)
+        spawn.assert_called_once()
+        spawn.return_value.start.assert_called_once()
+
+    def test_span_ends_when_drawn(self):
+        """A handed-over span is recorded at the draw time, also for traces coalesced away."""
+        profiler = Profiler(enabled=True)
+        client = PlotProcessClient(span="click", profiler=profiler)
+        with mock.patch.object(client._context, "Process") as spawn, \
+                mock.patch.object(client._context, "Queue", side_effect=queue.Queue):
+            spawn.return_value.is_alive.return_value = True
+            self.assertFalse(client.poll_drawn())
+            client.update_full_trace(TRACE)  # No open span, not timed
+            for _ in range(2):
+                profiler.start_span("click")
+                client.update_full_trace(TRACE)
+            self.assertEqual([client._queue.get_nowait()[3] for _ in range(3)], [None, 1, 2])
+            self.assertTrue(client.poll_drawn())
+            self.assertNotIn("click", profiler.summary())
+
+            # The renderer only drew the latest trace
+            client._drawn_queue.put((2, time.perf_counter()))
+            self.assertFalse(client.poll_drawn())
+            self.assertEqual(profiler.summary()["click"]["count"], 2)
+
+            # A window closed before drawing drops the pending span
+            profiler.start_span("click")
+            client.update_full_trace(TRACE)
+            spawn.return_value.is_alive.return_value = False
+            self.assertFalse(client.poll_drawn())
+        self.assertEqual(profiler.summary()["click"]["count"], 2)
+
+    def test_renderer_reports_drawn_traces(self):
+        """The renderer loop sends back the id of each timed trace after drawing it."""
+        messages, drawn = queue.Queue(), queue.Queue()
+        for message in (("trace", tuple(TRACE), (), None), ("trace", tuple(TRACE), (), 7), ("close",)):
+            messages.put(message)
+        plot = mock.Mock()
+        with mock.patch("src.live_cg_plot.LiveCGPlot", return_value=plot), \
+                mock.patch("matplotlib.pyplot.fignum_exists", return_value=True), \
+                mock.patch("src.plot_process.drain_latest", side_effect=lambda q: q.get_nowait()):
+            _run_renderer(messages, False, drawn)
+        self.assertEqual(plot.update_full_trace.call_count, 2)
+        trace_id, drawn_at = drawn.get_nowait()
+        self.assertEqual(trace_id, 7)
+        self.assertLessEqual(drawn_at, time.perf_counter())
+        self.assertTrue(drawn.empty())
+        plot.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from src import config
+from src.app_utils import load_json_data
+from src.load_ledger import MaskLedger
+from src.seat_index import SeatIndex
+
+
+class TestSeatIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.seat_map = load_json_data(config.SEAT_MAP_FILEPATH)
+        self.index = SeatIndex(self.seat_map)
+
+    def test_index_matches_seat_map(self):
+        """Every seat in the map has a position, arm and class."""
+        for row_data in self.seat_map:
+            for seat in row_data["seats"]:
+                i = self.index.position[(row_data["row"], seat["seat"])]
+                self.assertEqual(self.index.arms[i], seat["arm_in"])
+                self.assertEqual(self.index.rows[i], row_data["row"])
+                self.assertEqual(self.index.keys[i], (row_data["row"], seat["seat"]))
+        self.assertEqual(self.index.row_class[1], "F")
+        self.assertEqual(int(self.index.class_mask("F").sum()) + int(self.index.class_mask("Y").sum()),
+                         len(self.index))
+
+    def test_lateral_arms(self):
+        """Each seat's lateral arm comes from its class and seat letter."""
+        for i, (row, letter) in enumerate(self.index.keys):
+            self.assertEqual(self.index.lateral_arms[i],
+                             config.SEAT_LATERAL_ARMS_IN[self.index.row_class[row]][letter])
+
+    def test_masks(self):
+        """Row and letter masks select the expected seats."""
+        row_keys = self.index.keys_for(self.index.row_mask(10))
+        self.assertTrue(row_keys)
+        self.assertTrue(all(row == 10 for row, _ in row_keys))
+        letter_keys = self.index.keys_for(self.index.letter_mask("K"))
+        self.assertTrue(all(seat == "K" for _, seat in letter_keys))
+
+    def test_mask_ledger_matches_loop(self):
+        """Dot-product totals equal the per-seat summation."""
+        ledger = MaskLedger(self.index.arms)
+        rng = np.random.default_rng(1)
+        mask = rng.random(len(self.index)) < 0.6
+        ledger.update_mask(mask)
+
+        arms = {(r["row"], s["seat"]): s["arm_in"] for r in self.seat_map for s in r["seats"]}
+        expected = sum(arms[key] for key in self.index.keys_for(mask))
+        self.assertEqual(ledger.total_weight, mask.sum())
+        self.assertEqual(ledger.total_moment, expected)
+
+        # Single toggles keep the same totals as a full recompute
+        for i in rng.integers(0, len(self.index), 300):
+            ledger.set_selected(i, not ledger.mask[i])
+        weight, moment = ledger.total_weight, ledger.total_moment
+        ledger.recompute()
+        self.assertEqual((weight, moment), (ledger.total_weight, ledger.total_moment))
+
+
+if __name__ == '__main__':
+    unittest.main()
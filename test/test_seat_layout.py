@@ -0,0 +1,53 @@
+import unittest
+
+from src import config
+from src.app_utils import load_json_data
+from src.seat_index import SeatIndex
+from src.seat_layout import ROW_HEIGHT, SeatMapLayout
+
+
+class TestSeatMapLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.seat_map = load_json_data(config.SEAT_MAP_FILEPATH)
+        self.index = SeatIndex(self.seat_map)
+        self.layout = SeatMapLayout(self.seat_map, self.index)
+
+    def test_every_seat_is_laid_out(self):
+        self.assertEqual(len(self.layout.rows), len(self.seat_map))
+        self.assertEqual(sorted(self.layout.seat_cells), list(range(len(self.index))))
+
+    def test_hit_seats(self):
+        """The centre of every seat cell hits that seat."""
+        for row in self.layout.rows:
+            y = (row.top + row.bottom) / 2
+            for kind, x0, x1, letter, position in row.cells:
+                hit = self.layout.hit((x0 + x1) / 2, y)
+                if kind == "seat":
+                    self.assertEqual(hit, ("seat", position))
+                    self.assertEqual(self.index.keys[position], (row.row, letter))
+                else:
+                    self.assertIsNone(hit)
+
+    def test_hit_row_button_and_misses(self):
+        row = self.layout.rows[10]
+        y = (row.top + row.bottom) / 2
+        self.assertEqual(self.layout.hit(sum(row.row_button) / 2, y), ("row", row.row))
+        self.assertIsNone(self.layout.hit(1, y))  # Row label
+        self.assertIsNone(self.layout.hit(row.row_button[1] + 5, y))
+        self.assertIsNone(self.layout.hit(100, self.layout.height + 10))
+
+        # The space of a class divider belongs to no row
+        divided = next(r for r in self.layout.rows if r.separator_y is not None)
+        self.assertIsNone(self.layout.hit(sum(divided.row_button) / 2, divided.separator_y))
+
+    def test_rows_between(self):
+        """Exactly the rows that intersect the range are returned."""
+        for y0, y1 in ((0, 300), (1000, 1000 + 4 * ROW_HEIGHT), (self.layout.height - 50, self.layout.height + 500),
+                       (-500, -10)):
+            expected = [i for i, row in enumerate(self.layout.rows) if row.bottom >= y0 and row.top <= y1]
+            self.assertEqual(list(self.layout.rows_between(y0, y1)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
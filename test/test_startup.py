@@ -0,0 +1,16 @@
+import subprocess
+import sys
+import unittest
+
+
+class TestLazyStartup(unittest.TestCase):
+
+    def test_main_does_not_import_matplotlib(self):
+        """matplotlib is only loaded when a plot is first opened."""
+        code = "import sys, main; print('matplotlib' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()